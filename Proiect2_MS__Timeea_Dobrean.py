@@ -1,51 +1,77 @@
 import pygame
 import random
 import math
-import matplotlib
 import os
-
-# Configurare backend Matplotlib adaptiv: prioritate GUI → fallback headless
-_backend_set = False
-
-#  Verifica daca sistemul are server grafic (X11 sau Wayland)
-if os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'):
-    # Încearca GTK4 (ferestre interactive moderne)
-    try:
-        import gi
-        if hasattr(gi, 'require_version'):
-            try:
-                gi.require_version("Gtk", "4.0")
-                matplotlib.use('GTK4Agg')
-                _backend_set = True
-            except Exception:
-                # GTK4 nu e disponibil, continui la Tkinter
-                _backend_set = False
-    except Exception:
-        # PyGObject nu e instalat
-        pass
-
-# Daca GTK4 esueaza, încearca Tkinter (universal, mai simplu)
-if not _backend_set:
-    try:
-        import tkinter as _tk
-        matplotlib.use('TkAgg')
-        _backend_set = True
-    except Exception:
-        # Nici Tkinter nu merge
-        pass
-
-# Fallback final - backend headless (salvează PNG, fara ferestre)
-if not _backend_set:
-    matplotlib.use('Agg')
-
-
-import matplotlib.pyplot as plt
-
-
-pygame.init()
+import json
+import time
+import csv
+import socket
+import struct
+import weakref
+import multiprocessing
+from array import array
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy e optional - doar backend-ul "numpy" are nevoie de el
+    np = None
+
+# Matplotlib (si sondarea GTK/Tk) se incarca abia la primul grafic, prin load_pyplot():
+# simularea, sweep-ul si benchmark-ul pornesc fara el
+
+
+def select_matplotlib_backend(interactive=True):
+    """Pick the Matplotlib backend right before plotting (GUI if possible, else Agg)."""
+    import matplotlib
+    # Configurare backend Matplotlib adaptiv: prioritate GUI → fallback headless
+    _backend_set = False
+
+    #  Verifica daca sistemul are server grafic (X11 sau Wayland)
+    if interactive and (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')):
+        # Încearca GTK4 (ferestre interactive moderne)
+        try:
+            import gi
+            if hasattr(gi, 'require_version'):
+                try:
+                    gi.require_version("Gtk", "4.0")
+                    matplotlib.use('GTK4Agg')
+                    _backend_set = True
+                except Exception:
+                    # GTK4 nu e disponibil, continui la Tkinter
+                    _backend_set = False
+        except Exception:
+            # PyGObject nu e instalat
+            pass
+
+    # Daca GTK4 esueaza, încearca Tkinter (universal, mai simplu)
+    if interactive and not _backend_set:
+        try:
+            import tkinter as _tk
+            matplotlib.use('TkAgg')
+            _backend_set = True
+        except Exception:
+            # Nici Tkinter nu merge
+            pass
+
+    # Fallback final - backend headless (salvează PNG, fara ferestre)
+    if not _backend_set:
+        matplotlib.use('Agg')
+
+
+def load_pyplot(interactive=True):
+    """Select the backend and import matplotlib.pyplot; call only when a plot is made."""
+    select_matplotlib_backend(interactive)
+    import matplotlib.pyplot as plt
+    return plt
 
 # Screen dimensions
 SCREEN_WIDTH, SCREEN_HEIGHT = 800, 600
+WORLD_WIDTH, WORLD_HEIGHT = SCREEN_WIDTH, SCREEN_HEIGHT # Limitele lumii simulate (pot depasi fereastra)
 
 # Colors
 COLOR_BG = (30, 30, 30)
@@ -61,6 +87,14 @@ COLOR_MATING_ACTION = (255, 255, 0) # Galben pentru împerechere
 ENERGY_TO_REPRODUCE = 200 # Valoare de energie necesara pentru reproducere
 ENERGY_REPRODUCE_COST = 120      # Costul de energie pentru reproducere
 MATING_FRAMES = 50      # Durata în frame-uri a starii de împerechere
+MATING_DISTANCE = 10    # Distanța la care doi parteneri încep împerecherea
+CHILD_SPAWN_OFFSET = 40 # Cât de departe de părinte apare puiul
+
+# Codurile starilor folosite de backend-ul numpy
+STATE_ACTIVE = 0
+STATE_SEEKING_MATE = 1
+STATE_MATING = 2
+STATE_NAMES = ("ACTIVE", "SEEKING_MATE", "MATING") # indexate dupa codurile de mai sus
 
 # Energie
 ENERGY_START = 100
@@ -68,7 +102,11 @@ ENERGY_MAX = 600
 ENERGY_LOSS_PER_FRAME = 0.1 # Energie pierduta pe frame
 ENERGY_FROM_FOOD = 40 # Energie caștigată la consumarea hranei
 ENERGY_FROM_PREY = 150 # Energie caștigată la consumarea prăzii
+HUNT_ENERGY_COST = 0.1 # Energie suplimentara pierduta de prădător când vânează
 INITIAL_FOOD_COUNT = 80  # Numărul de obiecte de hrană în simulare
+EAT_DISTANCE = 5 # Distanța la care prada mănâncă, iar prădătorul prinde prada
+FOOD_STEER_WEIGHT = 1.5 # Ponderea pentru direcția către mâncare
+FOOD_SPAWN_MARGIN = 35 # Distanța minimă a mâncării față de marginea obstacolelor
 
 # Haita
 FLOCK_DETECTION_RADIUS = 80 # Raza pentru detectia celorlalti membri ai haitei
@@ -76,6 +114,7 @@ FLOCK_SEPARATION_WEIGHT = 0.85  # Distanța minimă față de alți membri ai ha
 FLOCK_ALIGNMENT_WEIGHT = 1 # Cât de mult să se alinieze cu direcția medie a haitei
 FLOCK_COHESION_WEIGHT = 1   # Cât de mult să se apropie de centrul haitei
 FLOCK_MAX_NEIGHBORS = 7  # Numărul maxim de vecini luați în considerare pentru haita
+FLOCK_SPEED_BOOST = 0.1 # Creșterea vitezei pentru fiecare vecin din haita
 
 # Obstacole
 NUM_OBSTACLES = 8
@@ -83,64 +122,1467 @@ COLOR_OBSTACLE = (0, 122, 204)
 OBSTACLE_MIN_RADIUS = 20
 OBSTACLE_MAX_RADIUS = 30
 OBSTACLE_AVOID_WEIGHT = 3 # Cat de mult să evite obstacolele
+OBSTACLE_SAFE_MARGIN = 30 # Zona de siguranță în jurul obstacolelor
+OBSTACLE_FIELD_CELL = 16 # Latura unei celule din rasterul de obstacole (ObstacleField)
+FOOD_CLICK_MARGIN = 20 # Distanța minimă față de obstacole pentru hrana adăugată cu click
 
 # Frame rate and speeds
 FRAME_RATE = 60
 SPEED_PREY = 1.5
 SPEED_PREDATOR = 1.7
-# Initialize screen and clock
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Predator-Prey Simulation")
-clock = pygame.time.Clock()
+MAX_SPEED = 3 # Deplasarea maxima a unui agent intr-un frame
+FAST_FORWARD_SPEEDS = (1, 10, 100, None) # Pasi de simulare per frame afisat (tastele 1-4); None = cat de repede se poate
+MAX_FRAME_SKIP = 5 # Cate frame-uri poate sari randarea cand simularea nu tine pasul
+PREY_VISION_RADIUS = 50 # Raza în care prada observă prădătorii
+
+# Randare
+SPRITE_HEADING_STEPS = 360 # Numarul de orientari pre-randate ale triunghiului de prădător
+SPRITE_COLORKEY = (255, 0, 254) # Culoare transparenta pentru sprite-uri (nefolosita in simulare)
+PREY_RADIUS = 4
+PREDATOR_SHAPE = ((10, 0), (-5, -5), (-5, 5)) # Triunghiul prădătorului, orientat spre dreapta
+TRAIL_LENGTH = 10 # Numarul de puncte din traseul unui agent
+TRAIL_MODE = "lines" # "lines" = traseu exact, "fade" = strat persistent care se estompeaza, "off"
+TRAIL_FADE = 26 # Cât scade pe frame luminozitatea stratului de trasee în modul "fade"
+DIRTY_RECTS = False # Actualizeaza doar zonele schimbate ale ecranului (pentru hardware slab)
+DIRTY_RECT_LIMIT = 400 # Peste atatea zone schimbate se redeseneaza tot ecranul
+CAMERA_ZOOM_STEP = 1.25 # Factorul de zoom pentru o treapta a rotitei mouse-ului
+CAMERA_MAX_ZOOM = 8 # Zoom maxim (pixeli de ecran per unitate a lumii)
+CAMERA_PAN_STEP = 40 # Pixeli de ecran parcursi la o apasare a unei sageti
+
+# Profilare
+PROFILE_WINDOW = 600 # Numărul de frame-uri pentru percentilele din HUD
+PROFILE_FILE = 'simulation_profile.json'
+
+# Istoric
+HISTORY_CAPACITY = 100000 # Frame-uri pastrate în memorie (buffer circular); 0 = creste nelimitat
+HISTORY_CHUNK = 4096 # Cu cât crește bufferul când HISTORY_CAPACITY e 0 (nelimitat)
+HISTORY_PLOT_POINTS = 4000 # Numărul maxim de intervale min/max folosite la grafice
+HISTORY_FLUSH_FRAMES = 600 # La câte frame-uri se scrie istoricul pe disc
+
+# Checkpoint
+CHECKPOINT_VERSION = 1
+CHECKPOINT_FILE = 'simulation_checkpoint.npz'
+
+# Inregistrare traiectorii si replay
+TRAJECTORY_FILE = 'simulation_trajectory.bin'
+TRAJECTORY_MAGIC = b"PPTRAJ01"
+
+# Telemetrie live (TelemetryPublisher -> live_plot.py)
+TELEMETRY_HOST = "127.0.0.1"
+TELEMETRY_PORT = 47800 # Portul UDP pe care asculta live_plot.py
+TELEMETRY_BATCH = 30 # Frame-uri adunate intr-o singura datagrama
+TELEMETRY_MAGIC = b"PPTEL001"
+
+# Refolosirea obiectelor moarte (Pooled)
+OBJECT_POOL_SIZE = 4096 # Cate obiecte moarte pastreaza fiecare clasa (Prey, Predator, Food)
+ENTITY_COMPACT_FRACTION = 0.25 # EntityStore se compacteaza cand slot-urile moarte depasesc fractia asta
+
+# Nivel de detaliu adaptiv (LodScheduler, backend-ul "objects")
+LOD_ENABLED = False # Prada fara nimic in jur e actualizata complet mai rar (tasta L)
+LOD_MAX_SKIP = 8 # Cate frame-uri la rand poate sari o prada linistita peste actualizarea completa
+
+# Actualizare sincrona (double-buffered) a agentilor, backend-ul "objects"
+SYNCHRONOUS_UPDATE = False # Toti agentii decid din starea frame-ului t, conflictele se rezolva dupa (--synchronous)
+UPDATE_THREADS = 1 # Fire pentru faza de decizie a actualizarii sincrone (--update-threads)
+UPDATE_CHUNK = 256 # Agenti per bucata de decizii trimisa unui fir
+
+# Hrana ca raster de densitate (FoodField)
+FOOD_FIELD = False # Hrana tinuta ca numar de unitati per celula, nu ca obiecte Food (--food-field)
+FOOD_FIELD_CELL = 8 # Latura unei celule din rasterul de hrana; unitatile stau in centrul celulei
+FOOD_FIELD_REGROWTH = None # Cate unitati de hrana cresc la loc intr-un frame; None = toate cele lipsa
+FOOD_FIELD_SATURATION = 4 # De la atatea unitati, o celula e desenata cu culoarea plina a hranei
+
+# Backend-ul "tiled" (TiledEngine)
+TILE_WORKERS = None # Procese (= fasii verticale ale lumii); None = numarul de nuclee
+TILE_MIN_AGENTS = 20000 # Sub atatea pozitii intr-o interogare, o rezolva procesul principal
+
+# Fereastra, ceasul si fontul se creeaza doar cand e nevoie de randare (init_display)
+screen = None
+clock = None
+FONT = None
+
+
+def init_display():
+    """Open the pygame window and create the clock and font (idempotent)."""
+    global screen, clock, FONT
+    if screen is not None:
+        return
+    pygame.init()
+    # Initialize screen and clock
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Predator-Prey Simulation")
+    clock = pygame.time.Clock()
+
+    # Font for text
+    FONT = pygame.font.SysFont(None, 24)
+
+
+def close_display():
+    """Close the pygame window if one is open."""
+    global screen, clock, FONT
+    pygame.quit()
+    screen = clock = FONT = None
+
+@contextmanager
+def simulation_parameters(**overrides):
+    """Temporarily override tuning constants (e.g. ENERGY_TO_REPRODUCE=150) for one run."""
+    # Constantele sunt citite la fiecare apel, deci o suprascriere pe durata unei
+    # rulari e suficienta; un proces (worker) ruleaza o singura simulare odata
+    module = globals()
+    unknown = [name for name in overrides if not name.isupper() or name not in module]
+    if unknown:
+        raise KeyError(f"Unknown simulation parameter(s): {', '.join(unknown)}")
+    previous = {name: module[name] for name in overrides}
+    module.update(overrides)
+    try:
+        yield
+    finally:
+        module.update(previous)
+
+
+class FrameProfiler:
+    """Per-frame wall time of each phase plus work counters, with rolling percentiles."""
+    # Ultimele PROFILE_WINDOW valori pentru percentile, sume pe toata rularea pentru medii
+    def __init__(self, window=PROFILE_WINDOW):
+        self.window = window
+        self.samples = {}
+        self.totals = Counter()
+        self.sample_counts = Counter()
+        self.phase_names = []
+        self.counter_names = []
+        self.frames = 0
+        self._current = {}
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block and add it to the current frame (milliseconds)."""
+        if name not in self.phase_names:
+            self.phase_names.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._current[name] = self._current.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def count(self, name, value):
+        """Add value to a work counter for the current frame."""
+        if name not in self.counter_names:
+            self.counter_names.append(name)
+        self._current[name] = self._current.get(name, 0) + value
+
+    def current(self, name):
+        """Value of a phase or counter so far in the current frame (0 if not recorded)."""
+        return self._current.get(name, 0)
+
+    def end_frame(self):
+        """Close the current frame and push its values into the rolling windows."""
+        for name, value in self._current.items():
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.window)
+            self.samples[name].append(value)
+            self.totals[name] += value
+            self.sample_counts[name] += 1
+        self._current = {}
+        self.frames += 1
+
+    def percentiles(self, name, quantiles=(50, 95, 99)):
+        """Nearest-rank percentiles of the rolling window for one phase or counter."""
+        values = sorted(self.samples.get(name, ()))
+        if not values:
+            return [0.0 for _ in quantiles]
+        return [values[min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))] for q in quantiles]
+
+    def summary(self):
+        """Return {"phases_ms": {...}, "counters": {...}} with p50/p95/p99 and run means."""
+        def describe(name):
+            p50, p95, p99 = self.percentiles(name)
+            mean = self.totals[name] / self.sample_counts[name] if self.sample_counts[name] else 0.0
+            return {"p50": p50, "p95": p95, "p99": p99, "mean": mean}
+        return {
+            "frames": self.frames,
+            "window": self.window,
+            "phases_ms": {name: describe(name) for name in self.phase_names},
+            "counters": {name: describe(name) for name in self.counter_names},
+        }
+
+    def export(self, path=PROFILE_FILE):
+        """Write the summary as JSON."""
+        with open(path, "w") as handle:
+            json.dump(self.summary(), handle, indent=2)
+        print(f"Saving profile to {path}")
+
+
+class HistoryRecorder:
+    """Population history in typed arrays, with min/max decimation and optional CSV streaming.
+
+    The raw series live in a ring buffer of `capacity` frames (or grow in chunks
+    when capacity is 0). Independently, every series is folded into at most
+    `max_points` min/max buckets covering the whole run, so plotting stays
+    cheap and memory stays constant however long the simulation runs.
+    """
+    COLUMNS = ("time_steps", "prey", "predators", "prey_births", "predator_births")
+
+    def __init__(self, capacity=None, max_points=None, stream_path=None, flush_every=None):
+        self.capacity = HISTORY_CAPACITY if capacity is None else capacity
+        self.max_points = max_points or HISTORY_PLOT_POINTS
+        self.flush_every = flush_every or HISTORY_FLUSH_FRAMES
+        self.stream_path = stream_path
+        self.frames = 0
+        self.flushed = 0
+        self.allocated = self.capacity if self.capacity else HISTORY_CHUNK
+        self.data = {name: array('q', bytes(8 * self.allocated)) for name in self.COLUMNS}
+
+        # Intervale min/max: [start, min si max pentru fiecare coloana]
+        self.bucket_size = 1
+        self.buckets = []
+        self._open_bucket = None
+        if stream_path:
+            with open(stream_path, "w", newline="") as handle:
+                csv.writer(handle).writerow(self.COLUMNS)
+
+    def record(self, time_step, prey, predators, prey_births, predator_births):
+        """Append one frame of counts."""
+        row = (time_step, prey, predators, prey_births, predator_births)
+        if self.capacity:
+            slot = self.frames % self.capacity
+        else:
+            slot = self.frames
+            if slot >= self.allocated:
+                for column in self.data.values():
+                    column.extend(array('q', bytes(8 * HISTORY_CHUNK)))
+                self.allocated += HISTORY_CHUNK
+        for name, value in zip(self.COLUMNS, row):
+            self.data[name][slot] = value
+        self.frames += 1
+
+        self._fold(row)
+        if self.stream_path and self.frames - self.flushed >= self.flush_every:
+            self.flush()
+
+    def _fold(self, row):
+        values = row[1:]
+        bucket = self._open_bucket
+        if bucket is None:
+            bucket = self._open_bucket = [row[0], 0, list(values), list(values)]
+        else:
+            bucket[2] = [min(a, b) for a, b in zip(bucket[2], values)]
+            bucket[3] = [max(a, b) for a, b in zip(bucket[3], values)]
+        bucket[1] += 1
+        if bucket[1] < self.bucket_size:
+            return
+        self.buckets.append(bucket)
+        self._open_bucket = None
+        if len(self.buckets) > self.max_points:
+            # Prea multe intervale: le unim doua cate doua si dublam marimea lor
+            merged = []
+            for left, right in zip(self.buckets[0::2], self.buckets[1::2]):
+                merged.append([left[0], left[1] + right[1],
+                               [min(a, b) for a, b in zip(left[2], right[2])],
+                               [max(a, b) for a, b in zip(left[3], right[3])]])
+            if len(self.buckets) % 2:
+                leftover = self.buckets[-1]
+                self._open_bucket = leftover
+            self.buckets = merged
+            self.bucket_size *= 2
+
+    def _ordered_slots(self):
+        retained = min(self.frames, self.capacity) if self.capacity else self.frames
+        if not self.capacity or self.frames <= self.capacity:
+            return range(retained)
+        start = self.frames % self.capacity
+        return list(range(start, self.capacity)) + list(range(start))
+
+    def series(self, name):
+        """Raw values of one column for the retained frames, oldest first."""
+        column = self.data[name]
+        slots = self._ordered_slots()
+        if isinstance(slots, range):
+            return column[slots.start:slots.stop].tolist()
+        return [column[slot] for slot in slots]
+
+    def latest(self, name):
+        """Most recent value of one column (0 before the first frame)."""
+        if not self.frames:
+            return 0
+        slot = (self.frames - 1) % self.capacity if self.capacity else self.frames - 1
+        return self.data[name][slot]
+
+    def plot_series(self, name):
+        """Min/max envelope of one column over the whole run as (x, y) lists."""
+        column = self.COLUMNS.index(name) - 1
+        x, y = [], []
+        buckets = self.buckets + ([self._open_bucket] if self._open_bucket else [])
+        for start, _, lows, highs in buckets:
+            x.extend((start, start))
+            y.extend((lows[column], highs[column]))
+        return x, y
+
+    def state(self):
+        """Arrays and scalars describing the recorder, for checkpoints."""
+        buckets = self.buckets + ([self._open_bucket] if self._open_bucket else [])
+        return {
+            "data": np.stack([np.frombuffer(self.data[name], dtype=np.int64) for name in self.COLUMNS]),
+            "buckets": np.array([[b[0], b[1]] + b[2] + b[3] for b in buckets], dtype=np.int64).reshape(-1, 10),
+            "scalars": {"frames": self.frames, "flushed": self.flushed, "capacity": self.capacity,
+                        "allocated": self.allocated, "bucket_size": self.bucket_size,
+                        "open_bucket": self._open_bucket is not None,
+                        "stream_offset": os.path.getsize(self.stream_path) if self.stream_path else None},
+        }
+
+    def restore(self, data, buckets, scalars, stream_path=None):
+        """Inverse of state(); an existing CSV stream is cut back to the checkpoint."""
+        for name in ("frames", "flushed", "capacity", "allocated", "bucket_size"):
+            setattr(self, name, scalars[name])
+        self.data = {name: array('q', data[row].tobytes()) for row, name in enumerate(self.COLUMNS)}
+        rows = [[int(v) for v in row] for row in buckets]
+        self.buckets = [[r[0], r[1], r[2:6], r[6:10]] for r in rows]
+        self._open_bucket = self.buckets.pop() if scalars["open_bucket"] else None
+        self.stream_path = stream_path
+        if stream_path and scalars["stream_offset"] is not None and os.path.exists(stream_path):
+            with open(stream_path, "r+b") as handle:
+                handle.truncate(scalars["stream_offset"])
+        elif stream_path:
+            # Fisier nou: scriem antetul si tot istoricul pastrat
+            with open(stream_path, "w", newline="") as handle:
+                csv.writer(handle).writerow(self.COLUMNS)
+            self.flushed = self.frames - len(self._ordered_slots())
+
+    def flush(self):
+        """Append the frames recorded since the last flush to the CSV stream."""
+        if not self.stream_path or self.flushed == self.frames:
+            return
+        if self.capacity and self.frames - self.flushed > self.capacity:
+            raise RuntimeError("History ring buffer overwritten before flush; lower flush_every.")
+        with open(self.stream_path, "a", newline="") as handle:
+            writer = csv.writer(handle)
+            for frame in range(self.flushed, self.frames):
+                slot = frame % self.capacity if self.capacity else frame
+                writer.writerow([self.data[name][slot] for name in self.COLUMNS])
+        self.flushed = self.frames
+
+
+def _trajectory_dtypes():
+    """Record layouts of a trajectory file: frame header and one packed agent."""
+    frame = np.dtype([("frame", "<i8"), ("prey", "<u4"), ("predators", "<u4"), ("food", "<u4")])
+    agent = np.dtype([("x", "<f4"), ("y", "<f4"), ("heading", "<f4"), ("state", "u1")])
+    return frame, agent
+
+
+class TrajectoryRecorder:
+    """Append-only binary log of agent positions, headings, states and food for every frame.
+
+    Layout: magic, JSON header (world size, obstacles), then per frame a fixed
+    header followed by packed prey, predator and food arrays. Frames are
+    self-delimiting, so a file cut short by a crash is still readable.
+    """
+
+    def __init__(self, path, obstacles):
+        if np is None:
+            raise ImportError("Trajectory recording requires NumPy to be installed.")
+        self.frame_dtype, self.agent_dtype = _trajectory_dtypes()
+        self.path = path
+        self.handle = open(path, "wb")
+        header = json.dumps({"world": [WORLD_WIDTH, WORLD_HEIGHT],
+                             "obstacles": [[o.position.x, o.position.y, o.radius] for o in obstacles]}).encode()
+        self.handle.write(TRAJECTORY_MAGIC)
+        self.handle.write(np.array(len(header), dtype="<u4").tobytes())
+        self.handle.write(header)
+
+    def _pack(self, position, velocity, state):
+        records = np.empty(len(state), dtype=self.agent_dtype)
+        records["x"] = position[:, 0]
+        records["y"] = position[:, 1]
+        records["heading"] = np.arctan2(velocity[:, 1], velocity[:, 0])
+        records["state"] = state
+        return records.tobytes()
+
+    def record(self, frame, prey, predators, food):
+        """Append one frame; prey and predators are (position, velocity, state code) arrays."""
+        header = np.array([(frame, len(prey[2]), len(predators[2]), len(food))], dtype=self.frame_dtype)
+        self.handle.write(header.tobytes())
+        self.handle.write(self._pack(*prey))
+        self.handle.write(self._pack(*predators))
+        self.handle.write(np.asarray(food, dtype="<f4").tobytes())
+
+    def close(self):
+        self.handle.close()
+
+
+class TelemetryPublisher:
+    """Per-frame counters and phase timings sent as UDP datagrams to a local listener.
+
+    Records are packed with `record_struct` and sent TELEMETRY_BATCH at a time
+    behind TELEMETRY_MAGIC. The socket never blocks: with no listener, or a full
+    socket buffer, the batch is dropped and counted in `dropped`, so publishing
+    costs the simulation a struct.pack per frame and a sendto per batch.
+    """
+    FIELDS = (("frame", "q"), ("prey", "I"), ("predators", "I"), ("food", "I"),
+              ("prey_births", "I"), ("predator_births", "I"), ("prey_deaths", "I"), ("predator_deaths", "I"),
+              ("kills", "I"), ("update_ms", "f"), ("collisions_ms", "f"))
+    record_struct = struct.Struct("<" + "".join(code for _, code in FIELDS))
+
+    def __init__(self, host=None, port=None, batch=None):
+        self.address = (host or TELEMETRY_HOST, port or TELEMETRY_PORT)
+        self.batch = batch or TELEMETRY_BATCH
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.buffer = bytearray(TELEMETRY_MAGIC)
+        self.pending = 0
+        self.sent = 0
+        self.dropped = 0
+
+    def publish(self, *values):
+        """Queue one record (values in FIELDS order); sends the batch when it is full."""
+        self.buffer += self.record_struct.pack(*values)
+        self.pending += 1
+        if self.pending >= self.batch:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        try:
+            self.socket.sendto(self.buffer, self.address)
+            self.sent += self.pending
+        except OSError: # BlockingIOError, ECONNREFUSED, ... - telemetria nu opreste simularea
+            self.dropped += self.pending
+        del self.buffer[len(TELEMETRY_MAGIC):]
+        self.pending = 0
+
+    def close(self):
+        self.flush()
+        self.socket.close()
+
+
+class ReplayPlayer:
+    """Play back a TrajectoryRecorder file with the simulation's drawing code, no agent logic.
+
+    The file is memory-mapped: seeking is a lookup in the frame index and only the
+    frames actually shown are read. Controls: Space = pause, Left/Right = one frame,
+    PageUp/PageDown = 10 s, Up/Down = speed, R = reverse, Home/End, click/drag the bar = seek;
+    as in the simulation, the wheel zooms, right-drag pans and 0 resets the view.
+    """
+
+    def __init__(self, path):
+        if np is None:
+            raise ImportError("Replay requires NumPy to be installed.")
+        self.path = path
+        self.frame_dtype, self.agent_dtype = _trajectory_dtypes()
+        self.data = np.memmap(path, dtype=np.uint8, mode="r")
+        magic = len(TRAJECTORY_MAGIC)
+        if bytes(self.data[:magic]) != TRAJECTORY_MAGIC:
+            raise ValueError(f"{path} is not a trajectory file")
+        header_size = int(self.data[magic:magic + 4].view("<u4")[0])
+        header = json.loads(bytes(self.data[magic + 4:magic + 4 + header_size]))
+        # Fisierele mai vechi au doar dimensiunea ferestrei, care era si lumea
+        self.world = tuple(header.get("world", header.get("screen")))
+
+        self.obstacles = []
+        for x, y, radius in header["obstacles"]:
+            obstacle = Obstacle()
+            obstacle.position = pygame.math.Vector2(x, y)
+            obstacle.radius = radius
+            self.obstacles.append(obstacle)
+
+        self.offsets = []
+        self._scan_from = magic + 4 + header_size
+        self.refresh()
+        self.position = 0.0 # frame-ul curent; fractionar pentru viteze sub 1
+        self.speed = 1.0
+        self.paused = False
+        self.running = True
+        self.sprites = SpriteBatch()
+        self.camera = Camera(self.world)
+
+    @property
+    def frame_count(self):
+        return len(self.offsets)
+
+    def refresh(self):
+        """Index the frames appended since the last call (the file may still be recording)."""
+        if os.path.getsize(self.path) != len(self.data):
+            self.data = np.memmap(self.path, dtype=np.uint8, mode="r")
+        header_size, agent_size = self.frame_dtype.itemsize, self.agent_dtype.itemsize
+        offset, size = self._scan_from, len(self.data)
+        while offset + header_size <= size:
+            header = self.data[offset:offset + header_size].view(self.frame_dtype)[0]
+            length = (header_size + (int(header["prey"]) + int(header["predators"])) * agent_size
+                      + int(header["food"]) * 8)
+            if offset + length > size:
+                break  # frame scris pe jumatate
+            self.offsets.append(offset)
+            offset += length
+        self._scan_from = offset
+
+    def frame(self, index):
+        """(frame number, prey records, predator records, food positions), as views into the file."""
+        offset = self.offsets[index]
+        header = self.data[offset:offset + self.frame_dtype.itemsize].view(self.frame_dtype)[0]
+        offset += self.frame_dtype.itemsize
+        num_prey, num_agents = int(header["prey"]), int(header["prey"]) + int(header["predators"])
+        end = offset + num_agents * self.agent_dtype.itemsize
+        agents = self.data[offset:end].view(self.agent_dtype)
+        food = self.data[end:end + int(header["food"]) * 8].view("<f4").reshape(-1, 2)
+        return int(header["frame"]), agents[:num_prey], agents[num_prey:], food
+
+    def seek(self, index):
+        """Jump to a frame index (clamped to the recording)."""
+        self.position = min(max(index, 0), max(self.frame_count - 1, 0))
+
+    def run(self, speed=1.0):
+        """Playback loop; `speed` is in recorded frames per displayed frame."""
+        init_display()
+        self.speed = speed
+        while self.running:
+            clock.tick(FRAME_RATE)
+            self.handle_events()
+            self.refresh()
+            if not self.paused:
+                self.seek(self.position + self.speed)
+            self.render()
+        close_display()
+
+    def handle_events(self):
+        """Handle playback controls."""
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+            elif event.type == pygame.MOUSEWHEEL:
+                self.camera.zoom_at(CAMERA_ZOOM_STEP ** event.y, pygame.mouse.get_pos())
+            elif event.type == pygame.MOUSEMOTION and event.buttons[2]:
+                self.camera.pan(-event.rel[0], -event.rel[1])
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    self.paused = not self.paused
+                elif event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                    self.paused = True
+                    self.seek(int(self.position) + (1 if event.key == pygame.K_RIGHT else -1))
+                elif event.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+                    self.seek(self.position + (10 if event.key == pygame.K_PAGEDOWN else -10) * FRAME_RATE)
+                elif event.key == pygame.K_UP:
+                    self.speed *= 2
+                elif event.key == pygame.K_DOWN:
+                    self.speed /= 2
+                elif event.key == pygame.K_r:
+                    self.speed = -self.speed
+                elif event.key == pygame.K_HOME:
+                    self.seek(0)
+                elif event.key == pygame.K_END:
+                    self.seek(self.frame_count - 1)
+                elif event.key == pygame.K_0:
+                    self.camera = Camera(self.world)
+            elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION):
+                pressed = event.button == 1 if event.type == pygame.MOUSEBUTTONDOWN else event.buttons[0]
+                if pressed and self._bar_rect().inflate(0, 10).collidepoint(event.pos):
+                    bar = self._bar_rect()
+                    self.seek(round((event.pos[0] - bar.x) / bar.width * (self.frame_count - 1)))
+
+    def _bar_rect(self):
+        return pygame.Rect(10, SCREEN_HEIGHT - 16, SCREEN_WIDTH - 20, 6)
+
+    def render(self):
+        """Draw the current frame the same way Simulation.render does."""
+        init_display()
+        screen.fill(COLOR_BG)
+        if not self.frame_count:
+            pygame.display.flip()
+            return
+
+        camera = self.camera
+        index = int(self.position)
+        frame, prey, predators, food = self.frame(index)
+        food = food[camera.visible_rows(food, 4 / camera.zoom)]
+        self.sprites.draw_food(screen, (food.tobytes(), camera.key), camera.project_array(food).tolist())
+        left, top, right, bottom = camera.visible_rect()
+        for obstacle in self.obstacles:
+            x, y, radius = obstacle.position.x, obstacle.position.y, obstacle.radius
+            if left - radius <= x <= right + radius and top - radius <= y <= bottom + radius:
+                obstacle.draw(screen, camera)
+
+        status = "paused" if self.paused else f"x{self.speed:g}"
+        screen.blit(FONT.render(f"Replay frame {frame} ({index + 1}/{self.frame_count}) {status}", True, COLOR_TEXT), (10, 10))
+        controls = "Space = Pause | Left/Right = Step | Up/Down = Speed | R = Reverse | Bar = Seek"
+        screen.blit(FONT.render(controls, True, (200, 200, 200)), (10, 30))
+        screen.blit(FONT.render(f'Prey Count: {len(prey)}', True, COLOR_TEXT), (SCREEN_WIDTH - 150, 10))
+        screen.blit(FONT.render(f'Predator Count: {len(predators)}', True, COLOR_TEXT), (SCREEN_WIDTH - 150, 30))
+
+        draw_agent_arrays(self.sprites, camera, np.stack([prey["x"], prey["y"]], axis=1), prey["state"],
+                          np.stack([predators["x"], predators["y"]], axis=1), np.degrees(predators["heading"]),
+                          predators["state"])
+
+        bar = self._bar_rect()
+        pygame.draw.rect(screen, (90, 90, 90), bar)
+        done = bar.width * index // max(self.frame_count - 1, 1)
+        pygame.draw.rect(screen, (200, 200, 200), (bar.x, bar.y, done, bar.height))
+        pygame.display.flip()
+
+
+class Camera:
+    """Part of the world shown in the window: world point at the top-left corner and zoom.
+
+    zoom is screen pixels per world unit. The view is kept inside the world,
+    or centered on it when the whole world fits in the window. `world` is the
+    (width, height) to show; None means the current WORLD_WIDTH x WORLD_HEIGHT.
+    """
+    def __init__(self, world=None):
+        self.world = world
+        width, height = self.world_size
+        self.zoom = 1.0
+        self.x = (width - SCREEN_WIDTH) / 2
+        self.y = (height - SCREEN_HEIGHT) / 2
+        self.clamp()
+
+    @property
+    def world_size(self):
+        return self.world or (WORLD_WIDTH, WORLD_HEIGHT)
+
+    @property
+    def key(self):
+        """Changes whenever the view moves (for cached layers)."""
+        return (self.x, self.y, self.zoom)
+
+    def visible_rect(self, margin=0):
+        """(left, top, right, bottom) of the visible world, grown by margin world units."""
+        return (self.x - margin, self.y - margin,
+                self.x + SCREEN_WIDTH / self.zoom + margin, self.y + SCREEN_HEIGHT / self.zoom + margin)
+
+    @property
+    def shows_world(self):
+        """True if the whole world is in view."""
+        left, top, right, bottom = self.visible_rect()
+        width, height = self.world_size
+        return left <= 0 and top <= 0 and right >= width and bottom >= height
+
+    def visible_rows(self, positions, margin):
+        """Rows of an (n, 2) position array inside the view (grown by margin world units)."""
+        if self.shows_world:
+            return slice(None)
+        left, top, right, bottom = self.visible_rect(margin)
+        x, y = positions[:, 0], positions[:, 1]
+        return np.flatnonzero((x >= left) & (x <= right) & (y >= top) & (y <= bottom))
+
+    def project(self, x, y):
+        return (x - self.x) * self.zoom, (y - self.y) * self.zoom
+
+    def project_points(self, points):
+        """project() for a list of (x, y) points; the list itself when the view is not moved or zoomed."""
+        if self.key == (0, 0, 1):
+            return points
+        return [self.project(x, y) for x, y in points]
+
+    def project_array(self, positions):
+        if self.key == (0, 0, 1):
+            return positions
+        return (positions - (self.x, self.y)) * self.zoom
+
+    def unproject(self, point):
+        """World position under a screen point."""
+        return pygame.math.Vector2(self.x + point[0] / self.zoom, self.y + point[1] / self.zoom)
+
+    def pan(self, dx, dy):
+        """Move the view by (dx, dy) screen pixels."""
+        self.x += dx / self.zoom
+        self.y += dy / self.zoom
+        self.clamp()
+
+    def zoom_at(self, factor, point):
+        """Zoom by factor, keeping the world point under the screen point in place."""
+        anchor = self.unproject(point)
+        width, height = self.world_size
+        fit = min(SCREEN_WIDTH / width, SCREEN_HEIGHT / height, 1)
+        self.zoom = min(max(self.zoom * factor, fit), CAMERA_MAX_ZOOM)
+        self.x = anchor.x - point[0] / self.zoom
+        self.y = anchor.y - point[1] / self.zoom
+        self.clamp()
+
+    def clamp(self):
+        width, height = self.world_size
+        for axis, world, window in (("x", width, SCREEN_WIDTH), ("y", height, SCREEN_HEIGHT)):
+            span = window / self.zoom
+            if span >= world:
+                setattr(self, axis, (world - span) / 2)
+            else:
+                setattr(self, axis, min(max(getattr(self, axis), 0), world - span))
 
-# Font for text
-FONT = pygame.font.SysFont(None, 24)
 
 class Obstacle:
     """Class representing an obstacle in the simulation."""
     # Initializează obstacolul: rază și poziție aleatoare pe ecran
     def __init__(self):
         self.radius = random.randint(OBSTACLE_MIN_RADIUS, OBSTACLE_MAX_RADIUS)
-        self.position = pygame.math.Vector2(random.uniform(self.radius, SCREEN_WIDTH-self.radius), random.uniform(self.radius, SCREEN_HEIGHT-self.radius))
+        self.position = pygame.math.Vector2(random.uniform(self.radius, WORLD_WIDTH-self.radius), random.uniform(self.radius, WORLD_HEIGHT-self.radius))
 
-    def draw(self):
+    def draw(self, surface=None, camera=None):
         """Draw the obstacle as a gray circle."""
-        pygame.draw.circle(screen, COLOR_OBSTACLE, (int(self.position.x), int(self.position.y)), self.radius)
-
-class Food:
+        if camera is None:
+            pygame.draw.circle(screen if surface is None else surface, COLOR_OBSTACLE, (int(self.position.x), int(self.position.y)), self.radius)
+            return
+        x, y = camera.project(self.position.x, self.position.y)
+        pygame.draw.circle(screen if surface is None else surface, COLOR_OBSTACLE, (int(x), int(y)), max(1, int(self.radius * camera.zoom)))
+
+class ObstacleField:
+    """Obstacles rasterized once: each cell lists the obstacles whose influence zone reaches it.
+
+    Obstacles never move, so avoidance and spawn-safety checks only visit the
+    obstacles listed for the cell of the queried point (usually none or one), in
+    their original order - the results are the same as scanning the whole list.
+    Points outside the raster fall back to the full list. Rebuild the field if
+    the obstacle list changes.
+    """
+
+    def __init__(self, obstacles, reach=None, cell_size=None):
+        self.obstacles = list(obstacles)
+        # Cea mai mare margine folosita de interogari (evitare, hrana, click)
+        self.reach = max(OBSTACLE_SAFE_MARGIN, FOOD_SPAWN_MARGIN, FOOD_CLICK_MARGIN) if reach is None else reach
+        self.cell_size = cell_size or OBSTACLE_FIELD_CELL
+        # O celula de margine de jur imprejur, pentru agentii iesiti putin din lume
+        self.origin = -self.cell_size
+        self.columns = int(WORLD_WIDTH // self.cell_size) + 3
+        self.rows = int(WORLD_HEIGHT // self.cell_size) + 3
+
+        indices = {} # doar celulele atinse de vreun obstacol, dupa row * columns + column
+        size = self.cell_size
+        for index, obstacle in enumerate(self.obstacles):
+            ox, oy = obstacle.position.x - self.origin, obstacle.position.y - self.origin
+            zone = obstacle.radius + self.reach + 1 # +1 px pentru rotunjiri
+            for row in range(max(0, int((oy - zone) // size)), min(self.rows - 1, int((oy + zone) // size)) + 1):
+                for column in range(max(0, int((ox - zone) // size)), min(self.columns - 1, int((ox + zone) // size)) + 1):
+                    # Punctul celulei cel mai apropiat de centrul obstacolului
+                    nearest_x = min(max(ox, column * size), (column + 1) * size)
+                    nearest_y = min(max(oy, row * size), (row + 1) * size)
+                    if math.hypot(nearest_x - ox, nearest_y - oy) <= zone:
+                        indices.setdefault(row * self.columns + column, []).append(index)
+        self.indices = indices
+        self.cells = {key: tuple(self.obstacles[i] for i in cell) for key, cell in indices.items()}
+
+    def near(self, position):
+        """Obstacles that may be within their radius + reach of position, in list order."""
+        x, y = position
+        column = int((x - self.origin) // self.cell_size)
+        row = int((y - self.origin) // self.cell_size)
+        if 0 <= column < self.columns and 0 <= row < self.rows:
+            return self.cells.get(row * self.columns + column, ())
+        return self.obstacles
+
+    def candidates(self, positions):
+        """Vectorized near(): (n, k) obstacle indices padded with -1 (positions clipped to the raster)."""
+        if not hasattr(self, "_matrix"):
+            keys = sorted(self.indices)
+            width = max([len(cell) for cell in self.indices.values()], default=0)
+            # Ultimul rand (gol) e pentru celulele fara obstacole; cheia -1 nu se potriveste niciodata
+            self._keys = np.array(keys + [-1], dtype=np.int64)
+            self._matrix = np.full((len(keys) + 1, width), -1, dtype=np.int64)
+            for row, key in enumerate(keys):
+                self._matrix[row, :len(self.indices[key])] = self.indices[key]
+        cells = ((positions - self.origin) // self.cell_size).astype(np.int64)
+        columns = np.clip(cells[..., 0], 0, self.columns - 1)
+        rows = np.clip(cells[..., 1], 0, self.rows - 1)
+        keys = rows * self.columns + columns
+        slots = np.searchsorted(self._keys[:-1], keys)
+        slots = np.where(self._keys[slots] == keys, slots, len(self._keys) - 1)
+        return self._matrix[slots]
+
+    def visible(self, left, top, right, bottom):
+        """Obstacles whose cells overlap the world rect, in list order."""
+        first_column = max(int((left - self.origin) // self.cell_size), 0)
+        last_column = min(int((right - self.origin) // self.cell_size), self.columns - 1)
+        first_row = max(int((top - self.origin) // self.cell_size), 0)
+        last_row = min(int((bottom - self.origin) // self.cell_size), self.rows - 1)
+        found = set()
+        for key, cell in self.indices.items():
+            if first_column <= key % self.columns <= last_column and first_row <= key // self.columns <= last_row:
+                found.update(cell)
+        return [self.obstacles[i] for i in sorted(found)]
+
+
+class Pooled:
+    """Free list of dead instances, kept per class in its `pool` list.
+
+    create() takes an instance from the pool and calls its reset() with the
+    given arguments, or constructs a new one if the pool is empty; recycle()
+    puts dead instances back. This keeps births and deaths from allocating.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def create(cls, *args, **kwargs):
+        if cls.pool:
+            item = cls.pool.pop()
+            item.reset(*args, **kwargs)
+            return item
+        return cls(*args, **kwargs)
+
+    @classmethod
+    def recycle(cls, items):
+        cls.pool.extend(items[:max(0, OBJECT_POOL_SIZE - len(cls.pool))])
+
+
+class Food(Pooled):
     """Class representing food in the simulation."""
+    __slots__ = ("position", "active")
+    pool = []
+
     # Initializează mâncarea la o poziție aleatoare și o marchează activă
     def __init__(self):
-        self.position = pygame.math.Vector2(random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT))
+        self.reset()
+
+    def reset(self):
+        self.position = pygame.math.Vector2(random.uniform(0, WORLD_WIDTH), random.uniform(0, WORLD_HEIGHT))
         self.active = True
-    def draw(self):
-        
-        pygame.draw.rect(screen, COLOR_FOOD, (self.position.x, self.position.y,4,4))
 
 
-class Agent:
+class EntityStore:
+    """Agents or food in stable slots; a removed item leaves a tombstone (None) in its slot.
+
+    Iterating yields the live items in insertion order and len() is the running live
+    count. kill() is O(1); compact() squeezes the tombstones out, keeping the order,
+    only once they are more than ENTITY_COMPACT_FRACTION of the slots.
+    """
+    def __init__(self, items=()):
+        self.items = list(items)
+        self.count = len(self.items)
+        self.killed = [] # (slot, item) omorate de la ultimul take_killed()
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return filter(None, self.items)
+
+    def entries(self):
+        """(slot, item) for the live items."""
+        return ((slot, item) for slot, item in enumerate(self.items) if item is not None)
+
+    def append(self, item):
+        self.items.append(item)
+        self.count += 1
+
+    def extend(self, items):
+        self.items.extend(items)
+        self.count += len(items)
+
+    def kill(self, slot):
+        """Tombstone one slot."""
+        item = self.items[slot]
+        if item is not None:
+            self.items[slot] = None
+            self.count -= 1
+            self.killed.append((slot, item))
+
+    def sweep(self, is_alive):
+        """Tombstone every live item that is_alive rejects."""
+        for slot, item in self.entries():
+            if not is_alive(item):
+                self.kill(slot)
+
+    def take_killed(self):
+        """Items killed since the last call, in slot order."""
+        killed, self.killed = self.killed, []
+        killed.sort(key=lambda entry: entry[0])
+        return [item for _, item in killed]
+
+    def compact(self):
+        """Drop the tombstones once there are enough of them; True if the slots changed."""
+        dead = len(self.items) - self.count
+        if not dead or dead <= ENTITY_COMPACT_FRACTION * len(self.items):
+            return False
+        self.items = [item for item in self.items if item is not None]
+        return True
+
+
+class SpatialGrid:
+    """Uniform grid of buckets used for radius and nearest-neighbor queries."""
+    # Itemii sunt indexati dupa pozitia de la rebuild; `slack` acopera cat s-au mai
+    # putut misca de atunci, iar distantele finale se calculeaza pe pozitia curenta
+    def __init__(self, cell_size, slack=0):
+        self.cell_size = cell_size
+        self.slack = slack
+        self.cells = {}
+        self.count = 0
+        self.bounds = None
+        self.stats = Counter() # distance_checks, neighbor_queries, neighbors_found
+
+    def rebuild(self, items, where=None):
+        """Re-bucket all items; the index of each item is its position in `items`.
+
+        With `where`, only the items it accepts are bucketed, but indices still count
+        every item, so ties break the same way as in a grid holding all of them. None
+        entries (EntityStore tombstones) are skipped the same way, so indices are slots.
+        """
+        self.cells = {}
+        self.count = 0
+        self.bounds = None
+        for item in items:
+            if item is not None and (where is None or where(item)):
+                self.insert(item)
+            else:
+                self.count += 1
+
+    def insert(self, item):
+        """Add one item at the end of the index order."""
+        key = self._cell(item.position)
+        self.cells.setdefault(key, []).append((self.count, item))
+        self.count += 1
+        if self.bounds is None:
+            self.bounds = [key[0], key[1], key[0], key[1]]
+        else:
+            self.bounds[0] = min(self.bounds[0], key[0])
+            self.bounds[1] = min(self.bounds[1], key[1])
+            self.bounds[2] = max(self.bounds[2], key[0])
+            self.bounds[3] = max(self.bounds[3], key[1])
+
+    def _cell(self, position):
+        return (int(position.x // self.cell_size), int(position.y // self.cell_size))
+
+    def query_radius(self, position, radius):
+        """Return (index, item, distance) for items closer than radius, in index order."""
+        reach = radius + self.slack
+        min_x = int((position.x - reach) // self.cell_size)
+        max_x = int((position.x + reach) // self.cell_size)
+        min_y = int((position.y - reach) // self.cell_size)
+        max_y = int((position.y + reach) // self.cell_size)
+
+        found = []
+        checks = 0
+        for cx in range(min_x, max_x + 1):
+            for cy in range(min_y, max_y + 1):
+                bucket = self.cells.get((cx, cy), ())
+                checks += len(bucket)
+                for index, item in bucket:
+                    distance = position.distance_to(item.position)
+                    if distance < radius:
+                        found.append((index, item, distance))
+        found.sort(key=lambda entry: entry[0])
+        self.stats["distance_checks"] += checks
+        self.stats["neighbor_queries"] += 1
+        self.stats["neighbors_found"] += len(found)
+        return found
+
+    def nearest(self, position, max_radius=None, predicate=None):
+        """Return (item, distance) of the nearest item matching predicate, or (None, None).
+
+        Ties are broken by index, so the result matches a linear `min` over the list.
+        """
+        if self.bounds is None:
+            return None, None
+
+        center_x, center_y = self._cell(position)
+        if max_radius is None:
+            max_ring = max(center_x - self.bounds[0], self.bounds[2] - center_x,
+                           center_y - self.bounds[1], self.bounds[3] - center_y, 0)
+        else:
+            max_ring = int((max_radius + self.slack) // self.cell_size) + 1
+
+        best_key = None
+        best_item = None
+        checks = 0
+        for ring in range(max_ring + 1):
+            # Orice item din inelul curent e la cel putin (ring - 1) celule distanta
+            if best_key is not None and (ring - 1) * self.cell_size - self.slack > best_key[0]:
+                break
+            for key in self._ring_cells(center_x, center_y, ring):
+                bucket = self.cells.get(key, ())
+                checks += len(bucket)
+                for index, item in bucket:
+                    if predicate is not None and not predicate(item):
+                        continue
+                    distance = position.distance_to(item.position)
+                    if max_radius is not None and distance >= max_radius:
+                        continue
+                    if best_key is None or (distance, index) < best_key:
+                        best_key = (distance, index)
+                        best_item = item
+
+        self.stats["distance_checks"] += checks
+        self.stats["neighbor_queries"] += 1
+        if best_key is None:
+            return None, None
+        self.stats["neighbors_found"] += 1
+        return best_item, best_key[0]
+
+    def query_rect(self, left, top, right, bottom):
+        """Items bucketed in the cells overlapping the rect (grown by slack), in index order."""
+        if self.bounds is None:
+            return []
+        first_x = max(int((left - self.slack) // self.cell_size), self.bounds[0])
+        last_x = min(int((right + self.slack) // self.cell_size), self.bounds[2])
+        first_y = max(int((top - self.slack) // self.cell_size), self.bounds[1])
+        last_y = min(int((bottom + self.slack) // self.cell_size), self.bounds[3])
+        if first_x > last_x or first_y > last_y:
+            return []
+        # Dreptunghi mare fata de numarul de celule ocupate: parcurgem celulele ocupate
+        if (last_x - first_x + 1) * (last_y - first_y + 1) <= len(self.cells):
+            buckets = [self.cells.get((cx, cy), ()) for cx in range(first_x, last_x + 1) for cy in range(first_y, last_y + 1)]
+        else:
+            buckets = [bucket for (cx, cy), bucket in self.cells.items()
+                       if first_x <= cx <= last_x and first_y <= cy <= last_y]
+        found = [entry for bucket in buckets for entry in bucket]
+        found.sort(key=lambda entry: entry[0])
+        return [item for _, item in found]
+
+    @staticmethod
+    def _ring_cells(center_x, center_y, ring):
+        if ring == 0:
+            yield (center_x, center_y)
+            return
+        for dx in range(-ring, ring + 1):
+            yield (center_x + dx, center_y - ring)
+            yield (center_x + dx, center_y + ring)
+        for dy in range(-ring + 1, ring):
+            yield (center_x - ring, center_y + dy)
+            yield (center_x + ring, center_y + dy)
+
+
+class FoodCell:
+    """Handle to one cell of a FoodField, shaped like a Food item for the prey code.
+
+    `position` is the center of the cell and `active` tells if it still holds
+    food; setting `active` to False eats one unit from the cell.
+    """
+    __slots__ = ("field", "index", "position")
+
+    def __init__(self, field, index, position):
+        self.field = field
+        self.index = index
+        self.position = position
+
+    @property
+    def active(self):
+        return self.field.counts.flat[self.index] > 0
+
+    @active.setter
+    def active(self, active):
+        if not active:
+            self.field.take(self.index)
+
+
+class FoodField:
+    """Food as a density raster: the number of food units in every cell of the world.
+
+    A unit lies at the center of its cell. nearest() scans the cells around a
+    point, like SpatialGrid.nearest() over Food items, and returns a FoodCell;
+    eating takes one unit from the cell. regrow() scatters the missing units over
+    the cells away from obstacles in one batch, and draw() blits the raster as one
+    scaled surface. Cost depends on the number of cells, not of units, so a world
+    can hold millions of food units.
+    """
+
+    def __init__(self, obstacles, cell_size=None):
+        if np is None:
+            raise ImportError("The food field requires NumPy to be installed.")
+        self.cell_size = cell_size or FOOD_FIELD_CELL
+        self.columns = max(1, math.ceil(WORLD_WIDTH / self.cell_size))
+        self.rows = max(1, math.ceil(WORLD_HEIGHT / self.cell_size))
+        self.counts = np.zeros((self.rows, self.columns), dtype=np.int64)
+        self.total = 0
+        self.version = 0 # creste la fiecare schimbare a hranei (stratul desenat e refacut)
+        self.rng = np.random.default_rng(random.getrandbits(64))
+        self.stats = Counter() # distance_checks, neighbor_queries, neighbors_found
+
+        # Hrana creste doar in celulele al caror centru e departe de obstacole (ca spawn_safe_food)
+        x = (np.arange(self.columns) + 0.5) * self.cell_size
+        y = (np.arange(self.rows) + 0.5) * self.cell_size
+        fertile = np.ones((self.rows, self.columns), dtype=bool)
+        for obstacle in obstacles:
+            distance = np.hypot(x[None, :] - obstacle.position.x, y[:, None] - obstacle.position.y)
+            fertile &= distance >= obstacle.radius + FOOD_SPAWN_MARGIN
+        self.fertile = np.flatnonzero(fertile)
+
+    def _index(self, positions):
+        """Flat cell index of each position (clipped to the raster)."""
+        cells = (np.asarray(positions, dtype=float).reshape(-1, 2) // self.cell_size).astype(np.int64)
+        columns = np.clip(cells[:, 0], 0, self.columns - 1)
+        rows = np.clip(cells[:, 1], 0, self.rows - 1)
+        return rows * self.columns + columns
+
+    def centers(self, cells):
+        """(n, 2) world positions of the centers of the given flat cell indices."""
+        cells = np.asarray(cells, dtype=np.int64)
+        return (np.stack([cells % self.columns, cells // self.columns], axis=1) + 0.5) * self.cell_size
+
+    def occupied(self):
+        """(cells, centers) of the cells holding food, in index order."""
+        cells = np.flatnonzero(self.counts)
+        return cells, self.centers(cells)
+
+    def add(self, positions, count=1):
+        """Put count units in the cell of every position."""
+        np.add.at(self.counts.reshape(-1), self._index(positions), count)
+        self.total = int(self.counts.sum())
+        self.version += 1
+
+    def take(self, cells):
+        """Eat one unit from each given cell (cells must hold food)."""
+        np.subtract.at(self.counts.reshape(-1), cells, 1)
+        self.total -= np.size(cells)
+        self.version += 1
+
+    def regrow(self, target, limit=None):
+        """Grow missing units (up to limit) in random fertile cells; returns the cells that grew."""
+        missing = target - self.total
+        if limit is not None:
+            missing = min(missing, limit)
+        if missing <= 0 or not len(self.fertile):
+            return np.zeros(0, dtype=np.int64)
+        grown = np.bincount(self.rng.integers(len(self.fertile), size=missing), minlength=len(self.fertile))
+        cells = self.fertile[grown > 0]
+        self.counts.reshape(-1)[cells] += grown[grown > 0]
+        self.total += missing
+        self.version += 1
+        return cells
+
+    def nearest(self, position, max_radius=None, predicate=None):
+        """(FoodCell, distance) of the nearest cell holding food, or (None, None).
+
+        Ties are broken by cell index. predicate, if given, is tried on the cells
+        from the nearest outwards.
+        """
+        x, y = position
+        size = self.cell_size
+        if max_radius is None:
+            first_row, first_column, last_row, last_column = 0, 0, self.rows - 1, self.columns - 1
+        else:
+            first_column = max(int((x - max_radius) // size), 0)
+            last_column = min(int((x + max_radius) // size), self.columns - 1)
+            first_row = max(int((y - max_radius) // size), 0)
+            last_row = min(int((y + max_radius) // size), self.rows - 1)
+        self.stats["neighbor_queries"] += 1
+        if first_column > last_column or first_row > last_row:
+            return None, None
+        window = self.counts[first_row:last_row + 1, first_column:last_column + 1]
+        rows, columns = np.nonzero(window)
+        self.stats["distance_checks"] += len(rows)
+        if not len(rows):
+            return None, None
+        rows += first_row
+        columns += first_column
+        distance = np.hypot((columns + 0.5) * size - x, (rows + 0.5) * size - y)
+        order = np.argsort(distance, kind="stable")
+        if max_radius is not None:
+            order = order[:np.searchsorted(distance[order], max_radius)]
+        for row in order:
+            cell = FoodCell(self, int(rows[row] * self.columns + columns[row]),
+                            pygame.math.Vector2((columns[row] + 0.5) * size, (rows[row] + 0.5) * size))
+            if predicate is None or predicate(cell):
+                self.stats["neighbors_found"] += 1
+                return cell, float(distance[row])
+        return None, None
+
+    def draw(self, surface, camera):
+        """Blit the cells in view as one surface, shaded by density over a COLOR_BG fill."""
+        left, top, right, bottom = camera.visible_rect()
+        size = self.cell_size
+        first_column = max(int(left // size), 0)
+        last_column = min(int(right // size), self.columns - 1)
+        first_row = max(int(top // size), 0)
+        last_row = min(int(bottom // size), self.rows - 1)
+        if first_column > last_column or first_row > last_row:
+            return
+        counts = self.counts[first_row:last_row + 1, first_column:last_column + 1]
+        # Radacina patrata: o singura unitate ramane vizibila, densitatea se vede in continuare
+        shade = np.sqrt(np.minimum(counts, FOOD_FIELD_SATURATION)[..., None] / FOOD_FIELD_SATURATION)
+        background = np.array(COLOR_BG, dtype=float)
+        colors = background + (np.array(COLOR_FOOD, dtype=float) - background) * shade
+        # surfarray vrea (latime, inaltime, 3)
+        layer = pygame.surfarray.make_surface(colors.astype(np.uint8).swapaxes(0, 1))
+        x, y = camera.project(first_column * size, first_row * size)
+        width = max(1, round(counts.shape[1] * size * camera.zoom))
+        height = max(1, round(counts.shape[0] * size * camera.zoom))
+        # La micsorare media pastreaza hrana rara vizibila; la marire celulele raman patrate
+        scale = pygame.transform.smoothscale if size * camera.zoom < 1 else pygame.transform.scale
+        surface.blit(scale(layer, (width, height)), (round(x), round(y)))
+
+    def snapshot(self):
+        """Arrays and metadata describing the field, for checkpoints."""
+        return {"counts": self.counts}, {"cell_size": self.cell_size, "rng": self.rng.bit_generator.state}
+
+    def restore(self, arrays, meta):
+        """Inverse of snapshot() (the field must have been built with the same cell size)."""
+        self.counts = arrays["counts"].astype(np.int64)
+        self.total = int(self.counts.sum())
+        self.rng.bit_generator.state = meta["rng"]
+        self.version += 1
+
+
+def _round_away(values):
+    """Round to the nearest integer, halves away from zero (like C's lround)."""
+    return np.copysign(np.floor(np.abs(values) + 0.5), values)
+
+
+class TrailBuffer:
+    """Trail points of all agents in one preallocated ring buffer.
+
+    Every agent owns a slot of `length` (x, y) points and a write cursor, so adding
+    a point overwrites the oldest one and allocates nothing. The buffer grows by
+    doubling when it runs out of slots; slots of collected agents are reused.
+    The numpy backend uses slot i for row i instead (reserve/compact keep them
+    aligned with its AgentArrays) and pushes all rows at once.
+    """
+
+    def __init__(self, length=None, capacity=256):
+        self.length = length or TRAIL_LENGTH
+        self.capacity = 0
+        self.points = array('d')
+        self.cursor = array('q') # urmatoarea pozitie de scriere a fiecarui slot
+        self.size = array('q') # numarul de puncte valide din fiecare slot
+        self.free = []
+        self._grow(capacity)
+
+    def _grow(self, slots):
+        self.points.frombytes(bytes(16 * self.length * slots))
+        self.cursor.frombytes(bytes(8 * slots))
+        self.size.frombytes(bytes(8 * slots))
+        self.free.extend(range(self.capacity + slots - 1, self.capacity - 1, -1))
+        self.capacity += slots
+
+    def allocate(self):
+        """Reserve an empty slot."""
+        if not self.free:
+            self._grow(self.capacity)
+        slot = self.free.pop()
+        self.clear(slot)
+        return slot
+
+    def clear(self, slot):
+        self.cursor[slot] = self.size[slot] = 0
+
+    def release(self, slot):
+        self.free.append(slot)
+
+    def push(self, slot, x, y):
+        """Append a point to a trail, overwriting its oldest point when full."""
+        cursor = self.cursor[slot]
+        index = 2 * (slot * self.length + cursor)
+        self.points[index] = x
+        self.points[index + 1] = y
+        self.cursor[slot] = (cursor + 1) % self.length
+        if self.size[slot] < self.length:
+            self.size[slot] += 1
+
+    def reserve(self, slots):
+        """Grow so that slots 0..slots-1 exist."""
+        if slots > self.capacity:
+            self._grow(max(slots - self.capacity, self.capacity))
+
+    def clear_many(self, slots):
+        _, cursor, size = self._views()
+        cursor[slots] = 0
+        size[slots] = 0
+
+    def push_many(self, slots, positions):
+        """push() for many distinct slots at once."""
+        points, cursor, size = self._views()
+        write = cursor[slots]
+        points[slots, write] = positions
+        cursor[slots] = (write + 1) % self.length
+        size[slots] = np.minimum(size[slots] + 1, self.length)
+
+    def compact(self, keep):
+        """Move the trails of the slots where keep is set to the front, in order (like AgentArrays.compact)."""
+        survivors = int(keep.sum())
+        for values in self._views():
+            values[:survivors] = values[:len(keep)][keep]
+
+    def trail(self, slot):
+        """(x, y) points of one trail, oldest first."""
+        size, length = self.size[slot], self.length
+        start = slot * length
+        indices = [start + (self.cursor[slot] - size + k) % length for k in range(size)]
+        return [(self.points[2 * i], self.points[2 * i + 1]) for i in indices]
+
+    def _views(self):
+        return (np.frombuffer(self.points, dtype=float).reshape(-1, self.length, 2),
+                np.frombuffer(self.cursor, dtype=np.int64), np.frombuffer(self.size, dtype=np.int64))
+
+    @staticmethod
+    def _project(points, camera):
+        """Integer screen coordinates of world points (unchanged without a camera)."""
+        if camera is None:
+            return points.astype(int)
+        return camera.project_array(points).astype(int)
+
+    def _trail_on_screen(self, slot, camera):
+        if camera is None:
+            return [(int(x), int(y)) for x, y in self.trail(slot)]
+        return [tuple(int(v) for v in camera.project(x, y)) for x, y in self.trail(slot)]
+
+    def draw(self, surface, slots, colors, camera=None):
+        """Draw the trails of the given slots as polylines."""
+        if np is None or surface.get_bytesize() == 3:
+            for slot, color in zip(slots, colors):
+                if self.size[slot] > 1:
+                    pygame.draw.lines(surface, color, False, self._trail_on_screen(slot, camera), 1)
+            return
+        points, cursor, size = self._views()
+        slots = np.asarray(slots, dtype=int)
+        # Punctele fiecarui traseu, de la cel mai vechi, citite direct din buffer
+        order = (cursor[slots] - size[slots])[:, None] + np.arange(self.length)
+        ordered = self._project(points[slots[:, None], order % self.length], camera)
+        valid = np.arange(self.length - 1) < (size[slots] - 1)[:, None]
+        owner = np.nonzero(valid)[0]
+        self._draw_segments(surface, ordered[:, :-1][valid], ordered[:, 1:][valid], owner, colors)
+
+    def draw_heads(self, surface, slots, colors, camera=None):
+        """Draw only the newest segment of each trail (for a persistent, fading layer)."""
+        if np is None or surface.get_bytesize() == 3:
+            for slot, color in zip(slots, colors):
+                if self.size[slot] > 1:
+                    start, end = self._trail_on_screen(slot, camera)[-2:]
+                    pygame.draw.line(surface, color, start, end)
+            return
+        points, cursor, size = self._views()
+        slots = np.asarray(slots, dtype=int)
+        newest = (cursor[slots] - 1) % self.length
+        owner = np.flatnonzero(size[slots] > 1)
+        start = self._project(points[slots, (newest - 1) % self.length][owner], camera)
+        end = self._project(points[slots, newest][owner], camera)
+        self._draw_segments(surface, start, end, owner, colors)
+
+    def bounds(self, slots, camera=None):
+        """Rect covering each non-empty trail, for dirty-rect updates."""
+        if np is None:
+            rects = []
+            for slot in slots:
+                trail = self._trail_on_screen(slot, camera)
+                if trail:
+                    xs, ys = [x for x, _ in trail], [y for _, y in trail]
+                    rects.append(pygame.Rect(min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1))
+            return rects
+        points, _, size = self._views()
+        slots = np.asarray(slots, dtype=int)
+        slots = slots[size[slots] > 0]
+        # Un slot care nu e plin are punctele valide la inceput (cursorul porneste de la 0)
+        filled = (np.arange(self.length) < size[slots][:, None])[:, :, None]
+        trails = self._project(points[slots], camera)
+        low = np.where(filled, trails, np.iinfo(int).max).min(axis=1)
+        high = np.where(filled, trails, np.iinfo(int).min).max(axis=1)
+        return [pygame.Rect(x, y, w, h) for x, y, w, h in np.hstack([low, high - low + 1]).tolist()]
+
+    @staticmethod
+    def _clip_segments(start, end, clip):
+        """Clip segments to the rect the way pygame.draw.line does; returns (start, end, rows kept).
+
+        Cohen-Sutherland against the edges left..right and top..bottom (right and
+        bottom included: the pixels there are dropped later). Crossings are taken
+        on the original segment and kept unrounded until the end, when their offset
+        from the original start is rounded half away from zero.
+        """
+        left, top, right, bottom = clip.left, clip.top, clip.right, clip.bottom
+        origin, direction = start.astype(float), (end - start).astype(float)
+        start, end = origin.copy(), origin + direction
+
+        def outcode(points):
+            x, y = points[:, 0], points[:, 1]
+            return (x < left) * 1 | (x > right) * 2 | (y < top) * 4 | (y > bottom) * 8
+
+        kept = np.arange(len(start))
+        while True:
+            code_start, code_end = outcode(start), outcode(end)
+            inside = (code_start & code_end) == 0
+            start, end, kept = start[inside], end[inside], kept[inside]
+            origin, direction = origin[inside], direction[inside]
+            code_start, code_end = code_start[inside], code_end[inside]
+            rows = np.flatnonzero(code_start | code_end)
+            if not len(rows):
+                break
+            first = code_start[rows] != 0
+            code = np.where(first, code_start[rows], code_end[rows])
+            (x0, y0), (dx, dy) = origin[rows].T, direction[rows].T
+            crossing = np.empty((len(rows), 2))
+            vertical = (code & 3) == 0 # iese doar pe sus/jos: se taie pe orizontala
+            y = np.where(code[vertical] & 4, top, bottom)
+            crossing[vertical] = np.stack([x0[vertical] + dx[vertical] * (y - y0[vertical]) / dy[vertical], y], axis=1)
+            side = ~vertical
+            x = np.where(code[side] & 1, left, right)
+            crossing[side] = np.stack([x, y0[side] + dy[side] * (x - x0[side]) / dx[side]], axis=1)
+            start[rows[first]] = crossing[first]
+            end[rows[~first]] = crossing[~first]
+        return ((origin + _round_away(start - origin)).astype(int), (origin + _round_away(end - origin)).astype(int),
+                kept)
+
+    def _draw_segments(self, surface, start, end, owner, colors):
+        # Acelasi algoritm Bresenham ca pygame.draw.line, rulat pe toate segmentele
+        # deodata, dupa aceeasi taiere la marginea suprafetei; pixelii se scriu la
+        # final, in ordinea agentilor (ca desenarea individuala)
+        clip = surface.get_clip()
+        start, end, rows = self._clip_segments(start, end, clip)
+        owner = owner[rows]
+        x, y = start[:, 0].copy(), start[:, 1].copy()
+        x_end, y_end = end[:, 0], end[:, 1]
+        dx, dy = np.abs(x_end - x), np.abs(y_end - y)
+        step_x, step_y = np.where(x < x_end, 1, -1), np.where(y < y_end, 1, -1)
+        error = np.where(dx > dy, dx // 2, -(dy // 2))
+        xs, ys, owners = [x_end], [y_end], [owner]
+        moving = np.flatnonzero((x != x_end) | (y != y_end))
+        while len(moving):
+            xs.append(x[moving])
+            ys.append(y[moving])
+            owners.append(owner[moving])
+            previous = error[moving]
+            horizontal = moving[previous > -dx[moving]]
+            vertical = moving[previous < dy[moving]]
+            error[horizontal] -= dy[horizontal]
+            x[horizontal] += step_x[horizontal]
+            error[vertical] += dx[vertical]
+            y[vertical] += step_y[vertical]
+            moving = moving[(x[moving] != x_end[moving]) | (y[moving] != y_end[moving])]
+
+        xs, ys, owners = np.concatenate(xs), np.concatenate(ys), np.concatenate(owners)
+        inside = (xs >= clip.left) & (xs < clip.right) & (ys >= clip.top) & (ys < clip.bottom)
+        order = np.argsort(owners[inside], kind="stable")
+        mapped = {color: surface.map_rgb(color) for color in set(colors)}
+        palette = np.array([mapped[color] for color in colors], dtype=np.int64)
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[xs[inside][order], ys[inside][order]] = palette[owners[inside][order]]
+        del pixels
+
+
+# Ce a decis un agent in faza de citire (decide); apply() scrie rezultatul
+PreyDecision = namedtuple("PreyDecision", "state velocity speed partner food")
+PredatorDecision = namedtuple("PredatorDecision", "state velocity partner hunting avoidance")
+
+
+class Agent(Pooled):
     """Base class for all agents in the simulation."""
+    __slots__ = ("position", "velocity", "base_speed", "speed", "color", "base_color", "trail_slot",
+                 "state", "mating_timer", "partner_uid", "energy", "alive", "uid", "idle_frames")
+    # uid-uri crescatoare: identitate stabila (si la reluarea dintr-un checkpoint)
+    next_uid = 0
+    # Traseele tuturor agentilor; slotul e eliberat cand agentul e colectat
+    trails = TrailBuffer()
+
     # Inițializează agentul: poziție, viteză, viteză de bază, culoare, energie și stare
     def __init__(self, position=None, velocity=None, speed=1.2, color=COLOR_PREY):
-        self.position = position or pygame.math.Vector2(random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT))
-        self.velocity = velocity or pygame.math.Vector2(random.uniform(-1, 1), random.uniform(-1, 1)).normalize()   
         self.base_speed = speed
-        self.speed = speed
-        self.color = color
-        self.trail = []
-        self.max_trail_length = 10
         self.base_color = color
+        self.trail_slot = Agent.trails.allocate()
+        self.reset(position, velocity)
 
-        self.state = "ACTIVE" # ACTIVE, SEEKING_MATE, MATING
+    def __del__(self):
+        # Slotul din TrailBuffer se elibereaza odata cu agentul (fara weakref.finalize per obiect)
+        type(self).trails.release(self.trail_slot)
+
+    def reset(self, position=None, velocity=None):
+        """Start a new life: position, heading, energy and state as for a newborn, and a new uid."""
+        self.position = position or pygame.math.Vector2(random.uniform(0, WORLD_WIDTH), random.uniform(0, WORLD_HEIGHT))
+        self.velocity = velocity or pygame.math.Vector2(random.uniform(-1, 1), random.uniform(-1, 1)).normalize()   
+        self.speed = self.base_speed
+        self.color = self.base_color
+        Agent.trails.clear(self.trail_slot)
+
+        self.state = STATE_ACTIVE
         self.mating_timer = 0
-        self.mating_partener = None
+        self.partner_uid = -1 # uid-ul partenerului de imperechere (-1 = niciunul)
 
         self.energy = ENERGY_START
         self.alive = True
+        self.uid = Agent.next_uid
+        Agent.next_uid += 1
+        self.idle_frames = 0 # frame-uri ramase doar cu miscare extrapolata (LodScheduler)
 
     def update_position(self):
         """Update the agent's position based on its velocity and speed."""
-        if self.state == "MATING":
+        if self.state == STATE_MATING:
             return  # Nu se misca in timpul imperecherii 
         
         self.energy -= ENERGY_LOSS_PER_FRAME
@@ -149,18 +1591,18 @@ class Agent:
             self.alive = False
             return
         
-        self.speed = min(self.speed, 3)
+        self.speed = min(self.speed, MAX_SPEED)
         self.position += self.velocity * self.speed
         self._bounce_off_walls()
         self._update_trail()
 
-    def avoid_obstacles(self, obstacles):
+    def avoid_obstacles(self, obstacle_field):
         """Adjust velocity to avoid obstacles."""
         steering = pygame.math.Vector2(0, 0)
-        for obs in obstacles:
+        for obs in obstacle_field.near(self.position):
             distance = self.position.distance_to(obs.position)
             # Zona de siguranță = Raza obstacolului + 30px margine
-            if distance < obs.radius + 30:
+            if distance < obs.radius + OBSTACLE_SAFE_MARGIN:
                 # Vectorul care împinge agentul DEPARTE de centrul obstacolului
                 diff = self.position - obs.position
                 if diff.length() > 0:
@@ -173,97 +1615,119 @@ class Agent:
 
     def start_mating(self, partner):
         """Initiate the mating process with a partner agent."""
-        self.state = "MATING"
+        self.state = STATE_MATING
         self.mating_timer = MATING_FRAMES
         self.velocity = pygame.math.Vector2(0, 0)
         self.color = COLOR_MATING_ACTION
-        self.mating_partner = partner
+        self.partner_uid = partner.uid
     
     def finish_mating(self):
         """Complete the mating process and produce offspring."""
         child = None
 
         self.energy -= ENERGY_REPRODUCE_COST
-        self.state = "ACTIVE"
+        self.state = STATE_ACTIVE
         self.color = self.base_color
 
-        if self.mating_partner and id(self) > id(self.mating_partner):
-            offset_x = random.choice([-40, 40])
-            offset_y = random.choice([-40, 40])
+        # Un singur pui pe pereche: il face partenerul creat mai tarziu
+        if self.partner_uid >= 0 and self.uid > self.partner_uid:
+            offset_x = random.choice([-CHILD_SPAWN_OFFSET, CHILD_SPAWN_OFFSET])
+            offset_y = random.choice([-CHILD_SPAWN_OFFSET, CHILD_SPAWN_OFFSET])
             spawn_pos = self.position + pygame.math.Vector2(offset_x, offset_y)
 
-            spawn_pos.x = max(0, min(spawn_pos.x, SCREEN_WIDTH))
-            spawn_pos.y = max(0, min(spawn_pos.y, SCREEN_HEIGHT))
+            spawn_pos.x = max(0, min(spawn_pos.x, WORLD_WIDTH))
+            spawn_pos.y = max(0, min(spawn_pos.y, WORLD_HEIGHT))
 
-            child = self.__class__(position=spawn_pos)
+            child = self.create(position=spawn_pos)
 
-        self.mating_partner = None
+        self.partner_uid = -1
         return child
     
-    def handle_reproduction(self, partner):
-        """Handle the reproduction process with a partner agent."""
-        child = None
-        if self.state == "ACTIVE" and self.energy >= ENERGY_TO_REPRODUCE:
-            self.state = "SEEKING_MATE"
-            self.color = COLOR_MATING
-
-        if self.state == "SEEKING_MATE" and self.energy < ENERGY_TO_REPRODUCE:
-            self.state = "ACTIVE"
-            self.color = self.base_color
-
-        if self.state == "SEEKING_MATE":
-            potential_partners = [p for p in partner if p is not self and p.state == "SEEKING_MATE"]
-            if potential_partners:
-                nearest_partner = min(potential_partners, key=lambda p: self.position.distance_to(p.position))
+    def may_seek_mate(self):
+        """True if the agent is looking for a mate or can start looking this frame."""
+        # Energia se schimba doar in update-ul propriu, deci lista e completa pe tot cadrul
+        return self.state == STATE_SEEKING_MATE or (self.state == STATE_ACTIVE and self.energy >= ENERGY_TO_REPRODUCE)
+
+    def enter_state(self, state):
+        """Switch to state, with its draw color."""
+        self.state = state
+        self.color = state_palette(self.base_color)[state]
+
+    def decide_reproduction(self, partner_grid, pairing=True):
+        """Read-only part of the reproduction step: (state, velocity, partner to pair with or None).
+
+        With pairing=False a seeker within MATING_DISTANCE keeps heading for its
+        partner instead of pairing (used when the pair was refused).
+        """
+        state, velocity = self.state, self.velocity
+        if state == STATE_ACTIVE and self.energy >= ENERGY_TO_REPRODUCE:
+            state = STATE_SEEKING_MATE
+
+        if state == STATE_SEEKING_MATE and self.energy < ENERGY_TO_REPRODUCE:
+            state = STATE_ACTIVE
+
+        partner = None
+        if state == STATE_SEEKING_MATE:
+            nearest_partner, _ = partner_grid.nearest(
+                self.position, predicate=lambda p: p is not self and p.state == STATE_SEEKING_MATE)
+            if nearest_partner:
                 dir_vec = nearest_partner.position - self.position
                 if dir_vec.length() > 0:
-                    self.velocity = dir_vec.normalize()
-
-                if self.position.distance_to(nearest_partner.position) < 10:
-                    self.start_mating(nearest_partner)
-                    nearest_partner.start_mating(self)
-        if self.state == "MATING":
+                    velocity = dir_vec.normalize()
+
+                if pairing and self.position.distance_to(nearest_partner.position) < MATING_DISTANCE:
+                    partner = nearest_partner
+        return state, velocity, partner
+
+    def apply_reproduction(self, partner=None):
+        """Pair with partner (if given), then advance the mating timer; returns the newborn, if any."""
+        if partner is not None:
+            self.start_mating(partner)
+            partner.start_mating(self)
+        if self.state == STATE_MATING:
             self.mating_timer -= 1
             if self.mating_timer <= 0:
-                child = self.finish_mating()
-        return child
+                return self.finish_mating()
+        return None
 
     def _bounce_off_walls(self):
         """Bounce the agent off the screen edges."""
-        if self.position.x < 0 or self.position.x > SCREEN_WIDTH:
+        if self.position.x < 0 or self.position.x > WORLD_WIDTH:
             self.velocity.x *= -1
-        if self.position.y < 0 or self.position.y > SCREEN_HEIGHT:
+        if self.position.y < 0 or self.position.y > WORLD_HEIGHT:
             self.velocity.y *= -1
 
         # Keep position within bounds
-        self.position.x = max(0, min(self.position.x, SCREEN_WIDTH))
-        self.position.y = max(0, min(self.position.y, SCREEN_HEIGHT))
+        self.position.x = max(0, min(self.position.x, WORLD_WIDTH))
+        self.position.y = max(0, min(self.position.y, WORLD_HEIGHT))
 
     #update traseu
     def _update_trail(self):
         """Update the trail of the agent for visualization."""
-        self.trail.append(self.position.copy())
-        if len(self.trail) > self.max_trail_length:
-            self.trail.pop(0)
+        Agent.trails.push(self.trail_slot, self.position.x, self.position.y)
 
-    #desenam traseu
-    def draw_trail(self):
-        """Draw the trail of the agent."""
-        if len(self.trail) > 1:
-            pygame.draw.lines(screen, self.color, False, [(int(p.x), int(p.y)) for p in self.trail], 1)
+    @property
+    def trail(self):
+        """Trail points, oldest first."""
+        return [pygame.math.Vector2(point) for point in Agent.trails.trail(self.trail_slot)]
 
-    def draw(self):
-        """Method to draw the agent. To be implemented by subclasses."""
-        raise NotImplementedError("Draw method must be implemented by subclasses.")
 
 class Prey(Agent):
     """Class representing a prey agent."""
+    __slots__ = ("vision_radius",)
+    pool = []
+
     # Creează o pradă cu viteză și rază de vizibilitate
     def __init__(self,position=None):
         super().__init__(position=position, speed=SPEED_PREY, color=COLOR_PREY)
-        self.vision_radius = 50  # Detection radius for predators
+
+    def reset(self, position=None, velocity=None):
+        # Constantele se recitesc: un obiect din pool poate veni dintr-o rulare cu alti parametri
+        self.base_speed, self.base_color = SPEED_PREY, COLOR_PREY
+        super().reset(position, velocity)
+        self.vision_radius = PREY_VISION_RADIUS  # Detection radius for predators
     
-    def apply_flocking(self, all_prey):
+    def apply_flocking(self, prey_grid):
         """Apply flocking behavior based on nearby prey."""
         steering = pygame.math.Vector2(0, 0)
         separation = pygame.math.Vector2(0, 0)
@@ -273,26 +1737,24 @@ class Prey(Agent):
         total = 0
         center_of_mass = pygame.math.Vector2(0, 0)
 
-        for other in all_prey:
+        for _, other, distance in prey_grid.query_radius(self.position, FLOCK_DETECTION_RADIUS):
             if total >= FLOCK_MAX_NEIGHBORS:
                 break
             if other is not self and other.alive:
-                distance = self.position.distance_to(other.position)
-                if distance < FLOCK_DETECTION_RADIUS:
-                    total += 1
-
-                    safe_distance = max(distance, 2.0)
-                    # Separation
-                    if distance > 0:
-                        diff = self.position - other.position
-                        diff /= safe_distance  
-                        separation += diff
-                    
-                    # Aliniere
-                    alignment += other.velocity
-
-                    # Coeziune
-                    center_of_mass += other.position
+                total += 1
+
+                safe_distance = max(distance, 2.0)
+                # Separation
+                if distance > 0:
+                    diff = self.position - other.position
+                    diff /= safe_distance  
+                    separation += diff
+                
+                # Aliniere
+                alignment += other.velocity
+
+                # Coeziune
+                center_of_mass += other.position
         if total > 0:
             if separation.length() > 0:
                 separation = separation.normalize() * FLOCK_SEPARATION_WEIGHT
@@ -308,207 +1770,1456 @@ class Prey(Agent):
             
             steering = separation + alignment + cohesion
 
-            flock_speed_boost = 1 + (total * 0.1)
-            self.speed = self.base_speed * flock_speed_boost
-        else:
-            self.speed = self.base_speed
-        return steering
+            flock_speed_boost = 1 + (total * FLOCK_SPEED_BOOST)
+            return steering, self.base_speed * flock_speed_boost
+        return steering, self.base_speed
 
-    def update(self, predators, other_prey, food_list, obstacles, flocking_enabled):
+    def update(self, predator_grid, prey_grid, food_grid, obstacle_field, flocking_enabled, mate_grid=None):
         """Update the prey's state based on nearby predators."""
+        return self.apply(self.decide(predator_grid, prey_grid, food_grid, obstacle_field, flocking_enabled, mate_grid))
+
+    def decide(self, predator_grid, prey_grid, food_grid, obstacle_field, flocking_enabled, mate_grid=None,
+               pairing=True):
+        """This frame's PreyDecision, or None if dead; reads the agents and food without changing them."""
         if not self.alive: return None
-        child = None
+        if mate_grid is None:
+            mate_grid = prey_grid
+        state, velocity, speed = self.state, self.velocity, self.speed
+        partner = food = None
 
-        if self.state == "MATING":
-            child = self.handle_reproduction(other_prey)
-            self.update_position()
-            return child
+        if state == STATE_MATING:
+            return PreyDecision(state, velocity, speed, partner, food)
         
-        obstacle_avoidance = self.avoid_obstacles(obstacles)
+        obstacle_avoidance = self.avoid_obstacles(obstacle_field)
 
         #fugi de pradatori chiar daca vrei sa te reproduci
-        nearest_predator = self._find_nearest_predator(predators)
+        nearest_predator = self._find_nearest_predator(predator_grid)
         if nearest_predator and self.position.distance_to(nearest_predator.position) < self.vision_radius:
-                self.state = "ACTIVE"
-                self.flee_from(nearest_predator)
-                self.color = self.base_color
+                state = STATE_ACTIVE
+                velocity = self.flee_direction(nearest_predator)
                 if obstacle_avoidance.length() > 0:
-                    self.velocity += obstacle_avoidance
-                    self.velocity = self.velocity.normalize()
+                    velocity = (velocity + obstacle_avoidance).normalize()
         else:
-            if self.energy >= ENERGY_TO_REPRODUCE or self.state == "SEEKING_MATE":
-                child = self.handle_reproduction(other_prey)
-
-                if self.state == "SEEKING_MATE" and obstacle_avoidance.length() > 0:
-                    self.velocity += obstacle_avoidance
-                    self.velocity = self.velocity.normalize()
-            elif self.state == "ACTIVE":
+            if self.energy >= ENERGY_TO_REPRODUCE or state == STATE_SEEKING_MATE:
+                state, velocity, partner = self.decide_reproduction(mate_grid, pairing)
+                if partner is not None:
+                    state, velocity = STATE_MATING, pygame.math.Vector2(0, 0) # ca start_mating
+
+                if state == STATE_SEEKING_MATE and obstacle_avoidance.length() > 0:
+                    velocity = (velocity + obstacle_avoidance).normalize()
+            elif state == STATE_ACTIVE:
                 flock_vector = pygame.math.Vector2(0, 0)
                 if flocking_enabled:
-                    flock_vector = self.apply_flocking(other_prey)
+                    flock_vector, speed = self.apply_flocking(prey_grid)
                 food_vector = pygame.math.Vector2(0, 0)
 
                 if self.energy < ENERGY_TO_REPRODUCE:
-                    nearest_food = self.find_nearest_food(food_list)
+                    nearest_food = self.find_nearest_food(food_grid)
                     if nearest_food:
-                        if self.position.distance_to(nearest_food.position) < 5:
-                            nearest_food.active = False
-                            self.energy = min(self.energy + ENERGY_FROM_FOOD, ENERGY_MAX)
+                        if self.position.distance_to(nearest_food.position) < EAT_DISTANCE:
+                            food = nearest_food
                         else:
                             food_direction = nearest_food.position - self.position
                             if food_direction.length() > 0:
-                                food_vector = food_direction.normalize() * 1.5  # Ponderea pentru direcția către mâncare
+                                food_vector = food_direction.normalize() * FOOD_STEER_WEIGHT
                 
-                final_dir = self.velocity + obstacle_avoidance + flock_vector + food_vector
+                final_dir = velocity + obstacle_avoidance + flock_vector + food_vector
                 if final_dir.length() > 0:
-                    self.velocity = final_dir.normalize()
+                    velocity = final_dir.normalize()
+        return PreyDecision(state, velocity, speed, partner, food)
 
+    def apply(self, decision):
+        """Carry out a decision from decide() and move; returns the newborn, if any."""
+        if decision is None: return None
+        child = None
+        if decision.partner is not None or decision.state == STATE_MATING:
+            child = self.apply_reproduction(decision.partner)
+        else:
+            self.enter_state(decision.state)
+            self.velocity = decision.velocity
+            self.speed = decision.speed
+            # Hrana mancata deja in acest frame (de o prada aplicata inainte) nu mai hraneste
+            if decision.food is not None and decision.food.active:
+                decision.food.active = False
+                self.energy = min(self.energy + ENERGY_FROM_FOOD, ENERGY_MAX)
         self.update_position()
         return child
 
-    def _find_nearest_predator(self, predators):
+    def _find_nearest_predator(self, predator_grid):
         """Find the nearest predator within vision radius."""
-        nearest = None
-        min_distance = self.vision_radius
-        for predator in predators:
-            distance = self.position.distance_to(predator.position)
-            if distance < min_distance:
-                min_distance = distance
-                nearest = predator
+        nearest, _ = predator_grid.nearest(self.position, max_radius=self.vision_radius)
         return nearest
 
-    def find_nearest_food(self, food_list):
+    def find_nearest_food(self, food_grid):
         # Return nearest active food within a reasonable search radius
-        active_food = [f for f in food_list if f.active]
-        if not active_food: return None
-        nearest = min(active_food, key = lambda f: self.position.distance_to(f.position))
-        if self.position.distance_to(nearest.position) < self.vision_radius * 2:
-            return nearest
-        
-        return None
+        nearest, _ = food_grid.nearest(self.position, max_radius=self.vision_radius * 2,
+                                       predicate=lambda f: f.active)
+        return nearest
     
-    def flee_from(self, predator):
-        """Change velocity to flee away from the predator."""
+    def flee_direction(self, predator):
+        """Velocity pointing away from the predator (the current one if they overlap)."""
         dir_vec = self.position - predator.position
         if dir_vec.length() > 0:
-            self.velocity = dir_vec.normalize()
-
-    def draw(self):
-        """Draw the prey as a circle with its trail."""
-        pygame.draw.circle(screen, self.color, (int(self.position.x), int(self.position.y)), 4)
-        self.draw_trail()
-
+            return dir_vec.normalize()
+        return self.velocity
 
 
 class Predator(Agent):
     """Class representing a predator agent."""
+    __slots__ = ()
+    pool = []
+
     # Creează un prădător cu viteză și aspect
     def __init__(self, position=None):
         super().__init__(position=position, speed=SPEED_PREDATOR, color=COLOR_PREDATOR)
 
-    def update(self, prey_list, other_predators, obstacles):
+    def reset(self, position=None, velocity=None):
+        self.base_speed, self.base_color = SPEED_PREDATOR, COLOR_PREDATOR # ca la Prey.reset
+        super().reset(position, velocity)
+
+    def update(self, prey_grid, predator_grid, obstacle_field, mate_grid=None):
         """Update the predator's state based on nearby prey."""
-        if not self.alive: return None
-        child = None
-        avoid_vec = self.avoid_obstacles(obstacles)
-        child = self.handle_reproduction(other_predators)
+        return self.apply(self.decide(prey_grid, predator_grid, obstacle_field, mate_grid))
 
-        if self.state == "SEEKING_MATE":
+    def decide(self, prey_grid, predator_grid, obstacle_field, mate_grid=None, pairing=True):
+        """This frame's PredatorDecision, or None if dead; reads the agents without changing them."""
+        if not self.alive: return None
+        avoid_vec = self.avoid_obstacles(obstacle_field)
+        state, velocity, partner = self.decide_reproduction(
+            predator_grid if mate_grid is None else mate_grid, pairing)
+        if partner is not None:
+            state, velocity = STATE_MATING, pygame.math.Vector2(0, 0) # ca start_mating
+
+        hunting = False
+        if state == STATE_SEEKING_MATE:
             if avoid_vec.length() > 0:
-                self.velocity += avoid_vec
-                self.velocity = self.velocity.normalize()
-            self.update_position()
+                velocity = (velocity + avoid_vec).normalize()
         else:
-            nearest_prey = self._find_nearest_prey(prey_list)
+            nearest_prey = self._find_nearest_prey(prey_grid)
             if nearest_prey:
-                self.hunt(nearest_prey)
-                if avoid_vec.length() > 0:
-                    self.velocity += avoid_vec
-                    self.velocity = self.velocity.normalize()
-            else: 
-                if avoid_vec.length() > 0:
-                    self.velocity += avoid_vec
-                    self.velocity = self.velocity.normalize()
-                self.update_position()
+                hunting = True
+                velocity = self.hunt_direction(nearest_prey, velocity)
+            elif avoid_vec.length() > 0:
+                velocity = (velocity + avoid_vec).normalize()
+        return PredatorDecision(state, velocity, partner, hunting, avoid_vec)
+
+    def apply(self, decision):
+        """Carry out a decision from decide() and move; returns the newborn, if any."""
+        if decision is None: return None
+        if decision.partner is None and decision.state != STATE_MATING:
+            self.enter_state(decision.state)
+        child = self.apply_reproduction(decision.partner)
+        self.velocity = decision.velocity
+        self.update_position()
+        if decision.hunting:
+            self.energy -= HUNT_ENERGY_COST
+            # Ocolirea obstacolelor se aplica dupa pasul spre prada, ca inainte
+            if decision.avoidance.length() > 0:
+                self.velocity = (self.velocity + decision.avoidance).normalize()
         return child
     
-    def _find_nearest_prey(self, prey_list):
+    def _find_nearest_prey(self, prey_grid):
         """Find the nearest prey."""
-        return min(prey_list, key=lambda prey: self.position.distance_to(prey.position), default=None)
+        nearest, _ = prey_grid.nearest(self.position)
+        return nearest
 
-    def hunt(self, prey):
-        """Change velocity to move towards the prey."""
+    def hunt_direction(self, prey, velocity):
+        """Velocity pointing at the prey (velocity unchanged if they overlap)."""
         dir_vec = prey.position - self.position
         if dir_vec.length() > 0:
-            self.velocity = dir_vec.normalize()
-        self.update_position()
-        self.energy -= 0.1
+            return dir_vec.normalize()
+        return velocity
+
+
+class LodScheduler:
+    """Adaptive level of detail for the objects backend: quiet prey skip the steering pipeline.
+
+    A prey is quiet when it is ACTIVE, not ready to mate, and has no predator in
+    sight, no flock neighbor, no food within reach and no obstacle zone to avoid.
+    Its full update then only keeps its heading, so on the following frames it
+    just moves (extrapolated motion). It may skip as many frames as nothing could
+    need to come into one of those ranges: the gap to the nearest predator, prey,
+    food and obstacle zone divided by how fast that gap can close, capped at
+    LOD_MAX_SKIP. Agents and food that appear nearby (births, spawns) wake it up.
+    """
+
+    def __init__(self):
+        self.obstacle_field = None
+        self._source = None
+        self.stats = Counter() # idle_prey
+
+    def idle_frames(self, prey, predator_grid, prey_grid, food_grid, obstacle_field, flocking_enabled):
+        """Frames the prey can skip after its full update this frame (0 = stays at full rate)."""
+        if not prey.alive or prey.state != STATE_ACTIVE or prey.energy >= ENERGY_TO_REPRODUCE:
+            return 0
+        if flocking_enabled and prey.speed != prey.base_speed:
+            return 0 # apply_flocking i-a dat bonus de viteza: are vecini in haita
+        if self._source is not obstacle_field:
+            # Acelasi raster, dar cu marginea cat poate parcurge prada cat sta linistita
+            self._source = obstacle_field
+            self.obstacle_field = ObstacleField(obstacle_field.obstacles,
+                                                reach=OBSTACLE_SAFE_MARGIN + (LOD_MAX_SKIP + 1) * MAX_SPEED)
+        position = prey.position
+        frames = LOD_MAX_SKIP
+        for obstacle in self.obstacle_field.near(position):
+            gap = position.distance_to(obstacle.position) - obstacle.radius - OBSTACLE_SAFE_MARGIN
+            frames = min(frames, int(gap // MAX_SPEED))
+        # (grid, raza la care prada reactioneaza, viteza maxima de apropiere, filtru)
+        channels = [(predator_grid, prey.vision_radius, 2 * MAX_SPEED, None),
+                    (food_grid, prey.vision_radius * 2, MAX_SPEED, lambda food: food.active)]
+        if flocking_enabled:
+            channels.insert(0, (prey_grid, FLOCK_DETECTION_RADIUS, 2 * MAX_SPEED,
+                                lambda other: other is not prey and other.alive))
+        for grid, radius, closing, predicate in channels:
+            if frames <= 0:
+                return 0
+            _, distance = grid.nearest(position, max_radius=radius + (frames + 1) * closing, predicate=predicate)
+            if distance is not None:
+                frames = min(frames, int((distance - radius) // closing))
+        return max(frames, 0)
+
+    @staticmethod
+    def wake(prey_grid, position, radius):
+        """Send prey that something appearing at position may reach within radius back to full rate."""
+        for _, prey, _ in prey_grid.query_radius(position, radius + (LOD_MAX_SKIP + 1) * 2 * MAX_SPEED):
+            prey.idle_frames = 0
+
+
+class AgentArrays:
+    """Structure-of-arrays storage for one species, used by the numpy backend."""
+    # (nume, dtype, forma pe agent) - toate bufferele au aceeasi capacitate
+    FIELDS = (
+        ("position", "f8", (2,)),
+        ("velocity", "f8", (2,)),
+        ("speed", "f8", ()),
+        ("energy", "f8", ()),
+        ("state", "i1", ()),
+        ("mating_timer", "i4", ()),
+        ("uid", "i8", ()),
+        ("partner", "i8", ()),
+        ("alive", "?", ()),
+    )
+
+    def __init__(self, base_speed, capacity=64):
+        self.base_speed = base_speed
+        self.count = 0
+        self.capacity = capacity
+        for name, dtype, shape in self.FIELDS:
+            setattr(self, name, np.zeros((capacity,) + shape, dtype=dtype))
+        # Traseul randului i e in slotul i; nu intra in checkpoint (e doar pentru desenare)
+        self.trails = TrailBuffer(capacity=capacity)
+
+    def _reserve(self, needed):
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, self.capacity * 2)
+        for name, dtype, shape in self.FIELDS:
+            grown = np.zeros((capacity,) + shape, dtype=dtype)
+            grown[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, grown)
+        self.trails.reserve(capacity)
+        self.capacity = capacity
+
+    def append(self, positions, velocities, uids):
+        """Append new agents with default speed, energy and state."""
+        added = len(positions)
+        self._reserve(self.count + added)
+        new = slice(self.count, self.count + added)
+        self.position[new] = positions
+        self.velocity[new] = velocities
+        self.speed[new] = self.base_speed
+        self.energy[new] = ENERGY_START
+        self.state[new] = STATE_ACTIVE
+        self.mating_timer[new] = 0
+        self.uid[new] = uids
+        self.partner[new] = -1
+        self.alive[new] = True
+        self.trails.clear_many(new)
+        self.count += added
+
+    def compact(self):
+        """Drop dead agents, keeping the survivors in their original order."""
+        keep = self.alive[:self.count]
+        survivors = int(keep.sum())
+        if survivors == self.count:
+            return
+        # keep e o vedere peste alive, care se muta ultimul
+        self.trails.compact(keep)
+        for name, _, _ in self.FIELDS:
+            buffer = getattr(self, name)
+            buffer[:survivors] = buffer[:self.count][keep]
+        self.count = survivors
+
+
+class CellIndex:
+    """Cell-sorted positions for vectorized radius and nearest-neighbor queries."""
+    # Perechile (query, target) se genereaza pe bucati ca sa limitam memoria
+    MAX_PAIRS = 1 << 21
+
+    def __init__(self, positions, cell_size, mask=None, stats=None):
+        self.positions = positions
+        self.cell_size = cell_size
+        self.stats = stats if stats is not None else Counter()
+        self.nx = int(WORLD_WIDTH // cell_size) + 1
+        self.ny = int(WORLD_HEIGHT // cell_size) + 1
+
+        ids = np.arange(len(positions)) if mask is None else np.flatnonzero(mask)
+        keys = self._keys(positions[ids])
+        # Sortare stabila: in fiecare celula indexii raman crescatori
+        order = np.argsort(keys, kind="stable")
+        self.ids = ids[order]
+        counts = np.bincount(keys, minlength=self.nx * self.ny)
+        self.ends = np.cumsum(counts)
+        self.starts = self.ends - counts
+
+    def _cells(self, positions):
+        cells = np.floor(positions / self.cell_size).astype(np.int64)
+        cells[:, 0] = np.clip(cells[:, 0], 0, self.nx - 1)
+        cells[:, 1] = np.clip(cells[:, 1], 0, self.ny - 1)
+        return cells
+
+    def _keys(self, positions):
+        cells = self._cells(positions)
+        return cells[:, 1] * self.nx + cells[:, 0]
+
+    def pairs(self, query_positions, radius):
+        """Yield (query index, target index, distance) chunks for distance < radius."""
+        self.stats["neighbor_queries"] += len(query_positions)
+        if len(query_positions) == 0 or len(self.ids) == 0:
+            return
+        reach = int(math.ceil(radius / self.cell_size))
+        cells = self._cells(query_positions)
+        span = np.arange(-reach, reach + 1)
+        cx = cells[:, 0, None] + np.repeat(span, len(span))[None, :]
+        cy = cells[:, 1, None] + np.tile(span, len(span))[None, :]
+        valid = (cx >= 0) & (cx < self.nx) & (cy >= 0) & (cy < self.ny)
+        keys = np.where(valid, cy * self.nx + cx, 0)
+        counts = np.where(valid, self.ends[keys] - self.starts[keys], 0)
+        offsets = keys.shape[1]
+
+        per_query = np.cumsum(counts.sum(axis=1))
+        start = 0
+        while start < len(query_positions):
+            done = per_query[start - 1] if start else 0
+            stop = int(np.searchsorted(per_query, done + self.MAX_PAIRS, side="right"))
+            stop = max(stop, start + 1)
+
+            chunk_counts = counts[start:stop].ravel()
+            total = int(chunk_counts.sum())
+            if total:
+                query = np.repeat(np.arange(start, stop), offsets)
+                query = np.repeat(query, chunk_counts)
+                first = np.repeat(self.starts[keys[start:stop].ravel()], chunk_counts)
+                within = np.arange(total) - np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+                target = self.ids[first + within]
+                distance = np.hypot(*(query_positions[query] - self.positions[target]).T)
+                close = distance < radius
+                self.stats["distance_checks"] += total
+                self.stats["neighbors_found"] += int(close.sum())
+                yield query[close], target[close], distance[close]
+            start = stop
+
+    def nearest(self, query_positions, max_radius=None, target_mask=None, exclude=None):
+        """Return (target index or -1, distance) of the nearest target for every query.
+
+        Without max_radius, queries with nothing within one cell fall back to a
+        scan over all targets. Ties are broken by target index, like the object
+        engine's linear scans.
+        """
+        radius = max_radius if max_radius is not None else self.cell_size
+        found, found_distance = self.nearest_within(query_positions, radius, target_mask, exclude)
+        if max_radius is None:
+            self.scan_missing(query_positions, found, found_distance, target_mask, exclude)
+        return found, found_distance
+
+    def nearest_within(self, query_positions, radius, target_mask=None, exclude=None):
+        """Nearest target closer than radius for every query: (index or -1, distance or inf)."""
+        found = np.full(len(query_positions), -1, dtype=np.int64)
+        found_distance = np.full(len(query_positions), np.inf)
+        for query, target, distance in self.pairs(query_positions, radius):
+            self._keep_nearest(found, found_distance, query, target, distance, target_mask, exclude)
+        return found, found_distance
+
+    def scan_missing(self, query_positions, found, found_distance, target_mask=None, exclude=None):
+        """Fill in, in place, the queries with no target found yet by scanning all targets."""
+        # Tinte rare: o scanare completa e mai ieftina decat inele tot mai mari
+        pending = np.flatnonzero(found < 0)
+        targets = self.ids if target_mask is None else self.ids[target_mask[self.ids]]
+        step = max(1, self.MAX_PAIRS // max(len(targets), 1))
+        for start in range(0, len(pending), step):
+            rows = pending[start:start + step]
+            query = np.repeat(rows, len(targets))
+            target = np.tile(targets, len(rows))
+            distance = np.hypot(*(query_positions[query] - self.positions[target]).T)
+            self.stats["distance_checks"] += len(distance)
+            self._keep_nearest(found, found_distance, query, target, distance, None, exclude)
+
+    @staticmethod
+    def _keep_nearest(found, found_distance, query, target, distance, target_mask, exclude):
+        keep = np.ones(len(query), dtype=bool)
+        if target_mask is not None:
+            keep &= target_mask[target]
+        if exclude is not None:
+            keep &= target != exclude[query]
+        query, target, distance = query[keep], target[keep], distance[keep]
+        if not len(query):
+            return
+        # Minim pe grup fara sortare: intai distanta, apoi indexul la egalitate
+        best = np.full(len(found), np.inf)
+        np.minimum.at(best, query, distance)
+        best = np.minimum(best, found_distance)
+        closest = distance == best[query]
+        winner = np.where(found_distance == best, found, np.iinfo(np.int64).max)
+        np.minimum.at(winner, query[closest], target[closest])
+        updated = best < np.inf
+        found[updated] = winner[updated]
+        found_distance[updated] = best[updated]
+
+
+def _normalized(vectors):
+    """Return row-normalized copies of vectors and a mask of the non-zero rows."""
+    length = np.hypot(vectors[:, 0], vectors[:, 1])
+    nonzero = length > 0
+    result = np.zeros_like(vectors)
+    result[nonzero] = vectors[nonzero] / length[nonzero, None]
+    return result, nonzero
+
+
+def _flock_steering(position, velocity, mask, rows, base_speed, stats):
+    """Flocking steering and speed of the prey `rows`, with neighbors taken among the `mask` prey."""
+    steering = np.zeros((len(rows), 2))
+    speed = np.full(len(rows), base_speed)
+
+    index = CellIndex(position, FLOCK_DETECTION_RADIUS, mask=mask, stats=stats)
+    for query, target, distance in index.pairs(position[rows], FLOCK_DETECTION_RADIUS):
+        keep = target != rows[query]
+        query, target, distance = query[keep], target[keep], distance[keep]
+        if not len(query):
+            continue
+        # Primii FLOCK_MAX_NEIGHBORS vecini in ordinea listei
+        order = np.lexsort((target, query))
+        query, target, distance = query[order], target[order], distance[order]
+        group_start = np.flatnonzero(np.r_[True, query[1:] != query[:-1]])
+        rank = np.arange(len(query)) - np.repeat(group_start, np.diff(np.r_[group_start, len(query)]))
+        keep = rank < FLOCK_MAX_NEIGHBORS
+        query, target, distance = query[keep], target[keep], distance[keep]
+
+        diff = position[rows[query]] - position[target]
+        diff /= np.maximum(distance, 2.0)[:, None]
+        diff[distance <= 0] = 0
+        size = len(rows)
+        total = np.bincount(query, minlength=size)
+        sums = lambda values: np.stack([np.bincount(query, values[:, k], minlength=size) for k in (0, 1)], axis=1)
+        separation = sums(diff)
+        alignment = sums(velocity[target])
+        center_of_mass = sums(position[target])
+
+        flock = np.flatnonzero(total)
+        separation, _ = _normalized(separation[flock])
+        alignment, _ = _normalized(alignment[flock] / total[flock, None])
+        cohesion, _ = _normalized(center_of_mass[flock] / total[flock, None] - position[rows[flock]])
+        steering[flock] = (separation * FLOCK_SEPARATION_WEIGHT + alignment * FLOCK_ALIGNMENT_WEIGHT
+                           + cohesion * FLOCK_COHESION_WEIGHT)
+        speed[flock] = base_speed * (1 + total[flock] * FLOCK_SPEED_BOOST)
+    return steering, speed
+
+
+class ArrayEngine:
+    """Vectorized simulation backend keeping all agent state in NumPy arrays.
+
+    Agents of one species are updated together from the state at the start of
+    their phase (prey first, then predators, as in the object engine); conflicts
+    such as two prey reaching the same food are settled by list order.
+    """
+    def __init__(self, num_prey, num_predators, obstacles):
+        if np is None:
+            raise ImportError("The numpy backend requires NumPy to be installed.")
+        self.rng = np.random.default_rng(random.getrandbits(64))
+        self.next_uid = 0
+        self.last_starved = (0, 0) # (prada, prădători) morti de foame in ultimul update_agents
+        self.stats = Counter() # contoarele tuturor interogarilor CellIndex
+
+        self.prey = AgentArrays(SPEED_PREY)
+        self.predators = AgentArrays(SPEED_PREDATOR)
+        self._spawn(self.prey, self._random_positions(num_prey))
+        self._spawn(self.predators, self._random_positions(num_predators))
+
+        self.obstacle_position = np.array([(o.position.x, o.position.y) for o in obstacles], dtype=float).reshape(-1, 2)
+        self.obstacle_radius = np.array([o.radius for o in obstacles], dtype=float)
+        self.obstacle_field = ObstacleField(obstacles)
+
+        self.food_position = np.zeros((0, 2))
+        self.food_active = np.zeros(0, dtype=bool)
+        self.food_version = 0 # creste la fiecare schimbare a hranei (stratul desenat e refacut)
+        self.food_field = FoodField(obstacles) if FOOD_FIELD else None # inlocuieste array-urile de mai sus
+        if self.food_field is not None:
+            self.food_field.regrow(INITIAL_FOOD_COUNT)
+        else:
+            self.spawn_safe_food(INITIAL_FOOD_COUNT)
+
+    def _random_positions(self, count):
+        return self.rng.uniform((0, 0), (WORLD_WIDTH, WORLD_HEIGHT), size=(count, 2))
+
+    def _random_velocities(self, count):
+        velocities = self.rng.uniform(-1, 1, size=(count, 2))
+        velocities, nonzero = _normalized(velocities)
+        velocities[~nonzero] = (1, 0)
+        return velocities
 
-    def draw(self):
-        """Draw the predator as a rotated triangle with its trail."""
-        # Calculate the angle in degrees between the velocity and the x-axis
-        angle = self.velocity.angle_to(pygame.math.Vector2(1, 0))
+    def _spawn(self, agents, positions):
+        uids = np.arange(self.next_uid, self.next_uid + len(positions))
+        self.next_uid += len(positions)
+        agents.append(positions, self._random_velocities(len(positions)), uids)
 
-        # Define the triangle points relative to the origin, pointing right
-        point_list = [
-            pygame.math.Vector2(10, 0),   # Tip of the triangle
-            pygame.math.Vector2(-5, -5),  # Bottom left
-            pygame.math.Vector2(-5, 5),   # Top left
-        ]
+    def add_prey(self, count=1):
+        self._spawn(self.prey, self._random_positions(count))
 
-        # Rotate the points and translate to the predator's position
-        rotated_points = [self.position + p.rotate(-angle) for p in point_list]
+    def add_predator(self, count=1):
+        self._spawn(self.predators, self._random_positions(count))
 
-        # Draw the predator as a triangle
-        pygame.draw.polygon(screen, self.color, rotated_points)
+    def add_food(self, positions):
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if self.food_field is not None:
+            self.food_field.add(positions)
+            self.food_version += 1
+            return
+        self.food_position = np.concatenate([self.food_position, positions])
+        self.food_active = np.concatenate([self.food_active, np.ones(len(positions), dtype=bool)])
+        self.food_version += 1
+
+    def spawn_safe_food(self, count):
+        """Spawn up to count food items away from obstacles (10 tries per item)."""
+        candidates = self._random_positions(count * 10).reshape(count, 10, 2)
+        blocked, _, _ = self._near_obstacles(candidates, FOOD_SPAWN_MARGIN)
+        safe = ~blocked.any(axis=2)
+        placed = safe.any(axis=1)
+        first_safe = safe.argmax(axis=1)
+        self.add_food(candidates[placed, first_safe[placed]])
+
+    def _near_obstacles(self, positions, margin):
+        """For every position, its candidate obstacles from the field: (within radius + margin, diff, distance)."""
+        candidates = self.obstacle_field.candidates(positions)
+        valid = candidates >= 0
+        candidates = np.where(valid, candidates, 0)
+        diff = positions[..., None, :] - self.obstacle_position[candidates]
+        distance = np.hypot(diff[..., 0], diff[..., 1])
+        return valid & (distance < self.obstacle_radius[candidates] + margin), diff, distance
+
+    def _avoid_obstacles(self, positions):
+        """Vectorized Agent.avoid_obstacles for many agents at once."""
+        steering = np.zeros_like(positions)
+        if not len(self.obstacle_radius):
+            return steering
+        close, diff, distance = self._near_obstacles(positions, OBSTACLE_SAFE_MARGIN)
+        close &= distance > 0
+        safe_distance = np.where(close, distance, 1.0)
+        push = np.where(close[..., None], diff / (safe_distance * safe_distance)[..., None], 0.0)
+        steering, _ = _normalized(push.sum(axis=1))
+        return steering * OBSTACLE_AVOID_WEIGHT
+
+    @staticmethod
+    def _steer(velocity, steering, rows):
+        """Add steering to velocity and renormalize, only where steering is non-zero."""
+        rows = rows & (np.hypot(steering[:, 0], steering[:, 1]) > 0)
+        combined, nonzero = _normalized(velocity[rows] + steering[rows])
+        velocity[np.flatnonzero(rows)[nonzero]] = combined[nonzero]
+
+    def _handle_reproduction(self, agents, considered):
+        """Vectorized Agent.decide_reproduction + apply_reproduction; returns positions of newborns."""
+        n = agents.count
+        position = agents.position[:n]
+        velocity = agents.velocity[:n]
+        state = agents.state[:n]
+        energy = agents.energy[:n]
+
+        state[considered & (state == STATE_ACTIVE) & (energy >= ENERGY_TO_REPRODUCE)] = STATE_SEEKING_MATE
+        state[considered & (state == STATE_SEEKING_MATE) & (energy < ENERGY_TO_REPRODUCE)] = STATE_ACTIVE
+
+        seekers = np.flatnonzero(considered & (state == STATE_SEEKING_MATE))
+        if seekers.size:
+            partner, distance = self._nearest(position, FLOCK_DETECTION_RADIUS, position[seekers],
+                                              mask=state == STATE_SEEKING_MATE, exclude=seekers)
+            has_partner = partner >= 0
+            direction, nonzero = _normalized(position[partner[has_partner]] - position[seekers[has_partner]])
+            velocity[seekers[has_partner][nonzero]] = direction[nonzero]
+
+            # Perechile se formeaza in ordinea listei, ca in engine-ul cu obiecte
+            for i, j in zip(seekers[distance < MATING_DISTANCE], partner[distance < MATING_DISTANCE]):
+                if state[i] == STATE_SEEKING_MATE and state[j] == STATE_SEEKING_MATE:
+                    for a, b in ((i, j), (j, i)):
+                        state[a] = STATE_MATING
+                        agents.mating_timer[a] = MATING_FRAMES
+                        velocity[a] = 0
+                        agents.partner[a] = agents.uid[b]
+
+        mating = considered & (state == STATE_MATING)
+        agents.mating_timer[:n][mating] -= 1
+        finished = np.flatnonzero(mating & (agents.mating_timer[:n] <= 0))
+        if not finished.size:
+            return np.zeros((0, 2))
+
+        energy[finished] -= ENERGY_REPRODUCE_COST
+        state[finished] = STATE_ACTIVE
+        # Un singur pui pe pereche: il face partenerul cu uid-ul mai mare
+        parents = finished[agents.uid[finished] > agents.partner[finished]]
+        parents = parents[agents.partner[parents] >= 0]
+        agents.partner[finished] = -1
+        offsets = self.rng.choice([-CHILD_SPAWN_OFFSET, CHILD_SPAWN_OFFSET], size=(len(parents), 2))
+        children = position[parents] + offsets
+        np.clip(children, 0, (WORLD_WIDTH, WORLD_HEIGHT), out=children)
+        return children
+
+    def _update_position(self, agents, rows):
+        """Vectorized Agent.update_position and _bounce_off_walls for the given rows; returns how many starved."""
+        n = agents.count
+        moving = rows & (agents.state[:n] != STATE_MATING)
+        energy = agents.energy[:n]
+        energy[moving] -= ENERGY_LOSS_PER_FRAME
+        starved = moving & (energy <= 0)
+        agents.alive[:n][starved] = False
+        moving &= ~starved
+
+        speed = agents.speed[:n]
+        speed[moving] = np.minimum(speed[moving], MAX_SPEED)
+        position = agents.position[:n]
+        velocity = agents.velocity[:n]
+        position[moving] += velocity[moving] * speed[moving, None]
+
+        bounds = (WORLD_WIDTH, WORLD_HEIGHT)
+        for axis in (0, 1):
+            outside = moving & ((position[:, axis] < 0) | (position[:, axis] > bounds[axis]))
+            velocity[outside, axis] *= -1
+            position[moving, axis] = np.clip(position[moving, axis], 0, bounds[axis])
+        rows = np.flatnonzero(moving)
+        agents.trails.push_many(rows, position[rows])
+        return int(starved.sum())
+
+    def _flocking(self, rows):
+        """Vectorized Prey.apply_flocking for the given prey rows; returns (steering, speed)."""
+        prey = self.prey
+        n = prey.count
+        return _flock_steering(prey.position[:n], prey.velocity[:n], prey.alive[:n], rows, prey.base_speed, self.stats)
+
+    def _nearest(self, targets, cell_size, queries, max_radius=None, mask=None, exclude=None):
+        """CellIndex(targets, ...).nearest(queries, ...); TiledEngine spreads it over processes."""
+        return CellIndex(targets, cell_size, mask=mask, stats=self.stats).nearest(queries, max_radius=max_radius, exclude=exclude)
+
+    def _pairs(self, targets, cell_size, queries, radius, mask=None):
+        """CellIndex(targets, ...).pairs(queries, radius); TiledEngine spreads it over processes."""
+        return CellIndex(targets, cell_size, mask=mask, stats=self.stats).pairs(queries, radius)
+
+    def _update_prey(self, flocking_enabled):
+        """Vectorized Prey.update for every prey; returns (newborns, starved)."""
+        prey = self.prey
+        n = prey.count
+        position = prey.position[:n]
+        velocity = prey.velocity[:n]
+        state = prey.state[:n]
+        energy = prey.energy[:n]
+        alive = prey.alive[:n].copy()
+
+        mating = alive & (state == STATE_MATING)
+        free = alive & ~mating
+        avoidance = self._avoid_obstacles(position)
+
+        # Fuga de prădători are prioritate fata de reproducere
+        predators = self.predators
+        threat, _ = self._nearest(predators.position[:predators.count], PREY_VISION_RADIUS, position,
+                                  max_radius=PREY_VISION_RADIUS)
+        fleeing = free & (threat >= 0)
+        state[fleeing] = STATE_ACTIVE
+        rows = np.flatnonzero(fleeing)
+        away, nonzero = _normalized(position[rows] - predators.position[threat[rows]])
+        velocity[rows[nonzero]] = away[nonzero]
+        self._steer(velocity, avoidance, fleeing)
+
+        calm = free & ~fleeing
+        breeding = calm & ((energy >= ENERGY_TO_REPRODUCE) | (state == STATE_SEEKING_MATE))
+        children = self._handle_reproduction(prey, mating | breeding)
+        self._steer(velocity, avoidance, breeding & (state == STATE_SEEKING_MATE))
+
+        active = np.flatnonzero(calm & ~breeding & (state == STATE_ACTIVE))
+        steering = avoidance[active]
+        if flocking_enabled and active.size:
+            flock, flock_speed = self._flocking(active)
+            prey.speed[active] = flock_speed
+            steering = steering + flock
+
+        hungry = active[energy[active] < ENERGY_TO_REPRODUCE]
+        if self.food_field is not None:
+            # Fiecare celula cu hrana e o tinta; dintr-o celula se mananca o unitate pe frame
+            food_cells, food_position = self.food_field.occupied()
+            food_active = np.ones(len(food_cells), dtype=bool)
+        else:
+            food_position, food_active = self.food_position, self.food_active
+        if hungry.size and food_active.any():
+            food, distance = self._nearest(food_position, PREY_VISION_RADIUS * 2, position[hungry],
+                                           max_radius=PREY_VISION_RADIUS * 2, mask=food_active)
+            eating = (food >= 0) & (distance < EAT_DISTANCE)
+            # Daca doi indivizi ajung la aceeasi hrana, o mananca primul din lista
+            eaters, first = np.unique(food[eating], return_index=True)
+            winners = hungry[eating][first]
+            if self.food_field is not None:
+                self.food_field.take(food_cells[eaters])
+            else:
+                self.food_active[eaters] = False
+            if len(eaters):
+                self.food_version += 1
+            energy[winners] = np.minimum(energy[winners] + ENERGY_FROM_FOOD, ENERGY_MAX)
+
+            seeking_food = (food >= 0) & ~eating
+            direction, _ = _normalized(food_position[food[seeking_food]] - position[hungry[seeking_food]])
+            food_vector = np.zeros((len(active), 2))
+            food_vector[np.searchsorted(active, hungry[seeking_food])] = direction * FOOD_STEER_WEIGHT
+            steering = steering + food_vector
+
+        final, nonzero = _normalized(velocity[active] + steering)
+        velocity[active[nonzero]] = final[nonzero]
+
+        starved = self._update_position(prey, alive)
+        self._spawn(prey, children)
+        return len(children), starved
+
+    def _update_predators(self):
+        """Vectorized Predator.update for every predator; returns (newborns, starved)."""
+        predators = self.predators
+        n = predators.count
+        position = predators.position[:n]
+        velocity = predators.velocity[:n]
+        state = predators.state[:n]
+        alive = predators.alive[:n].copy()
+
+        avoidance = self._avoid_obstacles(position)
+        children = self._handle_reproduction(predators, alive)
+
+        seeking = alive & (state == STATE_SEEKING_MATE)
+        self._steer(velocity, avoidance, seeking)
+        others = alive & ~seeking
+
+        prey = self.prey
+        target = np.full(n, -1, dtype=np.int64)
+        if prey.count:
+            target[others], _ = self._nearest(prey.position[:prey.count], FLOCK_DETECTION_RADIUS, position[others])
+        hunting = others & (target >= 0)
+        rows = np.flatnonzero(hunting)
+        direction, nonzero = _normalized(prey.position[target[rows]] - position[rows])
+        velocity[rows[nonzero]] = direction[nonzero]
+
+        # Predator.hunt se misca inainte de a aplica evitarea obstacolelor
+        wandering = others & ~hunting
+        self._steer(velocity, avoidance, wandering)
+        starved = self._update_position(predators, seeking | others)
+        predators.energy[:n][hunting] -= HUNT_ENERGY_COST
+        self._steer(velocity, avoidance, hunting)
+
+        self._spawn(predators, children)
+        return len(children), starved
+
+    def update_agents(self, flocking_enabled):
+        """Advance prey then predators by one frame; returns (prey births, predator births).
+
+        The agents that starved are counted in last_starved; handle_collisions drops them.
+        """
+        if self.food_field is not None:
+            if len(self.food_field.regrow(INITIAL_FOOD_COUNT, FOOD_FIELD_REGROWTH)):
+                self.food_version += 1
+        else:
+            missing = INITIAL_FOOD_COUNT - len(self.food_active)
+            while missing > 0:
+                self.spawn_safe_food(missing)
+                missing = INITIAL_FOOD_COUNT - len(self.food_active)
+        prey_births, prey_starved = self._update_prey(flocking_enabled)
+        predator_births, predator_starved = self._update_predators()
+        self.last_starved = (prey_starved, predator_starved)
+        return prey_births, predator_births
+
+    def handle_collisions(self):
+        """Let predators eat touching prey, then drop dead agents and eaten food; returns the kills."""
+        prey, predators = self.prey, self.predators
+        kills = 0
+        hungry = predators.alive[:predators.count] & (predators.state[:predators.count] != STATE_MATING)
+        if prey.count and hungry.any():
+            energy = predators.energy[:predators.count]
+            for query, target, _ in self._pairs(prey.position[:prey.count], FLOCK_DETECTION_RADIUS,
+                                                predators.position[:predators.count], EAT_DISTANCE,
+                                                mask=prey.alive[:prey.count]):
+                keep = hungry[query] & prey.alive[target]
+                query, target = query[keep], target[keep]
+                if not len(query):
+                    continue
+                # Prada disputata revine prădătorului cu indexul cel mai mic
+                order = np.lexsort((query, target))
+                query, target = query[order], target[order]
+                first = np.r_[True, target[1:] != target[:-1]]
+                query, target = query[first], target[first]
+                prey.alive[target] = False
+                kills += len(target)
+                eaters, eaten = np.unique(query, return_counts=True)
+                energy[eaters] = np.minimum(energy[eaters] + eaten * ENERGY_FROM_PREY, ENERGY_MAX)
+
+        prey.compact()
+        predators.compact()
+        self.food_position = self.food_position[self.food_active]
+        self.food_active = self.food_active[self.food_active]
+        return kills
+
+    def snapshot(self):
+        """Arrays describing the engine, for checkpoints."""
+        arrays = {"food_position": self.food_position, "food_active": self.food_active}
+        for species, agents in (("prey", self.prey), ("predators", self.predators)):
+            for name, _, _ in AgentArrays.FIELDS:
+                arrays[f"{species}_{name}"] = getattr(agents, name)[:agents.count]
+        meta = {"next_uid": self.next_uid, "rng": self.rng.bit_generator.state}
+        if self.food_field is not None:
+            field_arrays, meta["food_field"] = self.food_field.snapshot()
+            arrays.update({f"food_field_{name}": values for name, values in field_arrays.items()})
+        return arrays, meta
+
+    def restore(self, arrays, meta):
+        """Inverse of snapshot()."""
+        self.food_position = arrays["food_position"].copy()
+        self.food_active = arrays["food_active"].copy()
+        self.food_version += 1
+        for species, agents in (("prey", self.prey), ("predators", self.predators)):
+            count = len(arrays[f"{species}_uid"])
+            agents.count = 0
+            agents._reserve(count)
+            for name, _, _ in AgentArrays.FIELDS:
+                getattr(agents, name)[:count] = arrays[f"{species}_{name}"]
+            agents.trails.clear_many(slice(0, count))
+            agents.count = count
+        self.next_uid = meta["next_uid"]
+        self.rng.bit_generator.state = meta["rng"]
+        self.food_field = None
+        if "food_field" in meta:
+            self.food_field = FoodField(self.obstacle_field.obstacles, meta["food_field"]["cell_size"])
+            self.food_field.restore({"counts": arrays["food_field_counts"]}, meta["food_field"])
+
+    def draw_food(self, sprites, surface, camera):
+        if self.food_field is not None:
+            self.food_field.draw(surface, camera)
+            return
+        food = self.food_position[self.food_active]
+        food = food[camera.visible_rows(food, 4 / camera.zoom)]
+        sprites.draw_food(surface, (self.food_version, camera.key), camera.project_array(food).tolist())
+
+    def visible_trails(self, camera):
+        """(trail buffer, rows, colors) of the prey and of the predators near the view."""
+        margin = TRAIL_LENGTH * MAX_SPEED + 12 / camera.zoom
+        groups = []
+        for agents, color in ((self.prey, COLOR_PREY), (self.predators, COLOR_PREDATOR)):
+            rows = np.arange(agents.count)[camera.visible_rows(agents.position[:agents.count], margin)]
+            palette = state_palette(color)
+            groups.append((agents.trails, rows, [palette[state] for state in agents.state[rows].tolist()]))
+        return groups
+
+    def draw_agents(self, sprites, camera, doreturn=False):
+        prey, predators = self.prey, self.predators
+        velocity = predators.velocity[:predators.count]
+        return draw_agent_arrays(sprites, camera, prey.position[:prey.count], prey.state[:prey.count],
+                                 predators.position[:predators.count], np.degrees(np.arctan2(velocity[:, 1], velocity[:, 0])),
+                                 predators.state[:predators.count], doreturn)
+
+
+_TILE_ARENA = {} # segmentul de memorie partajata deschis de procesul worker curent
+
+
+def _tile_task(task):
+    """Answer, in a worker process, the part of a TiledEngine query that falls in one strip.
+
+    Returns (query rows of the strip, results for those rows, neighbor-query counters).
+    """
+    kind, arena_name, layout, (tile, tiles), params = task
+    if arena_name not in _TILE_ARENA:
+        for arena in _TILE_ARENA.values():
+            arena.close()
+        _TILE_ARENA.clear()
+        _TILE_ARENA[arena_name] = shared_memory.SharedMemory(name=arena_name)
+    buffer = _TILE_ARENA[arena_name].buf
+    arrays = {name: np.ndarray(shape, dtype, buffer, offset) for name, (offset, dtype, shape) in layout.items()}
+    stats = Counter()
+
+    queries = arrays["position"][arrays["rows"]] if kind == "flock" else arrays["queries"]
+    rows = np.flatnonzero(_tile_of(queries, tiles) == tile)
+    targets = arrays.get("targets", arrays.get("position"))
+    radius = params[-1]
+    # Fasia plus un halou cat raza interogarii (+1 px pentru rotunjiri): toti vecinii posibili
+    low = tile * WORLD_WIDTH / tiles - radius - 1 if tile > 0 else -np.inf
+    high = (tile + 1) * WORLD_WIDTH / tiles + radius + 1 if tile < tiles - 1 else np.inf
+    halo = (targets[:, 0] >= low) & (targets[:, 0] < high)
+    if "mask" in arrays:
+        halo &= arrays["mask"]
+
+    if kind == "flock":
+        base_speed, _ = params
+        result = _flock_steering(arrays["position"], arrays["velocity"], halo, arrays["rows"][rows], base_speed, stats)
+    else:
+        cell_size, _ = params
+        index = CellIndex(targets, cell_size, mask=halo, stats=stats)
+        if kind == "nearest":
+            exclude = arrays["exclude"][rows] if "exclude" in arrays else None
+            result = index.nearest_within(queries[rows], radius, exclude=exclude)
+        else:
+            chunks = list(index.pairs(queries[rows], radius))
+            query, target, distance = (np.concatenate(parts) for parts in zip(*chunks)) if chunks else \
+                (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0))
+            result = (rows[query], target, distance)
+    return rows, result, stats
+
+
+def _init_tile_worker(parameters):
+    # Workerii pornesc cu valorile implicite; preiau constantele procesului principal (ex. --world)
+    globals().update(parameters)
+
+
+def _tile_of(positions, tiles):
+    """Index of the vertical strip holding each position."""
+    return np.clip(np.floor(positions[:, 0] * tiles / WORLD_WIDTH), 0, tiles - 1).astype(np.int64)
+
+
+def _release_tile_resources(resources):
+    if resources["pool"] is not None:
+        resources["pool"].shutdown()
+    if resources["arena"] is not None:
+        resources["arena"].close()
+        resources["arena"].unlink()
+    resources["pool"] = resources["arena"] = None
+
+
+class TiledEngine(ArrayEngine):
+    """ArrayEngine whose neighbor queries are split over worker processes.
+
+    The world is cut into vertical strips, one per worker. The arrays a query
+    needs are copied once into shared memory; each worker answers the queries
+    whose position lies in its strip, looking only at the targets inside the
+    strip plus a halo as wide as the query radius, so it sees exactly the
+    neighbors a single process would. Agent state stays in this process, so
+    agents crossing strips, births and deaths need no reconciliation and a run
+    matches the numpy backend frame for frame.
+    """
+    def __init__(self, num_prey, num_predators, obstacles, workers=None):
+        super().__init__(num_prey, num_predators, obstacles)
+        self.workers = workers or TILE_WORKERS or os.cpu_count() or 1
+        # Pornite la prima interogare mare; eliberate de close() sau cand engine-ul dispare
+        self._resources = {"pool": None, "arena": None}
+        self._finalizer = weakref.finalize(self, _release_tile_resources, self._resources)
+
+    def close(self):
+        """Stop the worker processes and free the shared memory."""
+        self._finalizer()
+
+    def _share(self, arrays):
+        """Copy arrays into the shared arena; returns (arena name, layout)."""
+        layout, size = {}, 0
+        for name, values in arrays.items():
+            layout[name] = (size, values.dtype.str, values.shape)
+            size += -(-values.nbytes // 64) * 64 # aliniat la 64 de octeti
+        arena = self._resources["arena"]
+        if arena is None or arena.size < size + 64:
+            if arena is not None:
+                arena.close()
+                arena.unlink()
+            arena = shared_memory.SharedMemory(create=True, size=max(size + 64, 2 * (arena.size if arena else 0)))
+            self._resources["arena"] = arena
+        for name, values in arrays.items():
+            offset, dtype, shape = layout[name]
+            np.ndarray(shape, dtype, arena.buf, offset)[...] = values
+        return arena.name, layout
+
+    def _map_tiles(self, kind, params, **arrays):
+        """Run one query on every strip; returns [(rows, result)] and merges the counters."""
+        if self._resources["pool"] is None:
+            parameters = {name: value for name, value in globals().items()
+                          if name.isupper() and isinstance(value, (int, float, str, tuple))}
+            self._resources["pool"] = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                                          initializer=_init_tile_worker, initargs=(parameters,))
+        name, layout = self._share({key: np.ascontiguousarray(values) for key, values in arrays.items() if values is not None})
+        tasks = [(kind, name, layout, (tile, self.workers), params) for tile in range(self.workers)]
+        results = []
+        for rows, result, stats in self._resources["pool"].map(_tile_task, tasks):
+            self.stats.update(stats)
+            results.append((rows, result))
+        return results
+
+    def _nearest(self, targets, cell_size, queries, max_radius=None, mask=None, exclude=None):
+        if len(queries) + len(targets) < TILE_MIN_AGENTS:
+            return super()._nearest(targets, cell_size, queries, max_radius, mask, exclude)
+        found = np.full(len(queries), -1, dtype=np.int64)
+        found_distance = np.full(len(queries), np.inf)
+        radius = cell_size if max_radius is None else max_radius
+        for rows, (tile_found, tile_distance) in self._map_tiles(
+                "nearest", (cell_size, radius), targets=targets, queries=queries, mask=mask, exclude=exclude):
+            found[rows] = tile_found
+            found_distance[rows] = tile_distance
+        if max_radius is None:
+            # Cei fara tinta in raza unei celule: scanare completa, ca in CellIndex.nearest
+            CellIndex(targets, cell_size, mask=mask, stats=self.stats).scan_missing(queries, found, found_distance, exclude=exclude)
+        return found, found_distance
+
+    def _pairs(self, targets, cell_size, queries, radius, mask=None):
+        if len(queries) + len(targets) < TILE_MIN_AGENTS:
+            return super()._pairs(targets, cell_size, queries, radius, mask)
+        results = self._map_tiles("pairs", (cell_size, radius), targets=targets, queries=queries, mask=mask)
+        # O singura bucata, ca disputele sa se rezolve peste toate fasiile odata
+        return [tuple(np.concatenate(parts) for parts in zip(*(result for _, result in results)))]
+
+    def _flocking(self, rows):
+        prey = self.prey
+        n = prey.count
+        if len(rows) + n < TILE_MIN_AGENTS:
+            return super()._flocking(rows)
+        steering = np.zeros((len(rows), 2))
+        speed = np.full(len(rows), prey.base_speed)
+        for tile_rows, (tile_steering, tile_speed) in self._map_tiles(
+                "flock", (prey.base_speed, FLOCK_DETECTION_RADIUS), position=prey.position[:n],
+                velocity=prey.velocity[:n], mask=prey.alive[:n], rows=rows):
+            steering[tile_rows] = tile_steering
+            speed[tile_rows] = tile_speed
+        return steering, speed
+
+
+def state_palette(base_color):
+    """Draw color of each state code, as Agent.color does for the object backend."""
+    return (base_color, COLOR_MATING, COLOR_MATING_ACTION)
+
+
+class SpriteBatch:
+    """Batched renderer: cached sprites drawn with one Surface.blits call per group.
+
+    Prey circles are pre-rendered per color, predator triangles per color and
+    heading (quantized to SPRITE_HEADING_STEPS), and food lives on a screen-sized
+    layer that is redrawn only when the caller's food version key changes.
+    Agents are given as positions plus codes indexing into a palette of colors.
+    """
+
+    def __init__(self):
+        self.sprites = {}
+        self.food_layer = None
+        self.food_key = None
+
+    def _sprite(self, key, draw, size):
+        # Primitiva e desenata o singura data in centrul unei suprafete; pastram doar
+        # dreptunghiul ocupat si decalajul lui fata de centru
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            scratch = pygame.Surface((2 * size + 1, 2 * size + 1))
+            scratch.fill(SPRITE_COLORKEY)
+            scratch.set_colorkey(SPRITE_COLORKEY)
+            draw(scratch, (size, size))
+            box = scratch.get_bounding_rect()
+            image = scratch.subsurface(box).copy()
+            image.set_colorkey(SPRITE_COLORKEY)
+            if pygame.display.get_surface() is not None:
+                image = image.convert()
+            sprite = self.sprites[key] = (image, box.x - size, box.y - size)
+        return sprite
+
+    def _circle(self, color):
+        return self._sprite(("circle", color), lambda surface, center: pygame.draw.circle(surface, color, center, PREY_RADIUS),
+                            PREY_RADIUS + 1)
+
+    def _triangle(self, color, step):
+        angle = step * 360 / SPRITE_HEADING_STEPS
+        def draw(surface, center):
+            points = [pygame.math.Vector2(center) + pygame.math.Vector2(point).rotate(angle) for point in PREDATOR_SHAPE]
+            pygame.draw.polygon(surface, color, points)
+        return self._sprite(("triangle", color, step), draw, 12)
+
+    def draw_prey(self, surface, positions, codes, palette, doreturn=False):
+        """Blit a prey circle at every (x, y) position, colored palette[code].
+
+        With doreturn, the list of drawn Rects is returned (for dirty-rect updates).
+        """
+        sprites = [self._circle(color) for color in palette]
+        if np is None:
+            return surface.blits([(sprites[code][0], (int(x) + sprites[code][1], int(y) + sprites[code][2]))
+                                  for (x, y), code in zip(positions, codes)], doreturn=doreturn)
+        return self._blit_indexed(surface, positions, sprites, np.asarray(codes, dtype=int), doreturn)
+
+    def draw_predators(self, surface, positions, headings, codes, palette, doreturn=False):
+        """Blit a predator triangle at every position, rotated to its heading in degrees."""
+        if np is None:
+            blits = []
+            for (x, y), heading, code in zip(positions, headings, codes):
+                step = round(heading * SPRITE_HEADING_STEPS / 360) % SPRITE_HEADING_STEPS
+                image, dx, dy = self._triangle(palette[code], step)
+                blits.append((image, (int(x) + dx, int(y) + dy)))
+            return surface.blits(blits, doreturn=doreturn)
+        steps = np.rint(np.asarray(headings, dtype=float) * SPRITE_HEADING_STEPS / 360).astype(int) % SPRITE_HEADING_STEPS
+        keys, inverse = np.unique(np.asarray(codes, dtype=int) * SPRITE_HEADING_STEPS + steps, return_inverse=True)
+        sprites = [self._triangle(palette[key // SPRITE_HEADING_STEPS], key % SPRITE_HEADING_STEPS) for key in keys.tolist()]
+        return self._blit_indexed(surface, positions, sprites, inverse.reshape(-1), doreturn)
+
+    def _blit_indexed(self, surface, positions, sprites, which, doreturn):
+        # Coordonatele se calculeaza vectorizat, iar blits primeste perechile direct;
+        # ordinea agentilor (si deci suprapunerile) ramane cea de la desenarea individuala
+        if not len(which):
+            return [] if doreturn else None
+        coords = np.asarray(positions, dtype=float).reshape(-1, 2).astype(int)
+        offsets = np.array([(dx, dy) for _, dx, dy in sprites], dtype=int)[which]
+        images = map([image for image, _, _ in sprites].__getitem__, which.tolist())
+        return surface.blits(zip(images, (coords + offsets).tolist()), doreturn=doreturn)
+
+    def draw_food(self, surface, key, positions):
+        """Blit the food layer, redrawing it first if `key` differs from the cached one."""
+        if self.food_layer is None or self.food_layer.get_size() != surface.get_size() or key != self.food_key:
+            layer = pygame.Surface(surface.get_size())
+            layer.fill(SPRITE_COLORKEY)
+            for x, y in positions:
+                pygame.draw.rect(layer, COLOR_FOOD, (x, y, 4, 4))
+            layer.set_colorkey(SPRITE_COLORKEY)
+            self.food_layer = layer.convert() if pygame.display.get_surface() is not None else layer
+            self.food_key = key
+        surface.blit(self.food_layer, (0, 0))
+
+
+def draw_agent_arrays(sprites, camera, prey_position, prey_state, predator_position, predator_heading, predator_state,
+                      doreturn=False):
+    """Cull agent arrays to the camera view and draw them (numpy backend and replay); headings in degrees."""
+    margin = 12 / camera.zoom # cat depaseste un sprite pozitia agentului
+    rows = camera.visible_rows(prey_position, margin)
+    prey_rects = sprites.draw_prey(screen, camera.project_array(prey_position[rows]), prey_state[rows],
+                                   state_palette(COLOR_PREY), doreturn)
+    rows = camera.visible_rows(predator_position, margin)
+    predator_rects = sprites.draw_predators(screen, camera.project_array(predator_position[rows]), predator_heading[rows],
+                                            predator_state[rows], state_palette(COLOR_PREDATOR), doreturn)
+    return prey_rects + predator_rects if doreturn else None
+
+
+class TextCache:
+    """Rendered HUD text, one surface per named slot, re-rendered only when its text or color changes."""
+
+    def __init__(self):
+        self.slots = {}
+        self.font = None
+
+    def text(self, name, text, color):
+        if FONT is not self.font:
+            # Fontul e recreat la fiecare init_display
+            self.slots.clear()
+            self.font = FONT
+        cached = self.slots.get(name)
+        if cached is None or cached[0] != text or cached[1] != color:
+            cached = self.slots[name] = (text, color, FONT.render(text, True, color))
+        return cached[2]
+
+
+def _agents_to_arrays(agents, prefix):
+    """Pack a list of Prey/Predator objects into arrays; partners become list indices."""
+    index_of = {agent.uid: row for row, agent in enumerate(agents)}
+    count = len(agents)
+    arrays = {
+        "position": np.array([(a.position.x, a.position.y) for a in agents], dtype=float).reshape(count, 2),
+        "velocity": np.array([(a.velocity.x, a.velocity.y) for a in agents], dtype=float).reshape(count, 2),
+        "speed": np.array([a.speed for a in agents], dtype=float),
+        "energy": np.array([a.energy for a in agents], dtype=float),
+        "state": np.array([a.state for a in agents], dtype=np.int8),
+        "mating_timer": np.array([a.mating_timer for a in agents], dtype=np.int32),
+        "alive": np.array([a.alive for a in agents], dtype=bool),
+        "idle_frames": np.array([a.idle_frames for a in agents], dtype=np.int32),
+        "uid": np.array([a.uid for a in agents], dtype=np.int64),
+        # Partenerul poate fi deja mort (mancat in timpul imperecherii): pastram si uid-ul lui
+        "partner_uid": np.array([a.partner_uid for a in agents], dtype=np.int64),
+        "trail_length": np.array([Agent.trails.size[a.trail_slot] for a in agents], dtype=np.int32),
+        "trail": np.zeros((count, Agent.trails.length, 2)),
+    }
+    arrays["partner"] = np.array([index_of.get(uid, -1) for uid in arrays["partner_uid"]], dtype=np.int64)
+    for row, agent in enumerate(agents):
+        for point, position in enumerate(Agent.trails.trail(agent.trail_slot)):
+            arrays["trail"][row, point] = position
+    return {f"{prefix}_{name}": values for name, values in arrays.items()}
+
+
+def _agents_from_arrays(agent_class, arrays, prefix):
+    """Inverse of _agents_to_arrays (consumes `random`; restore its state afterwards)."""
+    get = lambda name: arrays[f"{prefix}_{name}"]
+    agents = []
+    for row in range(len(get("uid"))):
+        agent = agent_class.create(position=pygame.math.Vector2(*get("position")[row]))
+        agent.velocity = pygame.math.Vector2(*get("velocity")[row])
+        agent.speed = float(get("speed")[row])
+        agent.energy = float(get("energy")[row])
+        agent.state = int(get("state")[row])
+        agent.color = state_palette(agent.base_color)[agent.state]
+        agent.mating_timer = int(get("mating_timer")[row])
+        agent.alive = bool(get("alive")[row])
+        agent.uid = int(get("uid")[row])
+        agent.partner_uid = int(get("partner_uid")[row])
+        if f"{prefix}_idle_frames" in arrays: # lipseste din checkpoint-urile mai vechi
+            agent.idle_frames = int(get("idle_frames")[row])
+        for x, y in get("trail")[row, :get("trail_length")[row]]:
+            Agent.trails.push(agent.trail_slot, x, y)
+        agents.append(agent)
+    return agents
 
-        # Draw the trail
-        self.draw_trail()
 
 class Simulation:
     """Class to manage the entire simulation."""
     # Inițializează simularea: agenți, obstacole, hrana etc
-    def __init__(self, num_prey=25, num_predators=5):
-        self.prey_list = [Prey() for _ in range(num_prey)]
-        self.predator_list = [Predator() for _ in range(num_predators)]
-        self.obstacles = [Obstacle() for _ in range(NUM_OBSTACLES)]
-        self.food_list = []
-        for _ in range(INITIAL_FOOD_COUNT):
-            self.spawn_safe_food()
-
-        self.history_prey = []
-        self.history_predators = []
-        self.history_prey_births = []
-        self.history_predator_births = []
-        self.time_steps = []
+    # backend="objects" - câte un obiect Prey/Predator per agent
+    # backend="numpy"   - toate starile în array-uri NumPy (ArrayEngine)
+    # backend="tiled"   - ca "numpy", cu interogarile de vecini impartite pe procese (TiledEngine)
+    # seed fixeaza generatorul `random` (si, prin el, pe cel al backend-ului numpy)
+    # history_path - fisier CSV în care istoricul populatiilor e scris pe parcurs
+    def __init__(self, num_prey=25, num_predators=5, backend="objects", seed=None, history_path=None):
+        if seed is not None:
+            random.seed(seed)
+        self.backend = backend
+        self.engine = None
+        self.food_version = 0 # creste la fiecare schimbare a hranei (stratul desenat e refacut)
+        if backend == "objects":
+            self.prey_list = EntityStore(Prey.create() for _ in range(num_prey))
+            self.predator_list = EntityStore(Predator.create() for _ in range(num_predators))
+            self.obstacles = [Obstacle() for _ in range(NUM_OBSTACLES)]
+            self.obstacle_field = ObstacleField(self.obstacles)
+            self.food_list = EntityStore()
+            self.food_field = FoodField(self.obstacles) if FOOD_FIELD else None # inlocuieste food_list
+            if self.food_field is not None:
+                self.food_field.regrow(INITIAL_FOOD_COUNT)
+            else:
+                for _ in range(INITIAL_FOOD_COUNT):
+                    self.spawn_safe_food()
+        elif backend in ("numpy", "tiled"):
+            self.prey_list = EntityStore()
+            self.predator_list = EntityStore()
+            self.obstacles = [Obstacle() for _ in range(NUM_OBSTACLES)]
+            self.food_list = EntityStore()
+            self.food_field = None # hrana e in engine (ArrayEngine.food_field)
+            self.obstacle_field = ObstacleField(self.obstacles)
+            engine_class = TiledEngine if backend == "tiled" else ArrayEngine
+            self.engine = engine_class(num_prey, num_predators, self.obstacles)
+        else:
+            raise ValueError(f"Unknown simulation backend: {backend!r}")
+
+        # Indexuri spatiale reconstruite o data pe frame în update_agents
+        self.prey_grid = SpatialGrid(FLOCK_DETECTION_RADIUS, slack=MAX_SPEED)
+        self.predator_grid = SpatialGrid(PREY_VISION_RADIUS, slack=MAX_SPEED)
+        self.food_grid = SpatialGrid(PREY_VISION_RADIUS * 2)
+        # Doar agentii care pot cauta partener in cadrul curent (vezi Agent.may_seek_mate)
+        self.prey_mate_grid = SpatialGrid(FLOCK_DETECTION_RADIUS, slack=MAX_SPEED)
+        self.predator_mate_grid = SpatialGrid(FLOCK_DETECTION_RADIUS, slack=MAX_SPEED)
+        self._grids_current = False # grid-urile de mai sus contin toti agentii si toata hrana (pentru culling)
+
+        self.history = HistoryRecorder(stream_path=history_path)
         self.freame_count = 0
 
         self.running = True
         self.flocking_enabled = True
+        self.lod = LodScheduler()
+        self._lod_enabled = LOD_ENABLED
+        self.synchronous_update = SYNCHRONOUS_UPDATE
+        self.update_threads = UPDATE_THREADS
+        self._decide_pool = None # (fire, ThreadPoolExecutor, finalizer) pornit la primul update sincron cu mai multe fire
+        self.profiler = FrameProfiler()
+        self.show_perf = False
+        self.checkpoint_path = None
+        self.checkpoint_every = 0
+        self.trajectory = None
+        self.telemetry = None
+        self.last_births = (0, 0) # (prada, prădători) nascuti in ultimul update_agents
+        self.last_starved = (0, 0) # (prada, prădători) morti de foame in ultimul update_agents
+        self.last_kills = 0 # prada mancata in ultimul handle_collisions
+        self.sprites = SpriteBatch()
+        self.trail_mode = TRAIL_MODE
+        self.trail_layer = None
+        self.hud = TextCache()
+        self.speed = FAST_FORWARD_SPEEDS[0] # pasi de simulare per frame afisat; None = maxim
+        self.paused = False
+        self.steps_per_second = 0.0
+        self._single_steps = 0
+        self._rate_start, self._rate_steps = time.perf_counter(), 0
+        self.dirty_rects = DIRTY_RECTS
+        self.background = None # fundal + hrana + obstacole, refacut doar cand se schimba hrana
+        self._background_key = None
+        self._drawn = None # zonele desenate peste fundal (None = frame-ul trecut a fost redesenat complet)
+        self.camera = Camera()
+        self._trail_view = None # pozitia camerei pentru care e valid stratul de trasee "fade"
+
+    @property
+    def lod_enabled(self):
+        """Whether quiet prey are updated at a lower rate (objects backend only)."""
+        return self._lod_enabled
+
+    @lod_enabled.setter
+    def lod_enabled(self, enabled):
+        self._lod_enabled = enabled
+        self._wake_all_prey()
+
+    def _wake_all_prey(self):
+        """Put every prey back to full rate (after agents or food were added from outside the step)."""
+        for prey in self.prey_list:
+            prey.idle_frames = 0
+
+    def record_trajectory(self, path=TRAJECTORY_FILE):
+        """Log every following frame to path, for playback with ReplayPlayer."""
+        self.trajectory = TrajectoryRecorder(path, self.obstacles)
+
+    def stream_telemetry(self, host=None, port=None):
+        """Publish per-frame counts and phase timings over UDP (see live_plot.py)."""
+        self.telemetry = TelemetryPublisher(host, port)
+
+    def _publish_telemetry(self):
+        if self.telemetry is None:
+            return
+        prey, predators = self.prey_count, self.predator_count
+        prey_births, predator_births = self.last_births
+        prey_starved, predator_starved = self.last_starved
+        # Decesele de prada includ si prada mancata (kills)
+        self.telemetry.publish(self.freame_count, prey, predators, self.food_count, prey_births, predator_births,
+                               prey_starved + self.last_kills, predator_starved,
+                               self.last_kills, self.profiler.current("update_agents"),
+                               self.profiler.current("handle_collisions"))
+
+    def _record_trajectory(self):
+        if self.trajectory is None:
+            return
+        if self.engine is not None:
+            species = [(agents.position[:agents.count], agents.velocity[:agents.count], agents.state[:agents.count])
+                       for agents in (self.engine.prey, self.engine.predators)]
+            if self.engine.food_field is not None:
+                food = self.engine.food_field.occupied()[1]
+            else:
+                food = self.engine.food_position[self.engine.food_active]
+        else:
+            species = [(np.array([(a.position.x, a.position.y) for a in agents], dtype=float).reshape(-1, 2),
+                        np.array([(a.velocity.x, a.velocity.y) for a in agents], dtype=float).reshape(-1, 2),
+                        np.array([a.state for a in agents], dtype=np.uint8))
+                       for agents in (self.prey_list, self.predator_list)]
+            if self.food_field is not None:
+                food = self.food_field.occupied()[1] # o pozitie per celula cu hrana
+            else:
+                food = np.array([(f.position.x, f.position.y) for f in self.food_list if f.active], dtype=float).reshape(-1, 2)
+        self.trajectory.record(self.freame_count, *species, food)
+
+    def enable_checkpoints(self, path=CHECKPOINT_FILE, every=1000):
+        """Save a checkpoint to path every `every` frames (during run and step)."""
+        self.checkpoint_path = path
+        self.checkpoint_every = every
+
+    def _maybe_checkpoint(self):
+        if self.checkpoint_every and self.freame_count % self.checkpoint_every == 0:
+            self.save_checkpoint(self.checkpoint_path)
+
+    def save_checkpoint(self, path=CHECKPOINT_FILE):
+        """Write the full simulation state as array dumps (.npz); safe against crashes mid-write."""
+        if np is None:
+            raise ImportError("Checkpoints require NumPy to be installed.")
+        self.history.flush()
+        history = self.history.state()
+        random_version, random_internal, random_gauss = random.getstate()
+        meta = {
+            "version": CHECKPOINT_VERSION,
+            "backend": self.backend,
+            "frame": self.freame_count,
+            "flocking_enabled": self.flocking_enabled,
+            "lod_enabled": self.lod_enabled,
+            "synchronous_update": self.synchronous_update,
+            "random": [random_version, random_gauss],
+            "next_agent_uid": Agent.next_uid,
+            "history": history["scalars"],
+            "world": [WORLD_WIDTH, WORLD_HEIGHT],
+        }
+        arrays = {
+            "random_internal": np.array(random_internal, dtype=np.int64),
+            "history_data": history["data"],
+            "history_buckets": history["buckets"],
+            "obstacle_position": np.array([(o.position.x, o.position.y) for o in self.obstacles], dtype=float).reshape(-1, 2),
+            "obstacle_radius": np.array([o.radius for o in self.obstacles], dtype=np.int64),
+            "food_position": np.array([(f.position.x, f.position.y) for f in self.food_list], dtype=float).reshape(-1, 2),
+            "food_active": np.array([f.active for f in self.food_list], dtype=bool),
+        }
+        if self.food_field is not None:
+            field_arrays, meta["food_field"] = self.food_field.snapshot()
+            arrays.update({f"food_field_{name}": values for name, values in field_arrays.items()})
+        if self.engine is not None:
+            engine_arrays, meta["engine"] = self.engine.snapshot()
+            arrays.update({f"engine_{name}": values for name, values in engine_arrays.items()})
+        arrays.update(_agents_to_arrays(self.prey_list, "prey"))
+        arrays.update(_agents_to_arrays(self.predator_list, "predators"))
+        arrays["meta"] = np.array(json.dumps(meta))
+
+        # Scriem intr-un fisier temporar si il redenumim: un checkpoint vechi nu se pierde
+        temporary = f"{path}.tmp.npz"
+        np.savez(temporary, **arrays)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load_checkpoint(cls, path=CHECKPOINT_FILE, history_path=None):
+        """Rebuild a Simulation from save_checkpoint(); it continues bit-for-bit."""
+        if np is None:
+            raise ImportError("Checkpoints require NumPy to be installed.")
+        with np.load(path) as snapshot:
+            arrays = {name: snapshot[name] for name in snapshot.files}
+        meta = json.loads(str(arrays["meta"]))
+        if meta["version"] != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {meta['version']}")
+        if meta.get("world", [SCREEN_WIDTH, SCREEN_HEIGHT]) != [WORLD_WIDTH, WORLD_HEIGHT]:
+            raise ValueError(f"Checkpoint was saved for a {meta['world'][0]}x{meta['world'][1]} world")
+
+        simulation = cls(num_prey=0, num_predators=0, backend=meta["backend"])
+        simulation.freame_count = meta["frame"]
+        simulation.flocking_enabled = meta["flocking_enabled"]
+        simulation._lod_enabled = meta.get("lod_enabled", False)
+        simulation.synchronous_update = meta.get("synchronous_update", False)
+
+        simulation.obstacles = []
+        for (x, y), radius in zip(arrays["obstacle_position"], arrays["obstacle_radius"]):
+            obstacle = Obstacle()
+            obstacle.position = pygame.math.Vector2(x, y)
+            obstacle.radius = int(radius)
+            simulation.obstacles.append(obstacle)
+        simulation.obstacle_field = ObstacleField(simulation.obstacles)
+        simulation.food_list = EntityStore()
+        for (x, y), active in zip(arrays["food_position"], arrays["food_active"]):
+            food = Food.create()
+            food.position = pygame.math.Vector2(x, y)
+            food.active = bool(active)
+            simulation.food_list.append(food)
+        simulation.food_field = None
+        if "food_field" in meta:
+            simulation.food_field = FoodField(simulation.obstacles, meta["food_field"]["cell_size"])
+            simulation.food_field.restore({"counts": arrays["food_field_counts"]}, meta["food_field"])
+        simulation.prey_list = EntityStore(_agents_from_arrays(Prey, arrays, "prey"))
+        simulation.predator_list = EntityStore(_agents_from_arrays(Predator, arrays, "predators"))
+
+        if simulation.engine is not None:
+            simulation.engine = type(simulation.engine)(0, 0, simulation.obstacles)
+            prefix = "engine_"
+            engine_arrays = {name[len(prefix):]: values for name, values in arrays.items() if name.startswith(prefix)}
+            simulation.engine.restore(engine_arrays, meta["engine"])
+
+        simulation.history.restore(arrays["history_data"], arrays["history_buckets"], meta["history"], history_path)
+        # La final: reconstructia de mai sus a consumat numere aleatoare si uid-uri
+        Agent.next_uid = meta["next_agent_uid"]
+        random_version, random_gauss = meta["random"]
+        random.setstate((random_version, tuple(int(v) for v in arrays["random_internal"]), random_gauss))
+        return simulation
 
     #mancarea sigura departe de obstacole
     def spawn_safe_food(self):
         """Spawn food away from obstacles."""
         for _ in range(10):
             potential_pos = pygame.math.Vector2(
-                random.uniform(0, SCREEN_WIDTH), 
-                random.uniform(0, SCREEN_HEIGHT)
+                random.uniform(0, WORLD_WIDTH), 
+                random.uniform(0, WORLD_HEIGHT)
             )
 
             safe = True
-            for obs in self.obstacles:
-                if potential_pos.distance_to(obs.position) < obs.radius + 35:
+            for obs in self.obstacle_field.near(potential_pos):
+                if potential_pos.distance_to(obs.position) < obs.radius + FOOD_SPAWN_MARGIN:
                     safe = False
                     break
             
             if safe:
-                new_food = Food()
+                new_food = Food.create()
                 new_food.position = potential_pos
                 self.food_list.append(new_food)
+                self.food_version += 1
                 return 
 
-    def plot_data(self):
-        """Generate and show plots for simulation history."""
+    def plot_data(self, interactive=True):
+        """Generate and show plots for simulation history (saved to PNG when not interactive)."""
+        plt = load_pyplot(interactive)
         # Set a pink background for figure and axes, and use black for text/borders
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8), sharex=True)
         pink_bg = "#f5c0ff"  # light pink
@@ -518,8 +3229,9 @@ class Simulation:
 
         # GRAFIC 1: Populația Totală
         # Prey = red, Predators = green
-        ax1.plot(self.time_steps, self.history_prey, label='Prey', color='red')
-        ax1.plot(self.time_steps, self.history_predators, label='Predators', color='green')
+        # Anvelope min/max: graficul ramane rapid si pe rulari foarte lungi
+        ax1.plot(*self.history.plot_series('prey'), label='Prey', color='red')
+        ax1.plot(*self.history.plot_series('predators'), label='Predators', color='green')
         ax1.set_title('Population Change Over Time')
         ax1.set_ylabel('Count')
         ax1.legend(facecolor=pink_bg, edgecolor='black')
@@ -527,8 +3239,8 @@ class Simulation:
 
         # GRAFIC 2: Rata Natalității (Nasteri pe frame)
         # Use softer shades for birth events to match main colors
-        ax2.plot(self.time_steps, self.history_prey_births, label='Prey Births', color='#ff0033', alpha=0.8, linewidth=0.6)
-        ax2.plot(self.time_steps, self.history_predator_births, label='Predator Births', color='#00cc44', alpha=0.8, linewidth=0.6)
+        ax2.plot(*self.history.plot_series('prey_births'), label='Prey Births', color='#ff0033', alpha=0.8, linewidth=0.6)
+        ax2.plot(*self.history.plot_series('predator_births'), label='Predator Births', color='#00cc44', alpha=0.8, linewidth=0.6)
         ax2.set_title('Birth Events')
         ax2.set_xlabel('Time (Frames)')
         ax2.set_ylabel('Newborns per Frame')
@@ -544,7 +3256,7 @@ class Simulation:
             for spine in ax.spines.values():
                 spine.set_edgecolor('black')
 
-        backend = matplotlib.get_backend()
+        backend = plt.get_backend()
         plt.tight_layout()
         if 'Agg' in backend:
             out_file = 'simulation_plots.png'
@@ -555,128 +3267,547 @@ class Simulation:
             plt.show()
 
     def run(self):
-        """Main loop of the simulation."""
+        """Main loop: fixed simulation timestep, `speed` steps per displayed frame."""
+        init_display()
+        profiler = self.profiler
+        pending = 0.0 # pasi de simulare datorati
         while self.running:
-            clock.tick(FRAME_RATE)
-            self.handle_events()
+            elapsed = clock.tick(FRAME_RATE) / 1000
+            with profiler.phase("handle_events"):
+                self.handle_events()
+
+            start = time.perf_counter()
+            if self.paused:
+                pending = 0.0
+                steps, self._single_steps = self._single_steps, 0
+                deadline = math.inf
+            elif self.speed is None:
+                # "max": simulam cat incape într-un frame, apoi desenam o data
+                steps, deadline = math.inf, start + 1 / FRAME_RATE
+            else:
+                # Restanta e limitata, ca o simulare care nu tine pasul sa nu o acumuleze la nesfarsit
+                pending = min(pending + elapsed * FRAME_RATE * self.speed, self.speed * MAX_FRAME_SKIP)
+                steps, deadline = int(pending), start + MAX_FRAME_SKIP / FRAME_RATE
+            done = 0
+            while done < steps and (done == 0 or time.perf_counter() < deadline):
+                self._simulate_frame()
+                done += 1
+            if self.speed is not None and not self.paused:
+                pending -= done
+            self._measure_rate(done)
+
+            with profiler.phase("render"):
+                self.render()
+            if not done:
+                profiler.end_frame()
+
+        close_display()
+        self.history.flush()
+        if self.trajectory is not None:
+            self.trajectory.close()
+        if self.telemetry is not None:
+            self.telemetry.close()
+        profiler.export()
+        self.plot_data()
+
+    def step(self, frames=1):
+        """Advance the simulation headless: no window, no events, no frame cap, no rendering."""
+        for _ in range(frames):
+            self._simulate_frame()
+
+    def _simulate_frame(self):
+        with self.profiler.phase("update_agents"):
             self.update_agents()
+        with self.profiler.phase("handle_collisions"):
             self.handle_collisions()
-            self.render()
-
-        pygame.quit()
-        self.plot_data()
+        self._end_frame()
+
+    def _measure_rate(self, steps):
+        """Update steps_per_second about twice a second (shown in the HUD)."""
+        now = time.perf_counter()
+        self._rate_steps += steps
+        if now - self._rate_start >= 0.5:
+            self.steps_per_second = self._rate_steps / (now - self._rate_start)
+            self._rate_start, self._rate_steps = now, 0
+
+    def _end_frame(self):
+        """Per-frame bookkeeping: telemetry, profiler counters, trajectory log, periodic checkpoint."""
+        self._publish_telemetry()
+        self._end_profiled_frame()
+        self._record_trajectory()
+        self._maybe_checkpoint()
+
+    def _end_profiled_frame(self):
+        """Move the neighbor-query counters of this frame into the profiler."""
+        stats = Counter()
+        for source in (self.prey_grid, self.predator_grid, self.food_grid, self.food_field, self.lod, self.engine):
+            if source is not None:
+                stats.update(source.stats)
+                source.stats.clear()
+        for name in ("distance_checks", "neighbor_queries", "neighbors_found", "idle_prey"):
+            self.profiler.count(name, stats[name])
+        self.profiler.end_frame()
 
     def handle_events(self):
         """Handle user input and events."""
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type == pygame.MOUSEWHEEL:
+                self.camera.zoom_at(CAMERA_ZOOM_STEP ** event.y, pygame.mouse.get_pos())
+            elif event.type == pygame.MOUSEMOTION and event.buttons[2]:  # Drag cu click dreapta
+                self.camera.pan(-event.rel[0], -event.rel[1])
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # Left click to add food
-                    mouse_pos = pygame.math.Vector2(event.pos)
+                    mouse_pos = self.camera.unproject(event.pos)
                     is_safe_click = True
-                    for obs in self.obstacles:
-                        if mouse_pos.distance_to(obs.position) < obs.radius + 20:
+                    for obs in self.obstacle_field.near(mouse_pos):
+                        if mouse_pos.distance_to(obs.position) < obs.radius + FOOD_CLICK_MARGIN:
                             is_safe_click = False
                             break
                     if is_safe_click:
-                        new_food = Food()
-                        new_food.position = mouse_pos
-                        self.food_list.append(new_food)
+                        self.add_food(mouse_pos)
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_p:
                     self.add_prey()
                 elif event.key == pygame.K_o:
                     self.add_predator()
                 elif event.key == pygame.K_f:
-                    self.food_list.append(Food())
+                    self.add_food()
                 elif event.key == pygame.K_b:
                     self.flocking_enabled = not self.flocking_enabled
+                elif event.key == pygame.K_l:
+                    self.lod_enabled = not self.lod_enabled
+                elif event.key == pygame.K_h:
+                    self.show_perf = not self.show_perf
+                elif event.key == pygame.K_SPACE:
+                    self.paused = not self.paused
+                elif event.key == pygame.K_n and self.paused:
+                    self._single_steps += 1
+                elif pygame.K_1 <= event.key < pygame.K_1 + len(FAST_FORWARD_SPEEDS):
+                    self.speed = FAST_FORWARD_SPEEDS[event.key - pygame.K_1]
+                elif event.key in (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN):
+                    dx = {pygame.K_LEFT: -1, pygame.K_RIGHT: 1}.get(event.key, 0)
+                    dy = {pygame.K_UP: -1, pygame.K_DOWN: 1}.get(event.key, 0)
+                    self.camera.pan(dx * CAMERA_PAN_STEP, dy * CAMERA_PAN_STEP)
+                elif event.key == pygame.K_0:
+                    self.camera = Camera()
 
     def add_prey(self):
         """Add a new prey to the simulation."""
-        self.prey_list.append(Prey())
+        if self.engine is not None:
+            self.engine.add_prey()
+        else:
+            self.prey_list.append(Prey.create())
+            self._grids_current = False
+            self._wake_all_prey()
 
     def add_predator(self):
         """Add a new predator to the simulation."""
-        self.predator_list.append(Predator())
+        if self.engine is not None:
+            self.engine.add_predator()
+        else:
+            self.predator_list.append(Predator.create())
+            self._grids_current = False
+            self._wake_all_prey()
+
+    def add_food(self, position=None):
+        """Add one food item, at a random position if none is given."""
+        if self.engine is None and self.food_field is None:
+            new_food = Food.create()
+            if position is not None:
+                new_food.position = pygame.math.Vector2(position)
+            self.food_list.append(new_food)
+            self.food_version += 1
+            self._grids_current = False
+            self._wake_all_prey()
+            return
+        # Engine-ul si campul de hrana pastreaza doar punctul: un Food luat din pool nu s-ar mai intoarce
+        if position is None:
+            position = (random.uniform(0, WORLD_WIDTH), random.uniform(0, WORLD_HEIGHT))
+        if self.engine is not None:
+            self.engine.add_food(tuple(position))
+        else:
+            self.food_field.add(tuple(position))
+            self._wake_all_prey()
+
+    @property
+    def prey_count(self):
+        """Number of prey currently in the simulation."""
+        return self.engine.prey.count if self.engine is not None else len(self.prey_list)
+
+    @property
+    def predator_count(self):
+        """Number of predators currently in the simulation."""
+        return self.engine.predators.count if self.engine is not None else len(self.predator_list)
+
+    @property
+    def food_count(self):
+        """Number of food items (units, with a food field) currently in the simulation."""
+        if self.engine is not None:
+            field = self.engine.food_field
+            return field.total if field is not None else int(self.engine.food_active.sum())
+        return self.food_field.total if self.food_field is not None else len(self.food_list)
 
     def update_agents(self):
         """Update all agents in the simulation."""
+        if self.engine is not None:
+            prey_births, predator_births = self.engine.update_agents(self.flocking_enabled)
+            self.last_starved = self.engine.last_starved
+        else:
+            prey_births, predator_births = self._update_agent_objects()
+        self.last_births = (prey_births, predator_births)
 
-        while len(self.food_list) < INITIAL_FOOD_COUNT:
-            self.spawn_safe_food()
+        self.history.record(self.freame_count, self.prey_count, self.predator_count, prey_births, predator_births)
+        self.freame_count += 1
+
+    def _update_agent_objects(self):
+        """Update the Prey/Predator objects; returns (prey births, predator births) and sets last_starved."""
+        food_slots = len(self.food_list.items)
+        if self.food_field is not None:
+            grown = self.food_field.regrow(INITIAL_FOOD_COUNT, FOOD_FIELD_REGROWTH)
+            food_grid = self.food_field # aceeasi interfata nearest() ca SpatialGrid
+        else:
+            while len(self.food_list) < INITIAL_FOOD_COUNT:
+                self.spawn_safe_food()
+            food_grid = self.food_grid
         
+        # Grid-urile indexeaza dupa slot (tombstone-urile sunt sarite, dar numarate)
+        self.food_grid.rebuild(self.food_list.items)
+        self.prey_grid.rebuild(self.prey_list.items)
+        self.predator_grid.rebuild(self.predator_list.items)
+        self.prey_mate_grid.rebuild(self.prey_list.items, where=Agent.may_seek_mate)
+        self.predator_mate_grid.rebuild(self.predator_list.items, where=Agent.may_seek_mate)
+
+        lod = self.lod if self.lod_enabled else None
+        if lod is not None:
+            if self.food_field is not None:
+                spawned = [pygame.math.Vector2(x, y) for x, y in self.food_field.centers(grown).tolist()]
+            else:
+                spawned = [food.position for food in self.food_list.items[food_slots:]]
+            for position in spawned:
+                lod.wake(self.prey_grid, position, PREY_VISION_RADIUS * 2)
+
+        if self.synchronous_update:
+            return self._update_agent_objects_synchronously(food_grid, lod)
+
+        # Cei morti de foame devin tombstone imediat; raman in grid-uri pana la frame-ul urmator
         new_prey = []
-        for prey in self.prey_list[:]:
-            child = prey.update(self.predator_list, self.prey_list, self.food_list, self.obstacles, self.flocking_enabled)
-            if child:
-                new_prey.append(child)
+        starved_prey = starved_predators = 0
+        for slot, prey in self.prey_list.entries():
+            if lod is not None and prey.idle_frames:
+                # Prada linistita: directia nu s-ar schimba, deci doar se misca
+                prey.idle_frames -= 1
+                prey.update_position()
+                lod.stats["idle_prey"] += 1
+            else:
+                child = prey.update(self.predator_grid, self.prey_grid, food_grid, self.obstacle_field,
+                                    self.flocking_enabled, self.prey_mate_grid)
+                if child:
+                    new_prey.append(child)
+                if lod is not None:
+                    prey.idle_frames = lod.idle_frames(prey, self.predator_grid, self.prey_grid, food_grid,
+                                                       self.obstacle_field, self.flocking_enabled)
+            if not prey.alive:
+                self.prey_list.kill(slot)
+                starved_prey += 1
         if new_prey:
             self.prey_list.extend(new_prey)
+            for child in new_prey:
+                self.prey_grid.insert(child)
+                if lod is not None:
+                    lod.wake(self.prey_grid, child.position, FLOCK_DETECTION_RADIUS)
 
         new_predators = []
-        for predator in self.predator_list[:]:
-            child = predator.update(self.prey_list, self.predator_list,self.obstacles)
+        for slot, predator in self.predator_list.entries():
+            child = predator.update(self.prey_grid, self.predator_grid, self.obstacle_field, self.predator_mate_grid)
             if child:
                 new_predators.append(child)
+            if not predator.alive:
+                self.predator_list.kill(slot)
+                starved_predators += 1
         if new_predators:
             self.predator_list.extend(new_predators)
+            for child in new_predators:
+                self.predator_grid.insert(child)
+                if lod is not None:
+                    lod.wake(self.prey_grid, child.position, PREY_VISION_RADIUS)
+        self._grids_current = True
+        self.last_starved = (starved_prey, starved_predators)
+        return len(new_prey), len(new_predators)
+
+    def _update_agent_objects_synchronously(self, food_grid, lod):
+        """Double-buffered variant of _update_agent_objects: decide from frame t, then apply.
+
+        Every agent first decides from the state all agents had at the start of
+        the frame (Prey.decide / Predator.decide only read), so the decisions
+        do not depend on the update order and can be computed in any chunking,
+        on update_threads threads. The conflicts are resolved afterwards: two
+        agents pair only if each chose the other, and food reached by several
+        prey feeds the first one in list order.
+        """
+        prey_entries = list(self.prey_list.entries())
+        predator_entries = list(self.predator_list.entries())
+        jobs = [prey for _, prey in prey_entries] + [predator for _, predator in predator_entries]
+
+        def decide(agents):
+            decisions = []
+            for agent in agents:
+                if isinstance(agent, Predator):
+                    decisions.append(agent.decide(self.prey_grid, self.predator_grid, self.obstacle_field,
+                                                  self.predator_mate_grid))
+                elif lod is not None and agent.idle_frames:
+                    decisions.append(None) # prada linistita doar se misca
+                else:
+                    decisions.append(agent.decide(self.predator_grid, self.prey_grid, food_grid, self.obstacle_field,
+                                                  self.flocking_enabled, self.prey_mate_grid))
+            return decisions
+
+        chunks = [jobs[start:start + UPDATE_CHUNK] for start in range(0, len(jobs), UPDATE_CHUNK)]
+        if self.update_threads > 1 and len(chunks) > 1:
+            threads, pool, shutdown = self._decide_pool or (0, None, None)
+            if threads != self.update_threads:
+                if shutdown is not None:
+                    shutdown()
+                pool = ThreadPoolExecutor(self.update_threads)
+                # Firele se opresc odata cu simularea (ca procesele TiledEngine)
+                self._decide_pool = (self.update_threads, pool, weakref.finalize(self, pool.shutdown))
+            results = pool.map(decide, chunks)
+        else:
+            results = map(decide, chunks)
+        decisions = [decision for chunk in results for decision in chunk]
+        prey_decisions, predator_decisions = decisions[:len(prey_entries)], decisions[len(prey_entries):]
+
+        # Perechile: doar cele alese reciproc; ceilalti merg spre partener fara sa se imperecheze
+        for agents, agent_decisions, redecide in (
+                ([prey for _, prey in prey_entries], prey_decisions,
+                 lambda prey: prey.decide(self.predator_grid, self.prey_grid, food_grid, self.obstacle_field,
+                                          self.flocking_enabled, self.prey_mate_grid, pairing=False)),
+                ([predator for _, predator in predator_entries], predator_decisions,
+                 lambda predator: predator.decide(self.prey_grid, self.predator_grid, self.obstacle_field,
+                                                  self.predator_mate_grid, pairing=False))):
+            chosen = {id(agent): decision.partner for agent, decision in zip(agents, agent_decisions)
+                      if decision is not None and decision.partner is not None}
+            if not chosen:
+                continue
+            for row, agent in enumerate(agents):
+                partner = chosen.get(id(agent))
+                if partner is not None and chosen.get(id(partner)) is not agent:
+                    agent_decisions[row] = redecide(agent)
+            for row, agent in enumerate(agents):
+                partner = chosen.get(id(agent))
+                if partner is not None and chosen.get(id(partner)) is agent:
+                    agent.start_mating(partner)
+                    agent_decisions[row] = agent_decisions[row]._replace(partner=None)
 
-        self.history_prey.append(len(self.prey_list))
-        self.history_predators.append(len(self.predator_list))
-        self.history_prey_births.append(len(new_prey))
-        self.history_predator_births.append(len(new_predators))
-        self.time_steps.append(self.freame_count)
-        self.freame_count += 1
+        new_prey = []
+        starved_prey = starved_predators = 0
+        for (slot, prey), decision in zip(prey_entries, prey_decisions):
+            if lod is not None and prey.idle_frames:
+                prey.idle_frames -= 1
+                prey.update_position()
+                lod.stats["idle_prey"] += 1
+            else:
+                child = prey.apply(decision)
+                if child:
+                    new_prey.append(child)
+            if not prey.alive:
+                self.prey_list.kill(slot)
+                starved_prey += 1
+        new_predators = []
+        for (slot, predator), decision in zip(predator_entries, predator_decisions):
+            child = predator.apply(decision)
+            if child:
+                new_predators.append(child)
+            if not predator.alive:
+                self.predator_list.kill(slot)
+                starved_predators += 1
+
+        self.prey_list.extend(new_prey)
+        self.predator_list.extend(new_predators)
+        for child in new_prey:
+            self.prey_grid.insert(child)
+        for child in new_predators:
+            self.predator_grid.insert(child)
+        if lod is not None:
+            # Pauzele se calculeaza din starea frame-ului t+1, dupa ce toti s-au miscat
+            for (_, prey), decision in zip(prey_entries, prey_decisions):
+                if decision is not None:
+                    prey.idle_frames = lod.idle_frames(prey, self.predator_grid, self.prey_grid, food_grid,
+                                                       self.obstacle_field, self.flocking_enabled)
+            for child in new_prey:
+                lod.wake(self.prey_grid, child.position, FLOCK_DETECTION_RADIUS)
+            for child in new_predators:
+                lod.wake(self.prey_grid, child.position, PREY_VISION_RADIUS)
+        self._grids_current = True
+        self.last_starved = (starved_prey, starved_predators)
+        return len(new_prey), len(new_predators)
 
     def handle_collisions(self):
         """Handle collisions between predators and prey."""
+        if self.engine is not None:
+            self.last_kills = self.engine.handle_collisions()
+            return
+
+        # Prada nu s-a mai miscat de la update_agents, deci grid-ul ei e inca valid;
+        # il refacem doar daca slot-urile s-au schimbat intre timp (ex. add_prey)
+        if self.prey_grid.count != len(self.prey_list.items):
+            self.prey_grid.rebuild(self.prey_list.items)
+
+        # Prada disputata revine primului prădător din listă
+        self.last_kills = 0
         for predator in self.predator_list:
-            if not predator.alive or predator.state == "MATING": continue
+            if not predator.alive or predator.state == STATE_MATING: continue
 
-            for prey in self.prey_list[:]:
-                if prey.alive and predator.position.distance_to(prey.position) < 5:
-                    self.prey_list.remove(prey)
+            for slot, prey, _ in self.prey_grid.query_radius(predator.position, EAT_DISTANCE):
+                if prey.alive:
                     prey.alive = False
+                    self.prey_list.kill(slot)
+                    self.last_kills += 1
                     predator.energy = min(predator.energy + ENERGY_FROM_PREY, ENERGY_MAX)
 
-        #stergem pe cei care au murit de foame si mancarea mancata deja
-        self.prey_list = [p for p in self.prey_list if p.alive]
-        self.predator_list = [p for p in self.predator_list if p.alive]
-        self.food_list = [f for f in self.food_list if f.active]
+        #mancarea mancata devine tombstone; cei morti de foame sau mancati sunt deja
+        # (obiectele moarte merg in pool si sunt refolosite la urmatoarele nasteri)
+        self.food_list.sweep(lambda food: food.active)
+        Prey.recycle(self.prey_list.take_killed())
+        Predator.recycle(self.predator_list.take_killed())
+        eaten = self.food_list.take_killed()
+        Food.recycle(eaten)
+        if eaten:
+            self.food_version += 1
+        for store in (self.prey_list, self.predator_list, self.food_list):
+            store.compact()
 
     def render(self):
         """Render all elements on the screen."""
-        screen.fill(COLOR_BG)
-
-        for food in self.food_list:
-            food.draw()
-
-        for obstacle in self.obstacles:
-            obstacle.draw()
+        init_display()
+        sprites = self.sprites
+        # În modul dirty-rect refacem fundalul doar sub ce s-a desenat în frame-ul trecut
+        previous, self._drawn = self._drawn, []
+        track = self.dirty_rects and self.trail_mode != "fade"
+        full = self._update_background() or not track or previous is None or len(previous) > DIRTY_RECT_LIMIT
+        if full:
+            screen.blit(self.background, (0, 0))
+        else:
+            for rect in previous:
+                screen.blit(self.background, rect, rect)
 
         self.draw_legend()
         self.draw_stats()
+        if self.show_perf:
+            self.draw_perf_hud()
+
+        camera = self.camera
+        if self.engine is not None:
+            self._drawn += self.engine.draw_agents(sprites, camera, doreturn=track) or []
+        prey_list, predator_list = self._visible_agents()
+        if self.engine is not None:
+            trails = self.engine.visible_trails(camera)
+        else:
+            trails = [(Agent.trails, [a.trail_slot for a in agents], [a.color for a in agents])
+                      for agents in (prey_list, predator_list)]
+        if self.trail_mode == "fade":
+            self.draw_trail_layer(trails)
+        lines = self.trail_mode == "lines"
 
         # Draw all prey
-        for prey in self.prey_list:
-            prey.draw()
+        palette = state_palette(COLOR_PREY)
+        code_of = {color: code for code, color in enumerate(palette)}
+        self._drawn += sprites.draw_prey(screen, camera.project_points([(p.position.x, p.position.y) for p in prey_list]),
+                                         [code_of[p.color] for p in prey_list], palette, track) or []
+        if lines:
+            self._draw_trails(*trails[0], track)
 
         # Draw all predators
-        for predator in self.predator_list:
-            predator.draw()
-
-        pygame.display.flip()
+        palette = state_palette(COLOR_PREDATOR)
+        code_of = {color: code for code, color in enumerate(palette)}
+        self._drawn += sprites.draw_predators(screen, camera.project_points([(p.position.x, p.position.y) for p in predator_list]),
+                                              [p.velocity.as_polar()[1] for p in predator_list],
+                                              [code_of[p.color] for p in predator_list], palette, track) or []
+        if lines:
+            self._draw_trails(*trails[1], track)
+
+        if full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(previous + self._drawn)
+        if not track:
+            self._drawn = None
+
+    def _visible_agents(self):
+        """Prey and predator objects near the camera view, in list order, found through the spatial grids."""
+        if self.engine is not None:
+            return [], []
+        if self.camera.shows_world:
+            return list(self.prey_list), list(self.predator_list)
+        if not self._grids_current:
+            self.food_grid.rebuild(self.food_list.items)
+            self.prey_grid.rebuild(self.prey_list.items)
+            self.predator_grid.rebuild(self.predator_list.items)
+            self._grids_current = True
+        # Marginea acopera sprite-ul si traseul din spatele agentului
+        view = self.camera.visible_rect(TRAIL_LENGTH * MAX_SPEED + 12 / self.camera.zoom)
+        return ([p for p in self.prey_grid.query_rect(*view) if p.alive],
+                [p for p in self.predator_grid.query_rect(*view) if p.alive])
+
+    def _update_background(self):
+        """Redraw the static layer (background, food, obstacles) when food or the view changed; True if redrawn."""
+        camera = self.camera
+        if self.engine is not None:
+            food_version = self.engine.food_version
+        else:
+            food_version = self.food_field.version if self.food_field is not None else self.food_version
+        key = (food_version, camera.key)
+        if self.background is not None and key == self._background_key and self.background.get_size() == screen.get_size():
+            return False
+        if self.background is None or self.background.get_size() != screen.get_size():
+            self.background = pygame.Surface(screen.get_size()).convert()
+        background = self.background
+        background.fill(COLOR_BG)
+        if self.engine is not None:
+            self.engine.draw_food(self.sprites, background, camera)
+        elif self.food_field is not None:
+            self.food_field.draw(background, camera)
+        else:
+            if camera.shows_world:
+                food = self.food_list
+            else:
+                self._visible_agents() # reface food_grid daca e nevoie
+                food = [f for f in self.food_grid.query_rect(*camera.visible_rect(4 / camera.zoom)) if f.active]
+            self.sprites.draw_food(background, key, camera.project_points([(f.position.x, f.position.y) for f in food]))
+        for obstacle in self.obstacles if camera.shows_world else self.obstacle_field.visible(*camera.visible_rect()):
+            obstacle.draw(background, camera)
+        self._background_key = key
+        return True
+
+    def _blit_hud(self, name, text, color, position):
+        self._drawn.append(screen.blit(self.hud.text(name, text, color), position))
+
+    def _draw_trails(self, buffer, slots, colors, track):
+        buffer.draw(screen, slots, colors, self.camera)
+        if track:
+            self._drawn += buffer.bounds(slots, self.camera)
+
+    def draw_trail_layer(self, trails):
+        """Fade the persistent trail layer, add this frame's segments and blend it on screen."""
+        if self.trail_layer is None or self.trail_layer.get_size() != screen.get_size():
+            self.trail_layer = pygame.Surface(screen.get_size())
+        layer = self.trail_layer
+        if self._trail_view != self.camera.key:
+            # Urmele vechi sunt in coordonatele vechii pozitii a camerei
+            layer.fill((0, 0, 0))
+            self._trail_view = self.camera.key
+        layer.fill((TRAIL_FADE,) * 3, special_flags=pygame.BLEND_RGB_SUB)
+        for buffer, slots, colors in trails:
+            buffer.draw_heads(layer, slots, colors, self.camera)
+        # Maximul pe canale: urmele stinse dispar în fundal fara sa il intunece
+        screen.blit(layer, (0, 0), special_flags=pygame.BLEND_RGB_MAX)
 
     def draw_legend(self):
         """Draw the legend on the screen."""
-        prey_text = FONT.render('Prey (Green Circle) - Press P to add', True, COLOR_PREY)
-        predator_text = FONT.render('Predator (Red Triangle) - Press O to add', True, COLOR_PREDATOR)
-        food_text = FONT.render('Food (Pink Dot) - Press F to add', True, COLOR_FOOD) 
-        screen.blit(prey_text, (10, 10))
-        screen.blit(predator_text, (10, 30))
-        screen.blit(food_text,(10, 50))
+        self._blit_hud("prey_legend", 'Prey (Green Circle) - Press P to add', COLOR_PREY, (10, 10))
+        self._blit_hud("predator_legend", 'Predator (Red Triangle) - Press O to add', COLOR_PREDATOR, (10, 30))
+        self._blit_hud("food_legend", 'Food (Pink Dot) - Press F to add', COLOR_FOOD, (10, 50))
 
         if self.flocking_enabled:
             flock_status = "ON"
@@ -686,17 +3817,106 @@ class Simulation:
             status_color = (255, 50, 50) 
 
         # Construim textul
-        controls_str = f"Controls: Click = Add Food | B = Flocking(ingramadire): {flock_status}"
-        controls_surface = FONT.render(controls_str, True, (200, 200, 200))
-        screen.blit(controls_surface,(10,70))
+        lod_status = "ON" if self.lod_enabled else "OFF"
+        controls_str = f"Controls: Click = Add Food | B = Flocking(ingramadire): {flock_status} | L = LOD: {lod_status} | H = Perf"
+        self._blit_hud("controls", controls_str, (200, 200, 200), (10, 70))
+
+        speed = "PAUSED" if self.paused else "max" if self.speed is None else f"x{self.speed}"
+        speed_str = f"Speed: {speed} ({self.steps_per_second:.0f} steps/s) | 1-4 = x1/x10/x100/max | Space = Pause | N = Step"
+        self._blit_hud("speed", speed_str, (200, 200, 200), (10, 90))
 
     def draw_stats(self):
         """Draw the simulation statistics on the screen."""
-        prey_count_text = FONT.render(f'Prey Count: {len(self.prey_list)}', True, COLOR_TEXT)
-        predator_count_text = FONT.render(f'Predator Count: {len(self.predator_list)}', True, COLOR_TEXT)
-        screen.blit(prey_count_text, (SCREEN_WIDTH - 150, 10))
-        screen.blit(predator_count_text, (SCREEN_WIDTH - 150, 30))
+        self._blit_hud("prey_count", f'Prey Count: {self.prey_count}', COLOR_TEXT, (SCREEN_WIDTH - 150, 10))
+        self._blit_hud("predator_count", f'Predator Count: {self.predator_count}', COLOR_TEXT, (SCREEN_WIDTH - 150, 30))
+
+    def draw_perf_hud(self):
+        """Draw rolling p50/p95/p99 of each phase and counter under the stats."""
+        lines = [("Phase (ms)  p50 / p95 / p99", COLOR_TEXT)]
+        for name in self.profiler.phase_names:
+            p50, p95, p99 = self.profiler.percentiles(name)
+            lines.append((f"{name}: {p50:.2f} / {p95:.2f} / {p99:.2f}", (200, 200, 200)))
+        for name in self.profiler.counter_names:
+            p50, p95, p99 = self.profiler.percentiles(name)
+            lines.append((f"{name}: {p50:.0f} / {p95:.0f} / {p99:.0f}", (200, 200, 200)))
+        for row, (text, color) in enumerate(lines):
+            self._blit_hud(f"perf_{row}", text, color, (SCREEN_WIDTH - 330, 115 + row * 20))
 
 if __name__== "__main__":
-    simulation = Simulation()
-    simulation.run()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Predator-Prey Simulation")
+    parser.add_argument("--prey", type=int, default=25)
+    parser.add_argument("--predators", type=int, default=5)
+    parser.add_argument("--obstacles", type=int, default=NUM_OBSTACLES)
+    parser.add_argument("--food", type=int, default=INITIAL_FOOD_COUNT, help="food units kept in the world")
+    parser.add_argument("--food-field", action="store_true", default=FOOD_FIELD,
+                        help="keep food as a density raster (cheap with millions of food units)")
+    parser.add_argument("--world", type=int, nargs=2, metavar=("WIDTH", "HEIGHT"), default=(WORLD_WIDTH, WORLD_HEIGHT),
+                        help="size of the simulated world (the window shows part of it; wheel zooms, right-drag pans)")
+    parser.add_argument("--backend", choices=("objects", "numpy", "tiled"), default="objects")
+    parser.add_argument("--workers", type=int, default=TILE_WORKERS, help="worker processes for the tiled backend")
+    parser.add_argument("--headless", action="store_true", help="run without a window, as fast as possible")
+    parser.add_argument("--frames", type=int, default=10000, help="number of frames for --headless")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--history-file", default=None, help="stream the population history to this CSV file")
+    parser.add_argument("--checkpoint", default=None, help="save checkpoints to this .npz file")
+    parser.add_argument("--checkpoint-every", type=int, default=1000, help="frames between checkpoints")
+    parser.add_argument("--resume", default=None, help="continue from this checkpoint file")
+    parser.add_argument("--record", default=None, help="record every frame to this trajectory file")
+    parser.add_argument("--telemetry", type=int, nargs="?", const=TELEMETRY_PORT, default=None, metavar="PORT",
+                        help="stream live counters to live_plot.py over UDP (default port %d)" % TELEMETRY_PORT)
+    parser.add_argument("--replay", default=None, help="play back a trajectory file instead of simulating")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="recorded frames per displayed frame")
+    parser.add_argument("--speed", type=int, default=FAST_FORWARD_SPEEDS[0],
+                        help="simulation steps per displayed frame (0 = as fast as possible)")
+    parser.add_argument("--trails", choices=("lines", "fade", "off"), default=TRAIL_MODE, help="how agent trails are drawn")
+    parser.add_argument("--dirty-rects", action="store_true", default=DIRTY_RECTS,
+                        help="update only the changed screen regions instead of flipping the whole screen")
+    parser.add_argument("--lod", action="store_true", default=LOD_ENABLED,
+                        help="update prey with nothing around them at a lower rate (objects backend)")
+    parser.add_argument("--synchronous", action="store_true", default=SYNCHRONOUS_UPDATE,
+                        help="all agents decide from the same frame, conflicts resolved afterwards (objects backend)")
+    parser.add_argument("--update-threads", type=int, default=UPDATE_THREADS,
+                        help="threads computing the decisions of a --synchronous update")
+    args = parser.parse_args()
+    NUM_OBSTACLES = args.obstacles
+    INITIAL_FOOD_COUNT = args.food
+    FOOD_FIELD = args.food_field
+    WORLD_WIDTH, WORLD_HEIGHT = args.world
+    TILE_WORKERS = args.workers
+
+    if args.replay:
+        ReplayPlayer(args.replay).run(speed=args.replay_speed)
+        raise SystemExit
+
+    if args.resume:
+        simulation = Simulation.load_checkpoint(args.resume, history_path=args.history_file)
+    else:
+        simulation = Simulation(args.prey, args.predators, backend=args.backend, seed=args.seed,
+                                history_path=args.history_file)
+    if args.checkpoint:
+        simulation.enable_checkpoints(args.checkpoint, args.checkpoint_every)
+    if args.record:
+        simulation.record_trajectory(args.record)
+    if args.telemetry:
+        simulation.stream_telemetry(port=args.telemetry)
+    simulation.trail_mode = args.trails
+    simulation.dirty_rects = args.dirty_rects
+    if args.lod:
+        simulation.lod_enabled = True
+    if args.synchronous:
+        simulation.synchronous_update = True
+    simulation.update_threads = args.update_threads
+    simulation.speed = args.speed or None
+    if args.headless:
+        simulation.step(args.frames)
+        simulation.history.flush()
+        if simulation.trajectory is not None:
+            simulation.trajectory.close()
+        if simulation.telemetry is not None:
+            simulation.telemetry.close()
+        simulation.profiler.export()
+        simulation.plot_data(interactive=False)
+    else:
+        simulation.run()
\ No newline at end of file
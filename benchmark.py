@@ -0,0 +1,293 @@
+"""Scaling benchmark for the predator-prey simulation step.
+
+Runs Simulation headless (dummy video driver) with a fixed seed over growing
+populations, food counts and obstacle counts. It reports ms per
+update_agents / handle_collisions / render call, frames per second and peak
+memory. Every case runs in a fresh process, so the peak RSS belongs to that
+case alone. --memory also measures the bytes per Prey, Predator and Food
+instance with tracemalloc, and --startup the cold start: module import and
+first simulated frame in a fresh interpreter.
+
+    python benchmark.py                          # writes benchmark_results.json
+    python benchmark.py --save-baseline          # ... and stores it as the baseline
+    python benchmark.py --compare                # compares against benchmark_baseline.json
+    python benchmark.py --backend numpy --max-prey 50000
+    python benchmark.py --lod --world 16000 12000  # level of detail in a sparse world
+    python benchmark.py --food-field             # food as a density raster, up to 1M units
+    python benchmark.py --synchronous 4          # double-buffered update, decisions on 4 threads
+    python benchmark.py --memory --compare       # ... plus bytes per agent object
+    python benchmark.py --startup                # ... plus cold-start import/first frame
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+try:
+    import resource
+except ImportError:
+    # Windows nu are modulul resource - raportam doar timpii
+    resource = None
+
+RESULTS_FILE = "benchmark_results.json"
+BASELINE_FILE = "benchmark_baseline.json"
+PHASES = ("update_agents", "handle_collisions", "render")
+
+# (prada, prădători) - de la valorile implicite pana la 50k/10k
+POPULATIONS = ((25, 5), (100, 20), (500, 100), (2000, 400), (10000, 2000), (50000, 10000))
+FOOD_COUNTS = (80, 800, 8000)
+FIELD_FOOD_COUNTS = (1000000,) # doar cu --food-field: hrana ca raster de densitate
+OBSTACLE_COUNTS = (8, 32, 128)
+DEFAULT_POPULATION = (500, 100)
+OBJECT_SAMPLE = 10000 # cate instante masuram pentru memoria per obiect
+STARTUP_RUNS = 5 # pornirile la rece masurate (raportam mediana)
+
+# Rulat cu `python -c` intr-un interpretor nou, din directorul proiectului
+STARTUP_PROBE = """
+import json, os, sys, time
+started = time.perf_counter()
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import Proiect2_MS__Timeea_Dobrean as sim
+imported = time.perf_counter()
+sim.Simulation(seed=1).step(1)
+result = {"import_s": imported - started, "first_frame_s": time.perf_counter() - started,
+          "matplotlib_loaded": "matplotlib" in sys.modules}
+try:
+    import resource
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024) / 2**20
+except ImportError:
+    pass
+print(json.dumps(result))
+"""
+
+
+def build_cases(backend, max_prey, lod=False, world=None, food_field=False, synchronous=0):
+    """Population sweep at default food/obstacles, then food and obstacle sweeps."""
+    import Proiect2_MS__Timeea_Dobrean as sim
+
+    default_food, default_obstacles = sim.INITIAL_FOOD_COUNT, sim.NUM_OBSTACLES
+    cases = [(prey, predators, default_food, default_obstacles)
+             for prey, predators in POPULATIONS if prey <= max_prey]
+    food_counts = FOOD_COUNTS + FIELD_FOOD_COUNTS if food_field else FOOD_COUNTS
+    cases += [DEFAULT_POPULATION + (food, default_obstacles) for food in food_counts if food != default_food]
+    cases += [DEFAULT_POPULATION + (default_food, obstacles) for obstacles in OBSTACLE_COUNTS if obstacles != default_obstacles]
+    return [{"backend": backend, "prey": prey, "predators": predators, "food": food, "obstacles": obstacles,
+             "lod": lod, "world": world, "food_field": food_field, "synchronous": synchronous}
+            for prey, predators, food, obstacles in cases]
+
+
+def case_name(case):
+    name = "{backend}-prey{prey}-pred{predators}-food{food}-obs{obstacles}".format(**case)
+    # Sufixe doar pentru optiunile nestandard: numele vechi raman comparabile cu baseline-ul
+    if case.get("world"):
+        name += "-world{}x{}".format(*case["world"])
+    if case.get("lod"):
+        name += "-lod"
+    if case.get("food_field"):
+        name += "-field"
+    if case.get("synchronous"):
+        name += "-sync{}".format(case["synchronous"])
+    return name
+
+
+def run_case(case, frames, warmup, seed, render):
+    """Run one case in the current process and return its measurements."""
+    import Proiect2_MS__Timeea_Dobrean as sim
+
+    sim.INITIAL_FOOD_COUNT = case["food"]
+    sim.NUM_OBSTACLES = case["obstacles"]
+    sim.FOOD_FIELD = case.get("food_field", False)
+    if case.get("world"):
+        sim.WORLD_WIDTH, sim.WORLD_HEIGHT = case["world"]
+    simulation = sim.Simulation(case["prey"], case["predators"], backend=case["backend"], seed=seed)
+    simulation.lod_enabled = case.get("lod", False)
+    simulation.synchronous_update = bool(case.get("synchronous"))
+    simulation.update_threads = case.get("synchronous") or 1
+    simulation.step(warmup)
+
+    profiler = sim.FrameProfiler(window=frames)
+    collections = [stats["collections"] for stats in gc.get_stats()]
+    started = time.perf_counter()
+    for _ in range(frames):
+        with profiler.phase("update_agents"):
+            simulation.update_agents()
+        with profiler.phase("handle_collisions"):
+            simulation.handle_collisions()
+        if render:
+            with profiler.phase("render"):
+                simulation.render()
+        profiler.end_frame()
+    elapsed = time.perf_counter() - started
+
+    summary = profiler.summary()["phases_ms"]
+    result = dict(case)
+    result["name"] = case_name(case)
+    result["frames"] = frames
+    result["fps"] = frames / elapsed if elapsed > 0 else float("inf")
+    result["ms"] = {phase: summary[phase] for phase in PHASES if phase in summary}
+    result["final_prey"] = simulation.prey_count
+    result["final_predators"] = simulation.predator_count
+    result["gc_collections"] = [stats["collections"] - before for stats, before in zip(gc.get_stats(), collections)]
+    if resource is not None:
+        # ru_maxrss e in KB pe Linux si in bytes pe macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+    return result
+
+
+def measure_objects(count):
+    """Bytes per live Prey, Predator and Food instance, traced with tracemalloc.
+
+    A first batch is created and dropped before tracing, so the shared trail
+    buffer has already grown and only the objects themselves are counted.
+    """
+    import tracemalloc
+    import Proiect2_MS__Timeea_Dobrean as sim
+
+    sizes = {}
+    for cls in (sim.Prey, sim.Predator, sim.Food):
+        warm = [cls() for _ in range(count)]
+        del warm
+        gc.collect()
+        tracemalloc.start()
+        items = [cls() for _ in range(count)]
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        sizes[cls.__name__] = (size - sys.getsizeof(items)) / count
+        del items
+    return sizes
+
+
+def measure_startup(runs):
+    """Median cold-start timings over `runs` fresh interpreters (process_s includes interpreter start)."""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", STARTUP_PROBE], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        sample = json.loads(output.strip().splitlines()[-1])
+        sample["process_s"] = time.perf_counter() - started
+        samples.append(sample)
+    startup = {name: statistics.median(sample[name] for sample in samples)
+               for name in samples[0] if not isinstance(samples[0][name], bool)}
+    startup["matplotlib_loaded"] = any(sample["matplotlib_loaded"] for sample in samples)
+    return startup
+
+
+def run_isolated(function, *args):
+    """Run function(*args) in a fresh spawned process so its peak memory is its own."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(function, *args).result()
+
+
+def compare(results, baseline, tolerance):
+    """Print per-phase ratios against the baseline; return the list of regressions."""
+    previous = {entry["name"]: entry for entry in baseline["results"]}
+    regressions = []
+    print(f"\n{'case':<45} {'phase':<18} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for entry in results["results"]:
+        old = previous.get(entry["name"])
+        if old is None:
+            continue
+        for phase, stats in entry["ms"].items():
+            if phase not in old["ms"] or old["ms"][phase]["mean"] <= 0:
+                continue
+            ratio = stats["mean"] / old["ms"][phase]["mean"]
+            flag = "  <-- slower" if ratio > 1 + tolerance else ""
+            print(f"{entry['name']:<45} {phase:<18} {old['ms'][phase]['mean']:>10.3f} {stats['mean']:>10.3f} {ratio:>7.2f}{flag}")
+            if flag:
+                regressions.append((entry["name"], phase, ratio))
+    regressions += compare_section("objects", "bytes", results, baseline, tolerance)
+    regressions += compare_section("startup", "", results, baseline, tolerance)
+    return regressions
+
+
+def compare_section(section, unit, results, baseline, tolerance):
+    """Compare a flat {name: number} section (objects, startup); higher is worse."""
+    if section not in results or section not in baseline:
+        return []
+    regressions = []
+    print(f"\n{section:<45} {unit:<18} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for name, value in results[section].items():
+        old = baseline[section].get(name)
+        if isinstance(value, bool) or not old:
+            continue
+        ratio = value / old
+        flag = "  <-- worse" if ratio > 1 + tolerance else ""
+        print(f"{name:<45} {unit:<18} {old:>10.3f} {value:>10.3f} {ratio:>7.2f}{flag}")
+        if flag:
+            regressions.append((section, name, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark for the simulation step")
+    parser.add_argument("--backend", choices=("objects", "numpy", "tiled"), default="objects")
+    parser.add_argument("--frames", type=int, default=100, help="measured frames per case")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured frames before measuring")
+    parser.add_argument("--seed", type=int, default=12345)
+    parser.add_argument("--max-prey", type=int, default=2000, help="skip population cases above this")
+    parser.add_argument("--no-render", action="store_true", help="do not time render()")
+    parser.add_argument("--lod", action="store_true", help="update quiet prey at a lower rate (objects backend)")
+    parser.add_argument("--food-field", action="store_true", help="keep food as a density raster")
+    parser.add_argument("--synchronous", type=int, nargs="?", const=1, default=0, metavar="THREADS",
+                        help="double-buffered agent update, decisions on THREADS threads (objects backend)")
+    parser.add_argument("--world", type=int, nargs=2, metavar=("WIDTH", "HEIGHT"), default=None,
+                        help="simulated world size (default: the window size)")
+    parser.add_argument("--memory", action="store_true", help="also measure bytes per agent object")
+    parser.add_argument("--startup", action="store_true", help="also measure import and first-frame time")
+    parser.add_argument("--output", default=RESULTS_FILE)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="compare with the baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown before flagging")
+    args = parser.parse_args()
+
+    results = {"seed": args.seed, "frames": args.frames, "warmup": args.warmup, "results": []}
+    for case in build_cases(args.backend, args.max_prey, args.lod, args.world, args.food_field, args.synchronous):
+        entry = run_isolated(run_case, case, args.frames, args.warmup, args.seed, not args.no_render)
+        results["results"].append(entry)
+        timings = "  ".join(f"{phase} {stats['mean']:.3f}ms" for phase, stats in entry["ms"].items())
+        memory = f"  peak {entry['peak_rss_mb']:.0f}MB" if "peak_rss_mb" in entry else ""
+        print(f"{entry['name']:<45} {entry['fps']:>9.1f} fps  {timings}{memory}", flush=True)
+    if args.memory:
+        results["objects"] = run_isolated(measure_objects, OBJECT_SAMPLE)
+        print("  ".join(f"{name} {size:.0f} B" for name, size in results["objects"].items()))
+    if args.startup:
+        results["startup"] = measure_startup(STARTUP_RUNS)
+        print("startup  " + "  ".join(f"{name} {value:.3f}" if not isinstance(value, bool) else f"{name} {value}"
+                                      for name, value in results["startup"].items()))
+
+    with open(args.output, "w") as handle:
+        json.dump(results, handle, indent=2)
+    print(f"Saved results to {args.output}")
+    if args.save_baseline:
+        with open(args.baseline, "w") as handle:
+            json.dump(results, handle, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+            return 1
+        with open(args.baseline) as handle:
+            regressions = compare(results, json.load(handle), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} measurement(s) worse than the baseline by more than {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
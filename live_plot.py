@@ -0,0 +1,163 @@
+"""Live plot of a running simulation, fed by its telemetry stream (TelemetryPublisher).
+
+The simulation sends batches of per-frame counters and phase timings as UDP
+datagrams and never waits for this process, so watching a run costs it nothing:
+start this plot before or after the simulation, close it at any time. Only the
+last --window frames are kept and the lines are updated in place a few times a
+second; births, deaths and kills are summed over RATE_FRAMES frames.
+
+    python live_plot.py
+    python Proiect2_MS__Timeea_Dobrean.py --headless --frames 1000000 --telemetry
+    python live_plot.py --output live.png --idle-timeout 10   # no window, PNG refreshed in place
+"""
+import argparse
+import os
+import socket
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+WINDOW = 20000 # frame-uri pastrate si desenate
+REFRESH = 0.25 # secunde intre doua redesenari
+RATE_FRAMES = 60 # nasterile/decesele/kills sunt insumate pe atatea frame-uri (o secunda la 60 fps)
+RATE_SERIES = ("prey_births", "prey_deaths", "kills", "predator_births", "predator_deaths")
+RECEIVE_BUFFER = 4 * 1024 * 1024
+
+
+def record_dtype(sim):
+    """NumPy dtype matching TelemetryPublisher.record_struct."""
+    return np.dtype([(name, "<" + code) for name, code in sim.TelemetryPublisher.FIELDS])
+
+
+def receive(sock, sim, dtype):
+    """All records from the datagrams waiting on the socket (possibly none)."""
+    magic = sim.TELEMETRY_MAGIC
+    chunks = []
+    while True:
+        try:
+            datagram = sock.recv(65536)
+        except BlockingIOError:
+            break
+        payload = datagram[len(magic):]
+        if datagram.startswith(magic) and len(payload) % dtype.itemsize == 0:
+            chunks.append(np.frombuffer(payload, dtype=dtype))
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=dtype)
+
+
+class TelemetryWindow:
+    """The last `size` records received, in frame order."""
+
+    def __init__(self, dtype, size=WINDOW):
+        self.size = size
+        self.records = np.zeros(0, dtype=dtype)
+
+    def extend(self, records):
+        frames = np.concatenate([self.records["frame"][-1:], records["frame"]])
+        restart = np.flatnonzero(np.diff(frames) < 0)
+        if len(restart):
+            # Un frame mai mic decat cel dinainte: a pornit o simulare noua
+            self.records = self.records[:0]
+            records = records[restart[-1]:]
+        self.records = np.concatenate([self.records, records])[-self.size:]
+
+    def rate(self, name):
+        """Sum of a per-frame counter over the previous RATE_FRAMES frames."""
+        total = np.cumsum(self.records[name], dtype=np.int64)
+        shifted = np.concatenate([np.zeros(min(RATE_FRAMES, len(total)), dtype=np.int64), total[:-RATE_FRAMES]])
+        return total - shifted
+
+
+def build_figure(plt):
+    """Figure and {series name: line} for the three panels."""
+    fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(10, 9), sharex=True)
+    lines = {}
+    lines["prey"], = ax1.plot([], [], color="green", label="Prey")
+    lines["predators"], = ax1.plot([], [], color="red", label="Predators")
+    food_axis = ax1.twinx()
+    lines["food"], = food_axis.plot([], [], color="hotpink", linewidth=0.8, linestyle=":", label="Food")
+    for name, color in zip(RATE_SERIES, ("green", "olive", "black", "red", "orange")):
+        lines[name], = ax2.plot([], [], color=color, linewidth=0.8, label=name.replace("_", " "))
+    lines["update_ms"], = ax3.plot([], [], linewidth=0.8, label="update_agents")
+    lines["collisions_ms"], = ax3.plot([], [], linewidth=0.8, label="handle_collisions")
+
+    ax1.set_title("Population")
+    ax1.set_ylabel("Agents")
+    food_axis.set_ylabel("Food")
+    ax2.set_title(f"Events per {RATE_FRAMES} frames")
+    ax3.set_title("Phase time")
+    ax3.set_ylabel("ms / frame")
+    ax3.set_xlabel("Time (Frames)")
+    food_axis.legend(handles=[lines["prey"], lines["predators"], lines["food"]], loc="upper left", fontsize="small")
+    ax2.legend(loc="upper left", fontsize="small", ncol=3)
+    ax3.legend(loc="upper left", fontsize="small")
+    fig.tight_layout()
+    return fig, lines
+
+
+def redraw(fig, lines, window):
+    """Put the window's data into the existing lines and rescale their axes."""
+    records = window.records
+    frames = records["frame"]
+    for name, line in lines.items():
+        line.set_data(frames, window.rate(name) if name in RATE_SERIES else records[name])
+    for axis in {line.axes for line in lines.values()}:
+        axis.relim()
+        axis.autoscale_view()
+    fig.canvas.draw_idle()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live plot of the simulation telemetry stream")
+    parser.add_argument("--host", default=None, help="address to listen on (default TELEMETRY_HOST)")
+    parser.add_argument("--port", type=int, default=None, help="UDP port (default TELEMETRY_PORT)")
+    parser.add_argument("--window", type=int, default=WINDOW, help="frames kept on screen")
+    parser.add_argument("--refresh", type=float, default=REFRESH, help="seconds between redraws")
+    parser.add_argument("--output", default=None, help="save the plot to this PNG on every redraw, no window")
+    parser.add_argument("--idle-timeout", type=float, default=None,
+                        help="exit after this many seconds without telemetry (default: run until closed)")
+    args = parser.parse_args()
+
+    import Proiect2_MS__Timeea_Dobrean as sim
+
+    dtype = record_dtype(sim)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+    sock.bind((args.host or sim.TELEMETRY_HOST, args.port or sim.TELEMETRY_PORT))
+    sock.setblocking(False)
+    print(f"Listening for telemetry on {sock.getsockname()[0]}:{sock.getsockname()[1]}")
+
+    plt = sim.load_pyplot(interactive=args.output is None)
+    fig, lines = build_figure(plt)
+    window = TelemetryWindow(dtype, args.window)
+    last_data = time.monotonic()
+    try:
+        while True:
+            records = receive(sock, sim, dtype)
+            if len(records):
+                last_data = time.monotonic()
+                window.extend(records)
+                redraw(fig, lines, window)
+                if args.output:
+                    fig.savefig(args.output)
+            elif args.idle_timeout is not None and time.monotonic() - last_data > args.idle_timeout:
+                break
+            if args.output:
+                time.sleep(args.refresh)
+            else:
+                plt.pause(args.refresh)
+                if not plt.fignum_exists(fig.number):
+                    break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+    if len(window.records):
+        print(f"Last frame received: {int(window.records['frame'][-1])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
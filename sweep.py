@@ -0,0 +1,201 @@
+"""Parallel Monte Carlo ensembles and parameter sweeps for the predator-prey model.
+
+Every run is an independent, seeded, headless Simulation. Its parameters are
+passed with the run (applied through simulation_parameters for that run only)
+instead of being edited in the module. Runs are spread over a process pool.
+A crashed worker only costs a retry of the runs it had in flight. The prey /
+predator (and birth) history series of all seeds of a parameter set are
+aggregated into mean, standard deviation, a 95% confidence band of the mean
+and a 5-95 percentile band.
+
+    python sweep.py --seeds 16 --frames 5000
+    python sweep.py --param ENERGY_TO_REPRODUCE=150,200,250 --param SPEED_PREDATOR=1.5,1.7 --seeds 8
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+SERIES = ("prey", "predators", "prey_births", "predator_births")
+RESULTS_FILE = "sweep_results.npz"
+
+
+def run_simulation(spec):
+    """Run one headless simulation described by spec and return its history series."""
+    import Proiect2_MS__Timeea_Dobrean as sim
+
+    # HISTORY_CAPACITY=0: pastram tot istoricul, nu doar ultimele frame-uri
+    with sim.simulation_parameters(HISTORY_CAPACITY=0, **spec["params"]):
+        simulation = sim.Simulation(spec["prey"], spec["predators"], backend=spec["backend"], seed=spec["seed"])
+        simulation.step(spec["frames"])
+    return {name: np.asarray(simulation.history.series(name), dtype=np.int32) for name in SERIES}
+
+
+def run_ensemble(specs, workers=None, worker=run_simulation, retries=1):
+    """Run specs over a process pool; returns {index: result} and {index: error message}.
+
+    A worker that dies (segfault, OOM kill) breaks the whole pool; the pool is
+    then rebuilt and every unfinished run is resubmitted, up to `retries` times.
+    """
+    results, errors = {}, {}
+    attempts = dict.fromkeys(range(len(specs)), 0)
+    pending = list(range(len(specs)))
+    while pending:
+        broken = False
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(worker, specs[index]): index for index in pending}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except BrokenProcessPool:
+                    broken = True
+                except Exception as exc:
+                    # Eroare Python in simulare: nu are rost sa o reluam
+                    errors[index] = f"{type(exc).__name__}: {exc}"
+                else:
+                    done = len(results) + len(errors)
+                    print(f"run {index} done ({done}/{len(specs)})", flush=True)
+        if not broken:
+            break
+
+        pending = [index for index in pending if index not in results and index not in errors]
+        for index in pending:
+            attempts[index] += 1
+        for index in [i for i in pending if attempts[i] > retries]:
+            errors[index] = "worker process crashed"
+        pending = [index for index in pending if attempts[index] <= retries]
+        print(f"worker crashed; resubmitting {len(pending)} run(s)", flush=True)
+    return results, errors
+
+
+def aggregate(runs):
+    """Mean, std, 95% CI of the mean and 5-95 percentile band for each series."""
+    summary = {}
+    for name in SERIES:
+        stacked = np.stack([run[name] for run in runs]).astype(float)
+        mean = stacked.mean(axis=0)
+        std = stacked.std(axis=0, ddof=1) if len(runs) > 1 else np.zeros_like(mean)
+        half_width = 1.96 * std / np.sqrt(len(runs))
+        summary[name] = {
+            "mean": mean,
+            "std": std,
+            "ci_low": mean - half_width,
+            "ci_high": mean + half_width,
+            "p05": np.percentile(stacked, 5, axis=0),
+            "p95": np.percentile(stacked, 95, axis=0),
+        }
+    return summary
+
+
+def parse_param(text):
+    """Parse NAME=v1,v2,... into (NAME, [values]) with int/float conversion."""
+    name, _, values = text.partition("=")
+    if not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=v1,v2,..., got {text!r}")
+    parsed = []
+    for value in values.split(","):
+        number = float(value)
+        parsed.append(int(number) if number.is_integer() and "." not in value else number)
+    return name.strip(), parsed
+
+
+def build_specs(param_grid, seeds, base_seed, frames, prey, predators, backend):
+    """One spec per (parameter combination, seed)."""
+    names = [name for name, _ in param_grid]
+    combinations = [dict(zip(names, values)) for values in itertools.product(*(v for _, v in param_grid))]
+    specs = []
+    for combo_index, params in enumerate(combinations):
+        for replicate in range(seeds):
+            specs.append({"combo": combo_index, "params": params, "seed": base_seed + replicate,
+                          "frames": frames, "prey": prey, "predators": predators, "backend": backend})
+    return combinations, specs
+
+
+def save(path, combinations, specs, results, errors):
+    """Write every aggregated series to an .npz file with a JSON index of the parameter sets."""
+    arrays = {}
+    index = []
+    for combo_index, params in enumerate(combinations):
+        runs = [results[i] for i, spec in enumerate(specs) if spec["combo"] == combo_index and i in results]
+        index.append({"params": params, "runs": len(runs),
+                      "failed": sum(1 for i, spec in enumerate(specs) if spec["combo"] == combo_index and i in errors)})
+        if not runs:
+            continue
+        for series, stats in aggregate(runs).items():
+            for stat, values in stats.items():
+                arrays[f"combo{combo_index}/{series}/{stat}"] = values
+    arrays["index"] = np.array(json.dumps(index))
+    np.savez_compressed(path, **arrays)
+    return index
+
+
+def plot(path, combinations, results, specs):
+    """Plot mean prey/predator counts with 95% confidence bands for every parameter set."""
+    import Proiect2_MS__Timeea_Dobrean as sim
+
+    plt = sim.load_pyplot(interactive=False)
+
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8), sharex=True)
+    for combo_index, params in enumerate(combinations):
+        runs = [results[i] for i, spec in enumerate(specs) if spec["combo"] == combo_index and i in results]
+        if not runs:
+            continue
+        label = ", ".join(f"{k}={v}" for k, v in params.items()) or "default"
+        summary = aggregate(runs)
+        for ax, series in ((ax1, "prey"), (ax2, "predators")):
+            stats = summary[series]
+            frames = np.arange(len(stats["mean"]))
+            line, = ax.plot(frames, stats["mean"], label=label, linewidth=0.8)
+            ax.fill_between(frames, stats["ci_low"], stats["ci_high"], color=line.get_color(), alpha=0.25)
+    ax1.set_title("Prey (mean, 95% CI)")
+    ax2.set_title("Predators (mean, 95% CI)")
+    ax2.set_xlabel("Time (Frames)")
+    ax1.legend(fontsize="small")
+    plt.tight_layout()
+    plt.savefig(path)
+    print(f"Saving graphs to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel ensemble / parameter sweep runner")
+    parser.add_argument("--param", action="append", type=parse_param, default=[],
+                        help="NAME=v1,v2,... (repeatable; the sweep is the cartesian product)")
+    parser.add_argument("--seeds", type=int, default=8, help="replicates per parameter set")
+    parser.add_argument("--base-seed", type=int, default=0)
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--prey", type=int, default=25)
+    parser.add_argument("--predators", type=int, default=5)
+    parser.add_argument("--backend", choices=("objects", "numpy"), default="objects")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--retries", type=int, default=1, help="resubmissions after a worker crash")
+    parser.add_argument("--output", default=RESULTS_FILE)
+    parser.add_argument("--plot", default="sweep_plots.png", help="empty string to skip plotting")
+    args = parser.parse_args()
+
+    combinations, specs = build_specs(args.param, args.seeds, args.base_seed, args.frames,
+                                      args.prey, args.predators, args.backend)
+    print(f"{len(specs)} runs ({len(combinations)} parameter set(s) x {args.seeds} seeds) on {args.workers} workers")
+    results, errors = run_ensemble(specs, args.workers, retries=args.retries)
+    for index, message in sorted(errors.items()):
+        print(f"run {index} failed: {message} ({specs[index]['params']}, seed {specs[index]['seed']})")
+
+    index = save(args.output, combinations, specs, results, errors)
+    print(f"Saved aggregated series to {args.output}")
+    for entry in index:
+        print(f"  {entry['params'] or 'default'}: {entry['runs']} run(s), {entry['failed']} failed")
+    if args.plot:
+        plot(args.plot, combinations, results, specs)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+import pytest
+
+import Proiect2_MS__Timeea_Dobrean as sim
+
+
+def state(simulation):
+    """Everything that must match after a resume, for either backend."""
+    if simulation.engine is not None:
+        engine = simulation.engine
+        return [(species.position[:species.count].tobytes(), species.velocity[:species.count].tobytes(),
+                 species.energy[:species.count].tobytes(), species.state[:species.count].tobytes())
+                for species in (engine.prey, engine.predators)] + [engine.food_position.tobytes()]
+    agents = list(simulation.prey_list) + list(simulation.predator_list)
+    return ([(a.uid, a.position.x, a.position.y, a.velocity.x, a.velocity.y, a.energy, a.state, a.mating_timer)
+             for a in agents],
+            [(f.position.x, f.position.y) for f in simulation.food_list],
+            list(simulation.history.series("prey")))
+
+
+@pytest.mark.parametrize("backend", ["objects", "numpy"])
+def test_resume_matches_uninterrupted_run(tmp_path, backend):
+    path = str(tmp_path / "checkpoint.npz")
+    simulation = sim.Simulation(40, 8, backend=backend, seed=5)
+    simulation.step(300)
+    simulation.save_checkpoint(path)
+    simulation.step(300)
+
+    resumed = sim.Simulation.load_checkpoint(path)
+    resumed.step(300)
+    assert resumed.freame_count == simulation.freame_count
+    assert state(resumed) == state(simulation)
@@ -0,0 +1,15 @@
+import pytest
+
+import Proiect2_MS__Timeea_Dobrean as sim
+
+
+@pytest.mark.parametrize("backend, food_field", [("numpy", False), ("objects", True)])
+def test_adding_food_without_food_objects_leaves_the_pool_alone(backend, food_field):
+    with sim.simulation_parameters(FOOD_FIELD=food_field):
+        simulation = sim.Simulation(10, 2, seed=1, backend=backend)
+    sim.Food.recycle([sim.Food() for _ in range(3)])
+    pooled, food = len(sim.Food.pool), simulation.food_count
+    simulation.add_food()
+    simulation.add_food((40, 50))
+    assert len(sim.Food.pool) == pooled
+    assert simulation.food_count == food + 2
@@ -0,0 +1,21 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import sweep
+
+
+def spec(speed, frames=400):
+    return {"params": {"SPEED_PREDATOR": speed}, "prey": 25, "predators": 5, "backend": "objects",
+            "seed": 3, "frames": frames}
+
+
+def test_reused_worker_matches_fresh_process():
+    # Un worker refolosit are in pool agenti din rularea anterioara, cu alti parametri
+    sweep.run_simulation(spec(1.0, frames=2000))
+    reused = sweep.run_simulation(spec(2.5))
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        fresh = pool.submit(sweep.run_simulation, spec(2.5)).result()
+    for name in sweep.SERIES:
+        np.testing.assert_array_equal(reused[name], fresh[name])
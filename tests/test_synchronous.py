@@ -0,0 +1,31 @@
+import gc
+
+import Proiect2_MS__Timeea_Dobrean as sim
+
+
+def run(threads, frames=400):
+    sim.Agent.next_uid = 0 # uid-urile continua de la rularea anterioara din acelasi proces
+    with sim.simulation_parameters(UPDATE_CHUNK=8):
+        simulation = sim.Simulation(60, 12, seed=2)
+        simulation.synchronous_update = True
+        simulation.update_threads = threads
+        simulation.step(frames)
+    agents = list(simulation.prey_list) + list(simulation.predator_list)
+    return simulation, ([(a.uid, a.position.x, a.position.y, a.velocity.x, a.velocity.y, a.energy, a.state,
+                          a.mating_timer, a.partner_uid) for a in agents],
+                        [(f.position.x, f.position.y) for f in simulation.food_list])
+
+
+def test_thread_count_does_not_change_the_result():
+    _, single = run(1)
+    for threads in (2, 4):
+        _, threaded = run(threads)
+        assert threaded == single
+
+
+def test_decision_threads_stop_with_the_simulation():
+    simulation, _ = run(4, frames=5)
+    pool = simulation._decide_pool[1]
+    del simulation
+    gc.collect()
+    assert pool._shutdown
@@ -0,0 +1,29 @@
+import pytest
+
+import Proiect2_MS__Timeea_Dobrean as sim
+
+
+class Records:
+    def __init__(self):
+        self.rows = []
+
+    def publish(self, *values):
+        self.rows.append(dict(zip((name for name, _ in sim.TelemetryPublisher.FIELDS), values)))
+
+
+@pytest.mark.parametrize("backend", ["objects", "numpy"])
+def test_deaths_are_counted_even_when_agents_are_added(backend):
+    with sim.simulation_parameters(ENERGY_LOSS_PER_FRAME=1.0):
+        simulation = sim.Simulation(80, 20, seed=4, backend=backend)
+        simulation.telemetry = Records()
+        simulation.step(60)
+        simulation.add_prey()
+        simulation.add_predator()
+        simulation.step(80)
+    rows = simulation.telemetry.rows
+    assert sum(row["prey_deaths"] - row["kills"] for row in rows) > 0
+    assert sum(row["predator_deaths"] for row in rows) > 0
+    for index, (previous, row) in enumerate(zip(rows, rows[1:]), 1):
+        added = 1 if index == 60 else 0 # P/O intre cele doua apeluri step
+        assert row["prey"] == previous["prey"] + added + row["prey_births"] - row["prey_deaths"]
+        assert row["predators"] == previous["predators"] + added + row["predator_births"] - row["predator_deaths"]
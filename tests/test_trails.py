@@ -0,0 +1,30 @@
+import numpy as np
+import pygame
+
+import Proiect2_MS__Timeea_Dobrean as sim
+
+
+def test_segments_match_pygame_draw_line_across_the_clip_edge():
+    rng = np.random.default_rng(7)
+    start = rng.integers(-300, 1100, size=(300, 2))
+    end = start + rng.integers(-400, 400, size=(300, 2))
+    for a, b in zip(start, end):
+        expected, drawn = pygame.Surface((800, 600)), pygame.Surface((800, 600))
+        for surface in (expected, drawn):
+            surface.set_clip((20, 10, 700, 560))
+        pygame.draw.line(expected, (255, 0, 0), a.tolist(), b.tolist())
+        sim.Agent.trails._draw_segments(drawn, a[None], b[None], np.array([0]), [(255, 0, 0)])
+        assert (pygame.surfarray.array2d(expected) == pygame.surfarray.array2d(drawn)).all(), (a, b)
+
+
+def test_engine_trails_follow_their_rows_through_compaction():
+    agents = sim.AgentArrays(1.0, capacity=4)
+    agents.append(np.zeros((6, 2)), np.zeros((6, 2)), np.arange(6))
+    for step in range(1, 4):
+        rows = np.arange(agents.count)
+        agents.trails.push_many(rows, np.stack([agents.uid[rows], np.full(len(rows), step)], axis=1))
+    agents.alive[[1, 4]] = False
+    agents.compact()
+    agents.append(np.zeros((1, 2)), np.zeros((1, 2)), np.array([6]))
+    assert [agents.trails.trail(row) for row in range(agents.count)] == (
+        [[(uid, 1), (uid, 2), (uid, 3)] for uid in (0, 2, 3, 5)] + [[]])